@@ -1,70 +1,170 @@
 import os
+import sys
+import glob
+import json
+import shutil
 import random
+import itertools
 import pandas as pd
 import numpy as np
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
-def generate_cielo_dataset(
-    num_chamados,
-    data_inicio_str,
-    data_fim_str,
-    local_ofensor,
-    servico_deficiente,
-    output_dir,
-    output_filename
-):
+from analise_cielo.esquema import (
+    COLUNAS_BENCHMARK, tipo_categoria, compactar_chamados, com_colunas_benchmark, para_tabela_arrow,
+)
+from analise_cielo.armazem import EscritorArmazem
+from analise_cielo.instrumentacao import span, ativar
+from analise_cielo.sla import CalendarioSLA, somar_horas
+
+# Listas de valores para geração
+BAIRROS_SP = [
+    'Pinheiros', 'Moema', 'Jardins', 'Vila Madalena', 'Lapa', 'Santo Amaro',
+    'Itaim Bibi', 'Barra Funda', 'Tatuapé', 'Guarulhos', 'Osasco'
+]
+SERVICOS = ['Instalação', 'Manutenção']
+STATUS = ['Atendido', 'Cancelado']
+MOTIVOS_CANCELAMENTO = [
+    'Cliente ausente', 'Solicitação do cliente', 'Problema técnico',
+    'Equipamento indisponível', 'Endereço errado'
+]
+
+# Parâmetros de simulação para cenários específicos
+PROB_CANCELAMENTO_OFENSOR = 0.35
+DESVIO_TEMPO_ATENDIMENTO_OFENSOR = 1.0
+PROB_PRAZO_LIMITE_EXCEDIDO_OFENSOR = 0.40
+MOTIVO_CANCELAMENTO_PRINCIPAL_OFENSOR = 'Problema técnico'
+PESO_MOTIVO_PRINCIPAL_OFENSOR = 0.40
+
+PROB_CANCELAMENTO_SERVICO_DEFICIENTE = 0.30
+DESVIO_TEMPO_ATENDIMENTO_SERVICO_DEFICIENTE = 0.5
+PROB_PRAZO_LIMITE_EXCEDIDO_SERVICO_DEFICIENTE = 0.35
+
+PROB_CANCELAMENTO_PADRAO = 0.15
+DESVIO_TEMPO_ATENDIMENTO_PADRAO = 0.0
+PROB_PRAZO_LIMITE_EXCEDIDO_PADRAO = 0.20
+PRAZO_HORAS_MEDIO_PADRAO = 48
+PRAZO_HORAS_DESVIO_PADRAO = 24
+# Com True, o PRAZO_HORAS conta só as horas dos dias úteis (sem fins de semana e feriados nacionais)
+PRAZO_EM_HORAS_UTEIS = False
+CALENDARIO_PRAZO = CalendarioSLA()
+
+# Cenário da simulação: os parâmetros acima, sobrescritos um a um pelo `cenario` das funções de geração
+CENARIO_PADRAO = {
+    'PROB_CANCELAMENTO_OFENSOR': PROB_CANCELAMENTO_OFENSOR,
+    'DESVIO_TEMPO_ATENDIMENTO_OFENSOR': DESVIO_TEMPO_ATENDIMENTO_OFENSOR,
+    'PROB_PRAZO_LIMITE_EXCEDIDO_OFENSOR': PROB_PRAZO_LIMITE_EXCEDIDO_OFENSOR,
+    'MOTIVO_CANCELAMENTO_PRINCIPAL_OFENSOR': MOTIVO_CANCELAMENTO_PRINCIPAL_OFENSOR,
+    'PESO_MOTIVO_PRINCIPAL_OFENSOR': PESO_MOTIVO_PRINCIPAL_OFENSOR,
+    'PROB_CANCELAMENTO_SERVICO_DEFICIENTE': PROB_CANCELAMENTO_SERVICO_DEFICIENTE,
+    'DESVIO_TEMPO_ATENDIMENTO_SERVICO_DEFICIENTE': DESVIO_TEMPO_ATENDIMENTO_SERVICO_DEFICIENTE,
+    'PROB_PRAZO_LIMITE_EXCEDIDO_SERVICO_DEFICIENTE': PROB_PRAZO_LIMITE_EXCEDIDO_SERVICO_DEFICIENTE,
+    'PROB_CANCELAMENTO_PADRAO': PROB_CANCELAMENTO_PADRAO,
+    'DESVIO_TEMPO_ATENDIMENTO_PADRAO': DESVIO_TEMPO_ATENDIMENTO_PADRAO,
+    'PROB_PRAZO_LIMITE_EXCEDIDO_PADRAO': PROB_PRAZO_LIMITE_EXCEDIDO_PADRAO,
+    'PRAZO_HORAS_MEDIO_PADRAO': PRAZO_HORAS_MEDIO_PADRAO,
+    'PRAZO_HORAS_DESVIO_PADRAO': PRAZO_HORAS_DESVIO_PADRAO,
+    'PRAZO_EM_HORAS_UTEIS': PRAZO_EM_HORAS_UTEIS,
+}
+
+# Dados de benchmarking
+PRAZO_MAXIMO_CONCORRENCIA_DIAS = 2.0
+EXPECTATIVA_CLIENTE_DIAS = 1.0
+# Constantes do dataset: em memória e nos formatos colunares ficam só nos metadados (ver `analise_cielo.esquema`)
+BENCHMARKS = {
+    'PRAZO_MAXIMO_CONCORRENCIA_DIAS': PRAZO_MAXIMO_CONCORRENCIA_DIAS,
+    'EXPECTATIVA_CLIENTE_DIAS': EXPECTATIVA_CLIENTE_DIAS,
+}
+
+COLUNAS = [
+    'LOCAL', 'SERVICO', 'STATUS', 'MOTIVO_CANCELAMENTO',
+    'DATA_ABERTURA', 'DATA_ENCERRAMENTO', 'DATA_LIMITE_ATENDIMENTO',
+    'PRAZO_HORAS', 'ENTREGA', 'PRAZO_MAXIMO_CONCORRENCIA_DIAS', 'EXPECTATIVA_CLIENTE_DIAS'
+]
+
+MODOS_GERACAO = ('vetorizado', 'loop')
+
+# Formatos de saída suportados e as respectivas extensões de arquivo
+FORMATOS_SAIDA = {'csv': '.csv', 'parquet': '.parquet', 'feather': '.feather', 'colunar': '.colunar'}
+
+# Os chamados são sorteados em blocos de tamanho fixo, cada um com a sua própria semente derivada
+# da semente principal. Assim o conteúdo gerado não depende do tamanho dos chunks de escrita.
+TAMANHO_BLOCO_GERACAO = 65_536
+
+MICROSSEGUNDOS_POR_DIA = 86_400_000_000
+
+# Varredura de cenários: subdiretório de cada cenário, arquivo com os seus parâmetros e índice da varredura
+PREFIXO_DIRETORIO_CENARIO = 'cenario-'
+ARQUIVO_PARAMETROS_CENARIO = 'cenario.json'
+ARQUIVO_INDICE_VARREDURA = 'varredura.json'
+LINHAS_POR_PARTE_VARREDURA = 1_000_000
+
+
+def _cenario_completo(cenario):
     """
-    Gera um dataset sintético de chamados logísticos da Cielo, simulando cenários específicos.
+    `CENARIO_PADRAO` com os parâmetros de `cenario` (dict, opcional) sobrescritos.
+    """
+    cenario = dict(cenario or {})
+    desconhecidos = set(cenario) - set(CENARIO_PADRAO)
+    if desconhecidos:
+        raise ValueError(f"Parâmetros de cenário desconhecidos: {sorted(desconhecidos)}. "
+                         f"Use um de {tuple(CENARIO_PADRAO)}.")
+    return {**CENARIO_PADRAO, **cenario}
 
-    Args:
-        num_chamados (int): Número total de chamados a gerar.
-        data_inicio_str (str): Data de início da simulação no formato 'dd/mm/aaaa'.
-        data_fim_str (str): Data de fim da simulação no formato 'dd/mm/aaaa'.
-        local_ofensor (str): Local simulado com pior desempenho.
-        servico_deficiente (str): Serviço simulado com pior desempenho.
-        output_dir (str): Diretório para salvar o arquivo CSV.
-        output_filename (str): Nome do arquivo CSV de saída.
+
+def grade_de_cenarios(grade):
     """
-    # Converte strings de data para objetos datetime
-    data_inicio_simulacao = datetime.strptime(data_inicio_str, '%d/%m/%Y')
-    data_fim_simulacao = datetime.strptime(data_fim_str, '%d/%m/%Y')
+    Produto cartesiano de uma grade de parâmetros, como lista de cenários para `generate_cielo_scenario_sweep`.
 
-    # Listas de valores para geração
-    BAIRROS_SP = [
-        'Pinheiros', 'Moema', 'Jardins', 'Vila Madalena', 'Lapa', 'Santo Amaro',
-        'Itaim Bibi', 'Barra Funda', 'Tatuapé', 'Guarulhos', 'Osasco'
-    ]
-    SERVICOS = ['Instalação', 'Manutenção']
-    STATUS = ['Atendido', 'Cancelado']
-    MOTIVOS_CANCELAMENTO = [
-        'Cliente ausente', 'Solicitação do cliente', 'Problema técnico',
-        'Equipamento indisponível', 'Endereço errado'
-    ]
+    Exemplo:
+        >>> grade_de_cenarios({'PROB_CANCELAMENTO_OFENSOR': [0.25, 0.35], 'PRAZO_HORAS_MEDIO_PADRAO': [24, 48]})
+        [{'PROB_CANCELAMENTO_OFENSOR': 0.25, 'PRAZO_HORAS_MEDIO_PADRAO': 24}, ...]  # 4 cenários
+    """
+    nomes = list(grade)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grade[nome] for nome in nomes))]
 
-    # Parâmetros de simulação para cenários específicos
-    PROB_CANCELAMENTO_OFENSOR = 0.35
-    DESVIO_TEMPO_ATENDIMENTO_OFENSOR = 1.0
-    PROB_PRAZO_LIMITE_EXCEDIDO_OFENSOR = 0.40
-    MOTIVO_CANCELAMENTO_PRINCIPAL_OFENSOR = 'Problema técnico'
 
-    PROB_CANCELAMENTO_SERVICO_DEFICIENTE = 0.30
-    DESVIO_TEMPO_ATENDIMENTO_SERVICO_DEFICIENTE = 0.5
-    PROB_PRAZO_LIMITE_EXCEDIDO_SERVICO_DEFICIENTE = 0.35
+def _somar_prazo(data_abertura, prazo_horas, cenario=CENARIO_PADRAO):
+    """
+    DATA_LIMITE_ATENDIMENTO: `prazo_horas` somadas à abertura, corridas ou, com PRAZO_EM_HORAS_UTEIS, só em
+    dias úteis (`CALENDARIO_PRAZO`). Aceita arrays datetime64 ou uma única data, retornada como datetime.
+    """
+    if not cenario['PRAZO_EM_HORAS_UTEIS']:
+        if isinstance(data_abertura, datetime):
+            return data_abertura + timedelta(hours=prazo_horas)
+        return data_abertura + prazo_horas.astype('timedelta64[h]')
+    if isinstance(data_abertura, datetime):
+        return pd.Timestamp(somar_horas([data_abertura], [prazo_horas], CALENDARIO_PRAZO)[0]).to_pydatetime()
+    return somar_horas(data_abertura, prazo_horas, CALENDARIO_PRAZO).astype(data_abertura.dtype)
 
-    PROB_CANCELAMENTO_PADRAO = 0.15
-    DESVIO_TEMPO_ATENDIMENTO_PADRAO = 0.0
-    PROB_PRAZO_LIMITE_EXCEDIDO_PADRAO = 0.20
-    PRAZO_HORAS_MEDIO_PADRAO = 48
-    PRAZO_HORAS_DESVIO_PADRAO = 24
 
-    # Dados de benchmarking
-    PRAZO_MAXIMO_CONCORRENCIA_DIAS = 2.0
-    EXPECTATIVA_CLIENTE_DIAS = 1.0
+def _pesos_motivos_cancelamento(ofensor, cenario=CENARIO_PADRAO):
+    """
+    Retorna os pesos de sorteio dos motivos de cancelamento, com ou sem o cenário de local ofensor.
+    """
+    motivo_principal = cenario['MOTIVO_CANCELAMENTO_PRINCIPAL_OFENSOR']
+    if not ofensor or motivo_principal not in MOTIVOS_CANCELAMENTO:
+        return [1 / len(MOTIVOS_CANCELAMENTO)] * len(MOTIVOS_CANCELAMENTO)
 
-    # Geração dos dados
+    idx = MOTIVOS_CANCELAMENTO.index(motivo_principal)
+    remaining_weight = 1.0 - cenario['PESO_MOTIVO_PRINCIPAL_OFENSOR']
+    num_other_motives = len(MOTIVOS_CANCELAMENTO) - 1
+    other_motive_weight = remaining_weight / num_other_motives if num_other_motives > 0 else 0
+    new_weights = [other_motive_weight] * len(MOTIVOS_CANCELAMENTO)
+    new_weights[idx] = cenario['PESO_MOTIVO_PRINCIPAL_OFENSOR']
+    return new_weights
+
+
+def _gerar_chamados_loop(num_chamados, data_inicio_simulacao, dias_simulacao, local_ofensor, servico_deficiente,
+                         cenario=CENARIO_PADRAO):
+    """
+    Gera os chamados linha a linha (modo de referência).
+
+    Mantido como implementação de referência do modo vetorizado: usa o estado global de
+    `random` e `np.random`, sorteando cada chamado individualmente.
+    """
     data = []
-    dias_simulacao = (data_fim_simulacao - data_inicio_simulacao).days
 
     for i in range(num_chamados):
         data_abertura = data_inicio_simulacao + timedelta(days=random.randint(0, dias_simulacao))
@@ -72,38 +172,32 @@ def generate_cielo_dataset(
         servico = random.choice(SERVICOS)
 
         # Define parâmetros baseados nos cenários de ofensores
-        prob_cancelamento = PROB_CANCELAMENTO_PADRAO
-        desvio_tempo_atendimento = DESVIO_TEMPO_ATENDIMENTO_PADRAO
-        prob_prazo_limite_excedido = PROB_PRAZO_LIMITE_EXCEDIDO_PADRAO
+        prob_cancelamento = cenario['PROB_CANCELAMENTO_PADRAO']
+        desvio_tempo_atendimento = cenario['DESVIO_TEMPO_ATENDIMENTO_PADRAO']
+        prob_prazo_limite_excedido = cenario['PROB_PRAZO_LIMITE_EXCEDIDO_PADRAO']
         motivo_cancelamento_choices = list(MOTIVOS_CANCELAMENTO)
-        motivo_cancelamento_weights = [1 / len(MOTIVOS_CANCELAMENTO)] * len(MOTIVOS_CANCELAMENTO)
+        motivo_cancelamento_weights = _pesos_motivos_cancelamento(False, cenario)
 
         if local == local_ofensor:
-            prob_cancelamento = PROB_CANCELAMENTO_OFENSOR
-            desvio_tempo_atendimento += DESVIO_TEMPO_ATENDIMENTO_OFENSOR
-            prob_prazo_limite_excedido = PROB_PRAZO_LIMITE_EXCEDIDO_OFENSOR
-            if MOTIVO_CANCELAMENTO_PRINCIPAL_OFENSOR in motivo_cancelamento_choices:
-                idx = motivo_cancelamento_choices.index(MOTIVO_CANCELAMENTO_PRINCIPAL_OFENSOR)
-                principal_weight = 0.40
-                remaining_weight = 1.0 - principal_weight
-                num_other_motives = len(MOTIVOS_CANCELAMENTO) - 1
-                other_motive_weight = remaining_weight / num_other_motives if num_other_motives > 0 else 0
-                new_weights = [other_motive_weight] * len(MOTIVOS_CANCELAMENTO)
-                new_weights[idx] = principal_weight
-                motivo_cancelamento_weights = new_weights
+            prob_cancelamento = cenario['PROB_CANCELAMENTO_OFENSOR']
+            desvio_tempo_atendimento += cenario['DESVIO_TEMPO_ATENDIMENTO_OFENSOR']
+            prob_prazo_limite_excedido = cenario['PROB_PRAZO_LIMITE_EXCEDIDO_OFENSOR']
+            motivo_cancelamento_weights = _pesos_motivos_cancelamento(True, cenario)
 
         if servico == servico_deficiente:
-            prob_cancelamento = max(prob_cancelamento, PROB_CANCELAMENTO_SERVICO_DEFICIENTE)
-            desvio_tempo_atendimento += DESVIO_TEMPO_ATENDIMENTO_SERVICO_DEFICIENTE
-            prob_prazo_limite_excedido = max(prob_prazo_limite_excedido, PROB_PRAZO_LIMITE_EXCEDIDO_SERVICO_DEFICIENTE)
+            prob_cancelamento = max(prob_cancelamento, cenario['PROB_CANCELAMENTO_SERVICO_DEFICIENTE'])
+            desvio_tempo_atendimento += cenario['DESVIO_TEMPO_ATENDIMENTO_SERVICO_DEFICIENTE']
+            prob_prazo_limite_excedido = max(prob_prazo_limite_excedido,
+                                             cenario['PROB_PRAZO_LIMITE_EXCEDIDO_SERVICO_DEFICIENTE'])
 
         status = 'Cancelado' if random.random() < prob_cancelamento else 'Atendido'
         motivo_cancelamento = None
         if status == 'Cancelado':
             motivo_cancelamento = random.choices(motivo_cancelamento_choices, weights=motivo_cancelamento_weights, k=1)[0]
 
-        prazo_horas = max(0, int(np.random.normal(PRAZO_HORAS_MEDIO_PADRAO, PRAZO_HORAS_DESVIO_PADRAO)))
-        data_limite_atendimento = data_abertura + timedelta(hours=prazo_horas)
+        prazo_horas = max(0, int(np.random.normal(cenario['PRAZO_HORAS_MEDIO_PADRAO'],
+                                                  cenario['PRAZO_HORAS_DESVIO_PADRAO'])))
+        data_limite_atendimento = _somar_prazo(data_abertura, prazo_horas, cenario)
 
         tempo_atendimento_dias_base = max(0, np.random.normal(2.0, 1.0) + desvio_tempo_atendimento)
 
@@ -124,22 +218,633 @@ def generate_cielo_dataset(
             prazo_horas, entrega, PRAZO_MAXIMO_CONCORRENCIA_DIAS, EXPECTATIVA_CLIENTE_DIAS
         ])
 
-    df = pd.DataFrame(data, columns=[
-        'LOCAL', 'SERVICO', 'STATUS', 'MOTIVO_CANCELAMENTO',
-        'DATA_ABERTURA', 'DATA_ENCERRAMENTO', 'DATA_LIMITE_ATENDIMENTO',
-        'PRAZO_HORAS', 'ENTREGA', 'PRAZO_MAXIMO_CONCORRENCIA_DIAS', 'EXPECTATIVA_CLIENTE_DIAS'
-    ])
+    return compactar_chamados(pd.DataFrame(data, columns=COLUNAS))
+
+
+def _categoria(coluna, valores, indices):
+    """
+    Coluna category com o dicionário compartilhado de `coluna`, a partir dos índices sorteados em `valores`.
+
+    Índices negativos viram nulos.
+    """
+    tipo = tipo_categoria(coluna, valores)
+    codigos = tipo.categories.get_indexer(valores).astype('int8')
+    return pd.Categorical.from_codes(np.where(indices >= 0, codigos[indices], -1), dtype=tipo)
+
+
+def _dias_para_timedelta(dias):
+    """
+    Converte um array de dias fracionários em timedelta64, arredondando para microssegundos como `timedelta`.
+    """
+    return np.rint(dias * MICROSSEGUNDOS_POR_DIA).astype('int64').astype('timedelta64[us]')
+
+
+def _indice_sorteado(pesos, u):
+    """
+    Índice sorteado por `u` (uniforme em [0, 1)) na distribuição acumulada de `pesos`.
+
+    É o número de pesos acumulados <= u, o mesmo de `np.searchsorted(np.cumsum(pesos), u, side='right')`,
+    contado com uma comparação vetorizada por peso (poucos) em vez de uma busca binária por chamado.
+    """
+    return sum((acumulado <= u).view(np.int8) for acumulado in np.cumsum(pesos))
+
+
+def _sortear_base(num_chamados, data_inicio_simulacao, dias_simulacao, rng):
+    """
+    Sorteia todos os valores aleatórios de um bloco de chamados, que não dependem do cenário.
+
+    Os parâmetros do cenário só entram depois, em `_aplicar_cenario` (limiares das probabilidades,
+    deslocamentos e escala das normais). Assim, uma varredura de cenários sorteia cada bloco uma única vez, e
+    todos os cenários compartilham os mesmos números aleatórios.
+    """
+    n = num_chamados
+    inicio = np.datetime64(data_inicio_simulacao, 'us')
+    return {
+        'data_abertura': inicio + rng.integers(0, dias_simulacao, size=n, endpoint=True).astype('timedelta64[D]'),
+        'idx_local': rng.integers(0, len(BAIRROS_SP), size=n),
+        'idx_servico': rng.integers(0, len(SERVICOS), size=n),
+        'u_cancelamento': rng.random(n),
+        'u_motivo': rng.random(n),
+        # normal(media, desvio) = media + desvio × normal padrão, com os mesmos valores do sorteio direto
+        'z_prazo_horas': rng.standard_normal(n),
+        'tempo_atendimento_dias_base': rng.normal(2.0, 1.0, size=n),
+        'u_excedeu_prazo': rng.random(n),
+        'dias_atraso_apos_limite': rng.uniform(0.5, 2, size=n),
+        'dias_encerramento_cancelado': rng.uniform(0, 1.0, size=n),
+    }
+
+
+def _gerar_chamados_vetorizado(num_chamados, data_inicio_simulacao, dias_simulacao, local_ofensor,
+                               servico_deficiente, rng, cenario=CENARIO_PADRAO):
+    """
+    Gera os chamados em lote, sorteando cada coluna como um array NumPy.
+
+    Os cenários de local ofensor e serviço deficiente são aplicados como máscaras sobre os
+    arrays, reproduzindo as mesmas distribuições do modo `loop`.
+    """
+    return _aplicar_cenario(_sortear_base(num_chamados, data_inicio_simulacao, dias_simulacao, rng),
+                            local_ofensor, servico_deficiente, cenario)
+
+
+def _aplicar_cenario(base, local_ofensor, servico_deficiente, cenario=CENARIO_PADRAO):
+    """
+    Monta os chamados de um bloco a partir dos sorteios de `_sortear_base` e dos parâmetros do cenário.
+    """
+    data_abertura, idx_local, idx_servico = base['data_abertura'], base['idx_local'], base['idx_servico']
+
+    # Máscaras dos cenários de ofensores (-1 quando o valor não existe nas listas)
+    idx_ofensor = BAIRROS_SP.index(local_ofensor) if local_ofensor in BAIRROS_SP else -1
+    idx_deficiente = SERVICOS.index(servico_deficiente) if servico_deficiente in SERVICOS else -1
+    ofensor = idx_local == idx_ofensor
+    deficiente = idx_servico == idx_deficiente
+
+    prob_cancelamento = np.where(ofensor, cenario['PROB_CANCELAMENTO_OFENSOR'], cenario['PROB_CANCELAMENTO_PADRAO'])
+    prob_cancelamento = np.where(deficiente,
+                                 np.maximum(prob_cancelamento, cenario['PROB_CANCELAMENTO_SERVICO_DEFICIENTE']),
+                                 prob_cancelamento)
+    desvio_tempo_atendimento = (cenario['DESVIO_TEMPO_ATENDIMENTO_PADRAO']
+                                + ofensor * cenario['DESVIO_TEMPO_ATENDIMENTO_OFENSOR']
+                                + deficiente * cenario['DESVIO_TEMPO_ATENDIMENTO_SERVICO_DEFICIENTE'])
+    prob_prazo_limite_excedido = np.where(ofensor, cenario['PROB_PRAZO_LIMITE_EXCEDIDO_OFENSOR'],
+                                          cenario['PROB_PRAZO_LIMITE_EXCEDIDO_PADRAO'])
+    prob_prazo_limite_excedido = np.where(deficiente,
+                                          np.maximum(prob_prazo_limite_excedido,
+                                                     cenario['PROB_PRAZO_LIMITE_EXCEDIDO_SERVICO_DEFICIENTE']),
+                                          prob_prazo_limite_excedido)
+
+    cancelado = base['u_cancelamento'] < prob_cancelamento
+
+    # Sorteio ponderado dos motivos pela inversa da distribuição acumulada (equivalente a random.choices)
+    idx_motivo = np.where(ofensor,
+                          _indice_sorteado(_pesos_motivos_cancelamento(True, cenario), base['u_motivo']),
+                          _indice_sorteado(_pesos_motivos_cancelamento(False, cenario), base['u_motivo']))
+    idx_motivo = np.minimum(idx_motivo, len(MOTIVOS_CANCELAMENTO) - 1)
+
+    prazo_horas = np.maximum(0, (cenario['PRAZO_HORAS_MEDIO_PADRAO']
+                                 + cenario['PRAZO_HORAS_DESVIO_PADRAO'] * base['z_prazo_horas']).astype('int64'))
+    data_limite_atendimento = _somar_prazo(data_abertura, prazo_horas, cenario)
+
+    tempo_atendimento_dias_base = np.maximum(0, base['tempo_atendimento_dias_base'] + desvio_tempo_atendimento)
+    excedeu_prazo = base['u_excedeu_prazo'] < prob_prazo_limite_excedido
+    atraso_apos_limite = data_limite_atendimento + _dias_para_timedelta(base['dias_atraso_apos_limite'])
+
+    encerramento_atendido = data_abertura + _dias_para_timedelta(tempo_atendimento_dias_base)
+    encerramento_atendido = np.where(excedeu_prazo,
+                                     np.maximum(encerramento_atendido, atraso_apos_limite),
+                                     encerramento_atendido)
+    encerramento_atendido = np.where(encerramento_atendido < data_abertura,
+                                     data_abertura + np.timedelta64(1, 'h'),
+                                     encerramento_atendido)
+    encerramento_cancelado = data_abertura + _dias_para_timedelta(base['dias_encerramento_cancelado'])
+    data_encerramento = np.where(cancelado, encerramento_cancelado, encerramento_atendido)
+
+    # Esquema compacto: categorias com os dicionários compartilhados, PRAZO_HORAS em int16 e os
+    # benchmarks, constantes, nos metadados do DataFrame
+    df = pd.DataFrame({
+        'LOCAL': _categoria('LOCAL', BAIRROS_SP, idx_local),
+        'SERVICO': _categoria('SERVICO', SERVICOS, idx_servico),
+        'STATUS': _categoria('STATUS', STATUS, cancelado.astype('int8')),
+        'MOTIVO_CANCELAMENTO': _categoria('MOTIVO_CANCELAMENTO', MOTIVOS_CANCELAMENTO,
+                                          np.where(cancelado, idx_motivo, -1)),
+        'DATA_ABERTURA': data_abertura.astype('datetime64[ns]'),
+        'DATA_ENCERRAMENTO': data_encerramento.astype('datetime64[ns]'),
+        'DATA_LIMITE_ATENDIMENTO': data_limite_atendimento.astype('datetime64[ns]'),
+        'PRAZO_HORAS': prazo_horas.astype('int16'),
+        'ENTREGA': _categoria('ENTREGA', ['Sim', 'Não'], cancelado.astype('int8')),
+    }, columns=[coluna for coluna in COLUNAS if coluna not in COLUNAS_BENCHMARK])
+    df.attrs['benchmarks'] = dict(BENCHMARKS)
+    return df
+
+
+def _dataframe_vazio():
+    """
+    DataFrame sem linhas, com as colunas e tipos dos chamados gerados.
+    """
+    return _gerar_chamados_vetorizado(0, datetime(2000, 1, 1), 0, None, None, np.random.default_rng(0))
+
+
+def _gerar_bloco(modo, num_chamados, semente_bloco, data_inicio_simulacao, dias_simulacao,
+                 local_ofensor, servico_deficiente, cenario=CENARIO_PADRAO):
+    """
+    Gera um bloco de chamados a partir da `SeedSequence` do bloco, no modo escolhido.
+    """
+    with span('gerar_bloco', linhas=num_chamados, modo=modo):
+        if modo == 'loop':
+            estado = int(semente_bloco.generate_state(1)[0])
+            random.seed(estado)
+            np.random.seed(estado)
+            return _gerar_chamados_loop(num_chamados, data_inicio_simulacao, dias_simulacao,
+                                        local_ofensor, servico_deficiente, cenario)
+
+        rng = np.random.default_rng(semente_bloco)
+        return _gerar_chamados_vetorizado(num_chamados, data_inicio_simulacao, dias_simulacao,
+                                          local_ofensor, servico_deficiente, rng, cenario)
+
+
+def _iterar_blocos(modo, num_chamados, entropia, data_inicio_simulacao, dias_simulacao,
+                   local_ofensor, servico_deficiente, bloco_inicial=0, bloco_final=None, cenario=CENARIO_PADRAO):
+    """
+    Gera os chamados bloco a bloco; o bloco `k` usa sempre a semente `SeedSequence(entropia, spawn_key=(k,))`.
+
+    `bloco_inicial` e `bloco_final` restringem a geração a um intervalo de blocos (usado pelas partes
+    geradas em paralelo), sem alterar o conteúdo de cada bloco.
+    """
+    for k, tamanho, semente_bloco in _sementes_dos_blocos(num_chamados, entropia, bloco_inicial, bloco_final):
+        yield _gerar_bloco(modo, tamanho, semente_bloco, data_inicio_simulacao, dias_simulacao,
+                           local_ofensor, servico_deficiente, cenario)
+
+
+def _sementes_dos_blocos(num_chamados, entropia, bloco_inicial=0, bloco_final=None):
+    """
+    Índice, tamanho e `SeedSequence` de cada bloco de `TAMANHO_BLOCO_GERACAO` chamados no intervalo pedido.
+    """
+    num_blocos = _numero_de_blocos(num_chamados)
+    bloco_final = num_blocos if bloco_final is None else min(bloco_final, num_blocos)
+    for k in range(bloco_inicial, bloco_final):
+        tamanho = min(TAMANHO_BLOCO_GERACAO, num_chamados - k * TAMANHO_BLOCO_GERACAO)
+        yield k, tamanho, np.random.SeedSequence(entropia, spawn_key=(k,))
+
+
+def _numero_de_blocos(num_chamados):
+    """
+    Número de blocos de `TAMANHO_BLOCO_GERACAO` necessários para gerar `num_chamados`.
+    """
+    return -(-num_chamados // TAMANHO_BLOCO_GERACAO)
+
+
+def _reagrupar_em_chunks(blocos, chunk_size):
+    """
+    Reagrupa os blocos gerados em DataFrames de exatamente `chunk_size` linhas (o último pode ser menor).
+    """
+    pendentes = []
+    linhas_pendentes = 0
+    for bloco in blocos:
+        pendentes.append(bloco)
+        linhas_pendentes += len(bloco)
+        while linhas_pendentes >= chunk_size:
+            acumulado = pd.concat(pendentes, ignore_index=True) if len(pendentes) > 1 else pendentes[0]
+            yield acumulado.iloc[:chunk_size]
+            resto = acumulado.iloc[chunk_size:]
+            pendentes = [resto] if len(resto) else []
+            linhas_pendentes = len(resto)
+    if linhas_pendentes:
+        yield pd.concat(pendentes, ignore_index=True)
+
+
+class _EscritorArrow:
+    """
+    Grava chunks sucessivos em um único arquivo Parquet (um row group por chunk) ou Feather/Arrow IPC.
+    """
+
+    def __init__(self, output_path, formato):
+        self.output_path = output_path
+        self.formato = formato
+        self._escritor = None
 
-    output_path = f'{output_dir}/{output_filename}'
+    def gravar(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # As colunas de texto já são category com os dicionários compartilhados, gravados como dicionário
+        tabela = para_tabela_arrow(chunk)
+        if self._escritor is None:
+            if self.formato == 'parquet':
+                self._escritor = pq.ParquetWriter(self.output_path, tabela.schema, compression='zstd')
+            else:
+                opcoes = pa.ipc.IpcWriteOptions(compression='zstd')
+                self._escritor = pa.ipc.new_file(self.output_path, tabela.schema, options=opcoes)
+        self._escritor.write_table(tabela)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+class _EscritorCsv:
+    """
+    Grava chunks sucessivos em um único CSV, com cabeçalho só no primeiro.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self._com_cabecalho = True
+
+    def gravar(self, chunk):
+        # O CSV não tem metadados: os benchmarks voltam a ser colunas
+        com_colunas_benchmark(chunk).to_csv(self.output_path, index=False, mode='w' if self._com_cabecalho else 'a',
+                                            header=self._com_cabecalho)
+        self._com_cabecalho = False
+
+    def fechar(self):
+        pass
+
+
+def _abrir_escritor(output_path, formato):
+    """
+    Escritor (`gravar(chunk)` / `fechar()`) de um único arquivo no formato escolhido.
+    """
+    if formato == 'csv':
+        return _EscritorCsv(output_path)
+    if formato == 'colunar':
+        return EscritorArmazem(output_path)
+    return _EscritorArrow(output_path, formato)
+
+
+class _EscritorPartes:
+    """
+    Grava chunks sucessivos em partes `part-NNNNN.<formato>` de um diretório, com até `linhas_por_parte` linhas
+    cada (None grava tudo em uma única parte), no layout lido pelo `02_gerar_estatisticas.py`.
+    """
+
+    def __init__(self, diretorio, formato, linhas_por_parte=None):
+        self.diretorio = diretorio
+        self.formato = formato
+        self.linhas_por_parte = linhas_por_parte
+        self.num_partes = 0
+        self._escritor = None
+        self._linhas_na_parte = 0
+
+    def gravar(self, chunk):
+        inicio = 0
+        while inicio < len(chunk):
+            if self._escritor is None:
+                caminho = os.path.join(self.diretorio, f'part-{self.num_partes:05d}{FORMATOS_SAIDA[self.formato]}')
+                self._escritor = _abrir_escritor(caminho, self.formato)
+                self.num_partes += 1
+            restantes = len(chunk) if self.linhas_por_parte is None else self.linhas_por_parte - self._linhas_na_parte
+            pedaco = chunk.iloc[inicio:inicio + restantes]
+            self._escritor.gravar(pedaco)
+            self._linhas_na_parte += len(pedaco)
+            inicio += len(pedaco)
+            if self.linhas_por_parte is not None and self._linhas_na_parte >= self.linhas_por_parte:
+                self._fechar_parte()
+
+    def _fechar_parte(self):
+        if self._escritor is not None:
+            self._escritor.fechar()
+        self._escritor = None
+        self._linhas_na_parte = 0
+
+    def fechar(self):
+        if self.num_partes == 0:
+            self._escritor = _abrir_escritor(
+                os.path.join(self.diretorio, f'part-00000{FORMATOS_SAIDA[self.formato]}'), self.formato)
+            self._escritor.gravar(_dataframe_vazio())
+            self.num_partes = 1
+        self._fechar_parte()
+
+
+def _gravar_em_chunks(chunks, output_path, formato='csv'):
+    """
+    Grava os chunks em sequência no mesmo arquivo, no formato escolhido.
+
+    Returns:
+        tuple: (número de chunks gravados, primeiras linhas do arquivo para exibição).
+    """
+    amostra = None
+    num_chunks = 0
+    escritor = _abrir_escritor(output_path, formato)
+    try:
+        for chunk in chunks:
+            with span('gravar_chunk', linhas=len(chunk), formato=formato):
+                escritor.gravar(chunk)
+            if amostra is None:
+                amostra = chunk.head()  # Guarda apenas uma amostra para exibição
+            num_chunks += 1
+        if amostra is None:
+            amostra = _dataframe_vazio()
+            escritor.gravar(amostra)
+    finally:
+        escritor.fechar()
+    return num_chunks, amostra
+
+
+def _caminho_de_saida(output_dir, output_filename, formato):
+    """
+    Monta o caminho do arquivo de saída, ajustando a extensão ao formato escolhido.
+    """
+    nome, extensao = os.path.splitext(output_filename)
+    if extensao.lower() != FORMATOS_SAIDA[formato]:
+        output_filename = nome + FORMATOS_SAIDA[formato]
+    return f'{output_dir}/{output_filename}'
+
+
+def _gerar_parte(tarefa):
+    """
+    Gera e grava uma parte do dataset (intervalo de blocos) em um processo do pool.
+    """
+    (output_path, modo, num_chamados, entropia, data_inicio_simulacao, dias_simulacao,
+     local_ofensor, servico_deficiente, bloco_inicial, bloco_final, chunk_size, formato, cenario) = tarefa
+    blocos = _iterar_blocos(modo, num_chamados, entropia, data_inicio_simulacao, dias_simulacao,
+                            local_ofensor, servico_deficiente, bloco_inicial, bloco_final, cenario)
+    chunks = blocos if chunk_size is None else _reagrupar_em_chunks(blocos, chunk_size)
+    return _gravar_em_chunks(chunks, output_path, formato)
+
+
+def _gerar_em_paralelo(num_processos, output_dir, output_filename, modo, num_chamados, entropia,
+                       data_inicio_simulacao, dias_simulacao, local_ofensor, servico_deficiente, chunk_size,
+                       formato='csv', cenario=CENARIO_PADRAO):
+    """
+    Divide os blocos do dataset entre `num_processos` processos, cada um gravando a sua parte.
+
+    As partes são gravadas em `output_dir/<nome do arquivo sem extensão>/part-NNNNN.<formato>`. Como cada
+    bloco tem a sua própria semente, a concatenação das partes é idêntica à geração em um único processo.
+
+    Returns:
+        tuple: (diretório das partes, lista de caminhos das partes, primeiras linhas da primeira parte).
+    """
+    num_blocos = _numero_de_blocos(num_chamados)
+    num_partes = max(1, min(num_processos, num_blocos))
+    limites = np.linspace(0, num_blocos, num_partes + 1).astype(int)
+
+    diretorio_partes = os.path.join(output_dir, os.path.splitext(output_filename)[0])
+    os.makedirs(diretorio_partes, exist_ok=True)
+    for parte_antiga in glob.glob(os.path.join(diretorio_partes, 'part-*')):
+        if os.path.isdir(parte_antiga):
+            shutil.rmtree(parte_antiga)  # Partes do armazém colunar são diretórios
+        else:
+            os.remove(parte_antiga)
+
+    extensao = FORMATOS_SAIDA[formato]
+    caminhos = [os.path.join(diretorio_partes, f'part-{i:05d}{extensao}') for i in range(num_partes)]
+    tarefas = [
+        (caminhos[i], modo, num_chamados, entropia, data_inicio_simulacao, dias_simulacao,
+         local_ofensor, servico_deficiente, limites[i], limites[i + 1], chunk_size, formato, cenario)
+        for i in range(num_partes)
+    ]
+    # Os spans de cada parte ficam nos processos filhos; aqui mede-se o total
+    with span('gerar_em_paralelo', linhas=num_chamados, num_partes=num_partes):
+        with ProcessPoolExecutor(max_workers=num_partes) as executor:
+            resultados = list(executor.map(_gerar_parte, tarefas))
+
+    return diretorio_partes, caminhos, resultados[0][1]
+
+
+def generate_cielo_dataset(
+    num_chamados,
+    data_inicio_str,
+    data_fim_str,
+    local_ofensor,
+    servico_deficiente,
+    output_dir,
+    output_filename,
+    modo='vetorizado',
+    seed=None,
+    chunk_size=None,
+    num_processos=1,
+    formato='csv',
+    cenario=None
+):
+    """
+    Gera um dataset sintético de chamados logísticos da Cielo, simulando cenários específicos.
+
+    Args:
+        num_chamados (int): Número total de chamados a gerar.
+        data_inicio_str (str): Data de início da simulação no formato 'dd/mm/aaaa'.
+        data_fim_str (str): Data de fim da simulação no formato 'dd/mm/aaaa'.
+        local_ofensor (str): Local simulado com pior desempenho.
+        servico_deficiente (str): Serviço simulado com pior desempenho.
+        output_dir (str): Diretório para salvar o arquivo de saída.
+        output_filename (str): Nome do arquivo de saída (a extensão é ajustada ao `formato`).
+        modo (str): 'vetorizado' (padrão) sorteia todas as colunas como arrays NumPy;
+            'loop' gera chamado a chamado e serve de referência estatística.
+        seed (int, opcional): Semente para tornar a geração reprodutível.
+        chunk_size (int, opcional): Quando informado, gera e grava o arquivo em chunks desse tamanho,
+            mantendo a memória constante independentemente de `num_chamados`. O conteúdo gravado é
+            o mesmo de uma execução sem chunks com a mesma semente.
+        num_processos (int): Quando maior que 1, divide a geração entre processos; cada processo grava
+            a sua parte em `output_dir/<nome do arquivo sem extensão>/part-NNNNN.csv`. Para uma mesma
+            semente, a concatenação das partes é sempre o mesmo dataset, qualquer que seja o número de processos.
+        formato (str): 'csv' (padrão), 'parquet', 'feather' (Arrow IPC) ou 'colunar'. Parquet e Feather
+            gravam as colunas de texto como dicionário e exigem o pacote `pyarrow`; 'colunar' grava um
+            diretório com um arquivo binário por coluna, ordenado por DATA_ABERTURA e com índice por mês,
+            lido por mapeamento em memória (ver `analise_cielo.armazem`).
+        cenario (dict, opcional): Parâmetros da simulação que substituem os de `CENARIO_PADRAO` (por exemplo,
+            {'PROB_CANCELAMENTO_OFENSOR': 0.5}). Para varrer vários cenários, use `generate_cielo_scenario_sweep`.
+    """
+    if modo not in MODOS_GERACAO:
+        raise ValueError(f"Modo de geração inválido: '{modo}'. Use um de {MODOS_GERACAO}.")
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de saída inválido: '{formato}'. Use um de {tuple(FORMATOS_SAIDA)}.")
+    cenario = _cenario_completo(cenario)
+
+    # Converte strings de data para objetos datetime
+    data_inicio_simulacao = datetime.strptime(data_inicio_str, '%d/%m/%Y')
+    data_fim_simulacao = datetime.strptime(data_fim_str, '%d/%m/%Y')
+
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError(f"chunk_size deve ser positivo, recebido: {chunk_size}")
+
+    # Geração dos dados
+    dias_simulacao = (data_fim_simulacao - data_inicio_simulacao).days
+    entropia = np.random.SeedSequence(seed).entropy
     os.makedirs(output_dir, exist_ok=True)
-    df.to_csv(output_path, index=False)
+
+    with span('generate_cielo_dataset', linhas=num_chamados, modo=modo, formato=formato):
+        if num_processos > 1:
+            output_path, partes, df = _gerar_em_paralelo(
+                num_processos, output_dir, output_filename, modo, num_chamados, entropia,
+                data_inicio_simulacao, dias_simulacao, local_ofensor, servico_deficiente, chunk_size, formato, cenario
+            )
+        else:
+            output_path = _caminho_de_saida(output_dir, output_filename, formato)
+            blocos = _iterar_blocos(modo, num_chamados, entropia, data_inicio_simulacao, dias_simulacao,
+                                    local_ofensor, servico_deficiente, cenario=cenario)
+            if chunk_size is None:
+                with span('gerar', linhas=num_chamados):
+                    df = pd.concat(blocos, ignore_index=True) if num_chamados > 0 else _dataframe_vazio()
+                _gravar_em_chunks([df], output_path, formato)
+            else:
+                num_chunks, df = _gravar_em_chunks(_reagrupar_em_chunks(blocos, chunk_size), output_path,
+                                                   formato)
 
     print(f"Dataset de {num_chamados} chamados gerado com sucesso em '{output_path}'")
     print(f"Período de simulação: {data_inicio_simulacao.strftime('%d/%m/%Y')} a {data_fim_simulacao.strftime('%d/%m/%Y')}")
     print("\nPrimeiras 5 linhas do DataFrame:")
     print(df.head())
-    print("\nInformações do DataFrame:")
-    df.info()
+    if num_processos > 1:
+        print(f"\nArquivo gravado em {len(partes)} partes geradas em paralelo.")
+    elif chunk_size is None:
+        print("\nInformações do DataFrame:")
+        df.info()
+    else:
+        print(f"\nArquivo gravado em {num_chunks} chunks de até {chunk_size} linhas.")
+
+
+def generate_cielo_scenario_sweep(
+    num_chamados,
+    data_inicio_str,
+    data_fim_str,
+    local_ofensor,
+    servico_deficiente,
+    output_dir,
+    cenarios,
+    seed=None,
+    linhas_por_parte=LINHAS_POR_PARTE_VARREDURA,
+    formato='parquet'
+):
+    """
+    Gera um dataset para cada cenário de `cenarios` em uma única execução, com os sorteios compartilhados.
+
+    Cada bloco de chamados é sorteado uma única vez (`_sortear_base`: datas de abertura, locais, serviços e os
+    demais números aleatórios), e cada cenário só aplica os seus parâmetros sobre esses sorteios. O cenário `i`
+    é idêntico ao gerado por `generate_cielo_dataset` com a mesma semente e `cenario=cenarios[i]`, e as
+    diferenças entre os cenários refletem apenas os parâmetros, não o acaso dos sorteios.
+
+    Args:
+        num_chamados, data_inicio_str, data_fim_str, local_ofensor, servico_deficiente: Como em
+            `generate_cielo_dataset`, comuns a todos os cenários.
+        output_dir (str): Diretório da varredura. Cada cenário é gravado em `cenario-NNN/` como partes
+            `part-NNNNN.<formato>` (o diretório pode ser analisado diretamente pelo `02_gerar_estatisticas.py`),
+            com os seus parâmetros em `cenario-NNN/cenario.json`; `varredura.json` lista todos os cenários.
+        cenarios (list): Cenários, cada um um dict com parâmetros de `CENARIO_PADRAO` (ver `grade_de_cenarios`).
+        seed (int, opcional): Semente, comum a todos os cenários.
+        linhas_por_parte (int, opcional): Máximo de linhas por parte; None grava cada cenário em uma única parte.
+        formato (str): 'parquet' (padrão), 'feather', 'csv' ou 'colunar'.
+
+    Returns:
+        list: Diretórios dos cenários, na ordem de `cenarios`.
+    """
+    if formato not in FORMATOS_SAIDA:
+        raise ValueError(f"Formato de saída inválido: '{formato}'. Use um de {tuple(FORMATOS_SAIDA)}.")
+    if linhas_por_parte is not None and linhas_por_parte <= 0:
+        raise ValueError(f"linhas_por_parte deve ser positivo, recebido: {linhas_por_parte}")
+    completos = [_cenario_completo(cenario) for cenario in cenarios]
+
+    data_inicio_simulacao = datetime.strptime(data_inicio_str, '%d/%m/%Y')
+    dias_simulacao = (datetime.strptime(data_fim_str, '%d/%m/%Y') - data_inicio_simulacao).days
+    entropia = np.random.SeedSequence(seed).entropy
+
+    # Cenários de uma varredura anterior no mesmo diretório não devem se misturar aos novos
+    os.makedirs(output_dir, exist_ok=True)
+    for diretorio_antigo in glob.glob(os.path.join(output_dir, PREFIXO_DIRETORIO_CENARIO + '*')):
+        shutil.rmtree(diretorio_antigo)
+    diretorios, indice = [], []
+    for i, (cenario, completo) in enumerate(zip(cenarios, completos)):
+        diretorio = os.path.join(output_dir, f'{PREFIXO_DIRETORIO_CENARIO}{i:03d}')
+        os.makedirs(diretorio)
+        parametros = {
+            'cenario': i, 'sobrescritos': dict(cenario), 'parametros': completo, 'num_chamados': num_chamados,
+            'data_inicio': data_inicio_str, 'data_fim': data_fim_str, 'local_ofensor': local_ofensor,
+            'servico_deficiente': servico_deficiente, 'semente': entropia, 'formato': formato,
+        }
+        with open(os.path.join(diretorio, ARQUIVO_PARAMETROS_CENARIO), 'w', encoding='utf-8') as arquivo:
+            json.dump(parametros, arquivo, ensure_ascii=False, indent=2)
+        diretorios.append(diretorio)
+        indice.append({'cenario': i, 'diretorio': os.path.basename(diretorio), 'sobrescritos': dict(cenario)})
+
+    escritores = [_EscritorPartes(diretorio, formato, linhas_por_parte) for diretorio in diretorios]
+    with span('generate_cielo_scenario_sweep', linhas=num_chamados, cenarios=len(cenarios), formato=formato):
+        try:
+            for _, tamanho, semente_bloco in _sementes_dos_blocos(num_chamados, entropia):
+                with span('sortear_base', linhas=tamanho):
+                    base = _sortear_base(tamanho, data_inicio_simulacao, dias_simulacao,
+                                         np.random.default_rng(semente_bloco))
+                for escritor, completo in zip(escritores, completos):
+                    with span('aplicar_cenario', linhas=tamanho):
+                        chunk = _aplicar_cenario(base, local_ofensor, servico_deficiente, completo)
+                    with span('gravar_chunk', linhas=tamanho, formato=formato):
+                        escritor.gravar(chunk)
+        finally:
+            for escritor in escritores:
+                escritor.fechar()
+
+    with open(os.path.join(output_dir, ARQUIVO_INDICE_VARREDURA), 'w', encoding='utf-8') as arquivo:
+        json.dump({'num_chamados': num_chamados, 'semente': entropia, 'formato': formato, 'cenarios': indice},
+                  arquivo, ensure_ascii=False, indent=2)
+
+    print(f"Varredura de {len(cenarios)} cenários com {num_chamados} chamados cada gerada em '{output_dir}'")
+    for registro, escritor in zip(indice, escritores):
+        print(f"  {registro['diretorio']} ({escritor.num_partes} partes): {registro['sobrescritos'] or 'padrão'}")
+    return diretorios
+
+
+def generate_cielo_event_stream(
+    num_chamados,
+    data_inicio_str,
+    data_fim_str,
+    local_ofensor,
+    servico_deficiente,
+    destino,
+    velocidade=None,
+    seed=None,
+    cenario=None
+):
+    """
+    Gera os chamados em memória e os transmite como eventos de abertura e de encerramento, em ordem cronológica
+    (ver `analise_cielo.tempo_real.transmitir_eventos`), em vez de gravar um arquivo.
+
+    Args:
+        num_chamados, data_inicio_str, data_fim_str, local_ofensor, servico_deficiente, seed, cenario: Como em
+            `generate_cielo_dataset` (modo vetorizado); com a mesma semente, os eventos são os do mesmo dataset.
+        destino (str): 'tcp://host:porta' (um consumidor escutando, como `consumir_eventos`), '-' (stdout,
+            para um pipe) ou o caminho de um arquivo .jsonl.
+        velocidade (float, opcional): Segundos simulados por segundo real (3600 = uma hora por segundo);
+            None transmite o mais rápido possível.
+
+    Returns:
+        int: Número de eventos transmitidos.
+    """
+    # Importados aqui: só a transmissão de eventos precisa do asyncio
+    import asyncio
+    from analise_cielo.tempo_real import transmitir_eventos
+
+    cenario = _cenario_completo(cenario)
+    data_inicio_simulacao = datetime.strptime(data_inicio_str, '%d/%m/%Y')
+    dias_simulacao = (datetime.strptime(data_fim_str, '%d/%m/%Y') - data_inicio_simulacao).days
+    entropia = np.random.SeedSequence(seed).entropy
+
+    with span('generate_cielo_event_stream', linhas=num_chamados):
+        with span('gerar', linhas=num_chamados):
+            blocos = _iterar_blocos('vetorizado', num_chamados, entropia, data_inicio_simulacao, dias_simulacao,
+                                    local_ofensor, servico_deficiente, cenario=cenario)
+            df = pd.concat(blocos, ignore_index=True) if num_chamados > 0 else _dataframe_vazio()
+        num_eventos = asyncio.run(transmitir_eventos(df, destino, velocidade=velocidade))
+
+    # As mensagens vão para o stderr, para não se misturarem aos eventos quando o destino é o stdout
+    print(f"{num_eventos} eventos de {num_chamados} chamados transmitidos para '{destino}'", file=sys.stderr)
+    return num_eventos
+
 
 if __name__ == "__main__":
     # Configurações globais para execução direta
@@ -150,14 +855,61 @@ if __name__ == "__main__":
     SERVICO_DEFICIENTE_GLOBAL = 'Manutenção'
     OUTPUT_DIR_GLOBAL = 'input'
     OUTPUT_FILENAME_GLOBAL = 'dataset_cielo.csv'
+    MODO_GERACAO_GLOBAL = 'vetorizado'  # 'vetorizado' ou 'loop' (referência)
+    SEED_GLOBAL = None
+    CHUNK_SIZE_GLOBAL = None  # Ex.: 1_000_000 para gerar em streaming com memória constante
+    NUM_PROCESSOS_GLOBAL = 1  # Ex.: os.cpu_count() para gerar as partes em paralelo
+    FORMATO_SAIDA_GLOBAL = 'csv'  # 'csv', 'parquet', 'feather' ou 'colunar'
+    TRACE_GLOBAL = None  # Ex.: 'output/trace_geracao.json' para medir tempo e memória de cada fase
+    CENARIO_GLOBAL = None  # Ex.: {'PROB_CANCELAMENTO_OFENSOR': 0.5} para alterar parâmetros de CENARIO_PADRAO
+    # Ex.: {'PROB_CANCELAMENTO_OFENSOR': [0.2, 0.35, 0.5], 'PRAZO_HORAS_MEDIO_PADRAO': [24, 48]} para gerar
+    # um dataset por combinação em 'input/varredura' (partes em Parquet), em vez do dataset único
+    GRADE_CENARIOS_GLOBAL = None
+    # Ex.: 'tcp://127.0.0.1:8765', '-' (stdout) ou 'output/eventos.jsonl' para transmitir os chamados como
+    # eventos de abertura e de encerramento, em vez de gravar o dataset
+    DESTINO_EVENTOS_GLOBAL = None
+    VELOCIDADE_EVENTOS_GLOBAL = None  # Ex.: 3600 para reproduzir uma hora simulada por segundo
+
+    if TRACE_GLOBAL is not None:
+        ativar(TRACE_GLOBAL)  # O trace é gravado ao fim do processo
 
-    # Chama a função principal de geração de dataset
-    generate_cielo_dataset(
-        num_chamados=NUM_CHAMADOS_GLOBAL,
-        data_inicio_str=DATA_INICIO_SIMULACAO_GLOBAL_STR,
-        data_fim_str=DATA_FIM_SIMULACAO_GLOBAL_STR,
-        local_ofensor=LOCAL_OFENSOR_GLOBAL,
-        servico_deficiente=SERVICO_DEFICIENTE_GLOBAL,
-        output_dir=OUTPUT_DIR_GLOBAL,
-        output_filename=OUTPUT_FILENAME_GLOBAL
-    )
+    if GRADE_CENARIOS_GLOBAL is not None:
+        generate_cielo_scenario_sweep(
+            num_chamados=NUM_CHAMADOS_GLOBAL,
+            data_inicio_str=DATA_INICIO_SIMULACAO_GLOBAL_STR,
+            data_fim_str=DATA_FIM_SIMULACAO_GLOBAL_STR,
+            local_ofensor=LOCAL_OFENSOR_GLOBAL,
+            servico_deficiente=SERVICO_DEFICIENTE_GLOBAL,
+            output_dir=os.path.join(OUTPUT_DIR_GLOBAL, 'varredura'),
+            cenarios=[{**(CENARIO_GLOBAL or {}), **cenario} for cenario in grade_de_cenarios(GRADE_CENARIOS_GLOBAL)],
+            seed=SEED_GLOBAL,
+        )
+    elif DESTINO_EVENTOS_GLOBAL is not None:
+        generate_cielo_event_stream(
+            num_chamados=NUM_CHAMADOS_GLOBAL,
+            data_inicio_str=DATA_INICIO_SIMULACAO_GLOBAL_STR,
+            data_fim_str=DATA_FIM_SIMULACAO_GLOBAL_STR,
+            local_ofensor=LOCAL_OFENSOR_GLOBAL,
+            servico_deficiente=SERVICO_DEFICIENTE_GLOBAL,
+            destino=DESTINO_EVENTOS_GLOBAL,
+            velocidade=VELOCIDADE_EVENTOS_GLOBAL,
+            seed=SEED_GLOBAL,
+            cenario=CENARIO_GLOBAL
+        )
+    else:
+        # Chama a função principal de geração de dataset
+        generate_cielo_dataset(
+            num_chamados=NUM_CHAMADOS_GLOBAL,
+            data_inicio_str=DATA_INICIO_SIMULACAO_GLOBAL_STR,
+            data_fim_str=DATA_FIM_SIMULACAO_GLOBAL_STR,
+            local_ofensor=LOCAL_OFENSOR_GLOBAL,
+            servico_deficiente=SERVICO_DEFICIENTE_GLOBAL,
+            output_dir=OUTPUT_DIR_GLOBAL,
+            output_filename=OUTPUT_FILENAME_GLOBAL,
+            modo=MODO_GERACAO_GLOBAL,
+            seed=SEED_GLOBAL,
+            chunk_size=CHUNK_SIZE_GLOBAL,
+            num_processos=NUM_PROCESSOS_GLOBAL,
+            formato=FORMATO_SAIDA_GLOBAL,
+            cenario=CENARIO_GLOBAL
+        )
@@ -1,443 +1,255 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import os
 
+# O matplotlib e o seaborn só são importados quando há gráficos a desenhar (ver `_exibir_ou_gravar_graficos`)
+from analise_cielo import (
+    carregar_chamados, resumir_chunk, resumir_em_chunks, atualizar_estado_incremental, calcular_metricas,
+    imprimir_visao_geral, imprimir_visao_geral_resumida, imprimir_relatorio, amostrar_em_chunks,
+    estimar_metricas, imprimir_relatorio_aproximado, converter_para_armazem, gravar_cubo, resolver_calendario,
+)
+from analise_cielo import chave_cache, ler_cache, gravar_cache
+from analise_cielo import span, ativar, gravar_trace
+from analise_cielo.incremental import CHUNK_SIZE_INCREMENTAL
+from analise_cielo.amostragem import CHUNK_SIZE_AMOSTRAGEM
+from analise_cielo.armazem import ARQUIVO_INDICE
+from analise_cielo.carregamento import listar_arquivos
 
-def analyze_cielo_data(filepath):
+
+def _ler_do_cache(diretorio_cache, chave, nome):
+    return ler_cache(diretorio_cache, chave, nome) if chave is not None else None
+
+
+def _gravar_no_cache(diretorio_cache, chave, nome, item):
+    if chave is not None:
+        gravar_cache(diretorio_cache, chave, nome, item)
+
+
+def _imprimir_arquivo_nao_encontrado(filepath):
+    print(f"Erro: O arquivo '{filepath}' não foi encontrado.")
+    print("Certifique-se de que o script '01_gerar_arquivos_de_exemplos.py' foi executado e gerou o arquivo.")
+
+
+def _preparar_armazem(filepath, armazem, formatos_datas):
     """
-    Realiza a análise exploratória dos dados de chamados da Cielo.
+    Converte o dataset para o armazém colunar quando o armazém não existe ou é mais antigo que o dataset.
+    """
+    modificacao = max(os.path.getmtime(arquivo) for arquivo in listar_arquivos(filepath))
+    indice = os.path.join(armazem, ARQUIVO_INDICE)
+    if not os.path.exists(indice) or os.path.getmtime(indice) < modificacao:
+        converter_para_armazem(filepath, armazem, formatos_datas=formatos_datas)
+        print(f"Dataset convertido para o armazém colunar '{armazem}'.")
+    return armazem
+
+
+def _exibir_ou_gravar_graficos(metricas, diretorio_graficos, num_processos):
     """
+    Imprime o relatório com os gráficos: exibidos na tela, junto de cada seção, ou gravados em PNG.
+    """
+    import matplotlib.pyplot as plt
+    from analise_cielo.graficos import preparar_graficos, exibir_grafico, renderizar_graficos
+
+    if diretorio_graficos is not None:
+        # Backend não interativo: nenhuma janela é aberta e `plt.show()` não bloqueia
+        plt.switch_backend('Agg')
     plt.style.use('seaborn-v0_8')
 
+    graficos = preparar_graficos(metricas)
+    if diretorio_graficos is None:
+        with span('relatorio'):
+            imprimir_relatorio(metricas, grafico=lambda nome: exibir_grafico(nome, graficos[nome]))
+    else:
+        with span('relatorio'):
+            imprimir_relatorio(metricas)
+        arquivos = renderizar_graficos(graficos, diretorio_graficos, num_processos)
+        print(f"\n{len(arquivos)} gráficos gravados em '{diretorio_graficos}'.")
+
+
+def _imprimir_conclusao(trace):
+    print(f"\n{'#' * 30}\n# Fim da Análise Exploratória\n{'#' * 30}")
+    print("Revise os gráficos e as estatísticas para identificar padrões e possíveis problemas.")
+    print("As análises acima fornecem subsídios para responder às perguntas guias do desafio.")
+    if trace is not None:
+        print(f"Trace das etapas gravado em '{gravar_trace()}'.")
+
+
+def _analisar_aproximado(filepath, chunk_size, formatos_datas, num_processos, periodo, calendario):
+    """
+    Modo aproximado: uma passada pelo dataset monta a amostra estratificada e os esboços de quantis, e o
+    relatório traz apenas as estimativas, com intervalos de confiança (sem visão geral nem gráficos).
+    """
+    resumo_amostral = amostrar_em_chunks(filepath, chunk_size or CHUNK_SIZE_AMOSTRAGEM,
+                                         formatos_datas=formatos_datas, num_processos=num_processos,
+                                         periodo=periodo, calendario=calendario)
+    print("Dados amostrados com sucesso!")
+    print(f"Total de linhas no dataset: {resumo_amostral['linhas']}")
+    with span('relatorio'):
+        imprimir_relatorio_aproximado(estimar_metricas(resumo_amostral))
+
+
+def analyze_cielo_data(filepath, chunk_size=None, estado_incremental=None, diretorio_graficos=None,
+                       num_processos=1, diretorio_cache=None, trace=None, formatos_datas=None, aproximado=False,
+                       periodo=None, armazem=None, com_graficos=True, cubo=None, calendario=None):
+    """
+    Realiza a análise exploratória dos dados de chamados da Cielo.
+
+    Interface de linha de comando sobre o pacote `analise_cielo`: carrega o dataset, calcula as métricas,
+    imprime o relatório e exibe (ou grava) os gráficos.
+
+    Args:
+        filepath (str): Arquivo do dataset (CSV, Parquet ou Feather) ou diretório com as partes.
+        chunk_size (int, opcional): Quando informado, lê o dataset em chunks desse tamanho e combina
+            agregados parciais, com memória limitada ao tamanho do chunk. As estatísticas e os gráficos
+            são os mesmos da análise em memória; a visão geral é montada a partir dos resumos das colunas.
+        estado_incremental (str, opcional): Arquivo de estado do modo incremental. Quando informado, só os
+            chamados novos (DATA_ABERTURA posterior à marca d'água do estado) são lidos e combinados aos
+            agregados persistidos; o relatório cobre todo o histórico. Ver `atualizar_estado_incremental`.
+        diretorio_graficos (str, opcional): Modo sem interface gráfica. Em vez de exibir cada gráfico em uma
+            janela, grava todos como PNG nesse diretório, com os nomes estáveis de `GRAFICOS`.
+        num_processos (int): Número de processos. Nos modos em chunks e aproximado, as partições do dataset
+            são lidas e resumidas em paralelo (ver `resumir_em_chunks`); no modo sem interface gráfica, os
+            gráficos são renderizados em paralelo.
+        diretorio_cache (str, opcional): Diretório do cache em disco (ver `analise_cielo.cache`). Com o
+            arquivo de entrada e a versão da análise inalterados, o dataset tipado é lido do cache em
+            Feather (sem parsing do CSV) e as métricas não são recalculadas; no modo em chunks, o dataset
+            nem é lido. Não se aplica ao modo incremental, que já mantém seu próprio estado.
+        trace (str, opcional): Arquivo JSON onde gravar o trace das etapas (tempo, linhas e memória de
+            cada span; ver `analise_cielo.instrumentacao`). Também pode ser ligado pela variável de
+            ambiente CIELO_TRACE. Desligado, o custo da instrumentação é desprezível.
+        formatos_datas (dict, opcional): Formato `strftime` das colunas de data do CSV, por coluna. Colunas
+            omitidas são lidas como ISO 8601 (o formato gravado pelo gerador); valores que não sejam ISO 8601
+            caem na inferência com dia antes do mês.
+        aproximado (bool): Modo aproximado, para exploração rápida de extrações grandes. Lê o dataset uma vez,
+            em chunks (`chunk_size`) e apenas com as colunas necessárias, mantendo uma amostra estratificada
+            por LOCAL × SERVICO; imprime taxa de cancelamento, percentual no prazo e tempo médio com
+            intervalos de confiança, e quantis de esboços com erro limitado. Ver `analise_cielo.amostragem`.
+        periodo (tuple, opcional): `(inicio, fim)` de DATA_ABERTURA a analisar, com fim exclusivo; por exemplo,
+            ('2025-03-01', '2025-05-01') para março e abril. Do armazém colunar, só os bytes desses meses são
+            lidos; dos demais formatos, o dataset é lido e filtrado. Não se aplica ao modo incremental.
+        armazem (str, opcional): Diretório do armazém colunar (ver `analise_cielo.armazem`). O dataset é
+            convertido para ele na primeira execução (e sempre que for modificado depois da conversão), e a
+            análise passa a ler do armazém.
+        com_graficos (bool): Com False, imprime apenas o relatório em texto, sem gráficos; o matplotlib e o
+            seaborn nem são importados, o que encurta a partida de execuções agendadas.
+        cubo (str, opcional): Arquivo onde gravar o cubo LOCAL × SERVICO × mês (ver `analise_cielo.cubo`), para
+            detalhar qualquer recorte depois, em milissegundos, sem reler o dataset. Não se aplica ao modo
+            aproximado.
+        calendario (str ou CalendarioSLA, opcional): Calendário dos tempos do SLA (ver `analise_cielo.sla`).
+            None ou 'corridos' conta as horas corridas; 'uteis' conta só as horas dos dias úteis, sem fins de
+            semana nem feriados nacionais, e um `CalendarioSLA` permite outros feriados. Tempo de atendimento,
+            dias em relação ao prazo e atraso médio passam a ser medidos nesse calendário.
+    """
+    calendario = resolver_calendario(calendario)
+    if periodo is not None and estado_incremental is not None:
+        raise ValueError("O período não se aplica ao modo incremental, que acompanha todo o histórico.")
+    if trace is not None:
+        ativar(trace)
+
+    if calendario is not None:
+        print("Tempos do SLA contados em dias úteis (sem fins de semana e feriados).")
+
+    if armazem is not None:
+        try:
+            filepath = _preparar_armazem(filepath, armazem, formatos_datas)
+        except FileNotFoundError:
+            _imprimir_arquivo_nao_encontrado(filepath)
+            return
+
+    if aproximado:
+        try:
+            _analisar_aproximado(filepath, chunk_size, formatos_datas, num_processos, periodo, calendario)
+        except FileNotFoundError:
+            _imprimir_arquivo_nao_encontrado(filepath)
+            return
+        _imprimir_conclusao(trace)
+        return
+
     # Carregar os dados
     try:
-        df = pd.read_csv(filepath, sep=',',
-                         parse_dates=['DATA_ABERTURA', 'DATA_ENCERRAMENTO', 'DATA_LIMITE_ATENDIMENTO'],
-                         dayfirst=True)
+        if estado_incremental is not None:
+            estado, linhas_novas = atualizar_estado_incremental(filepath, estado_incremental,
+                                                                chunk_size or CHUNK_SIZE_INCREMENTAL,
+                                                                formatos_datas, calendario)
+            resumo, resumo_colunas, primeiras_linhas = (estado['resumo'], estado['resumo_colunas'],
+                                                        estado['primeiras_linhas'])
+            print(f"Chamados novos incorporados ao estado: {linhas_novas} "
+                  f"(marca d'água: {estado['marca_dagua']})")
+            if resumo is None:
+                # Nenhum chamado incorporado até aqui: o estado é gravado, mas não há métricas a calcular
+                print("Nenhum chamado no dataset: não há estatísticas a calcular.")
+                return
+            total_linhas = resumo['linhas']
+            metricas = calcular_metricas(resumo)
+        else:
+            chave = (chave_cache(filepath, periodo=periodo, calendario=calendario, formatos_datas=formatos_datas)
+                     if diretorio_cache is not None else None)
+            metricas = _ler_do_cache(diretorio_cache, chave, 'metricas')
+            if chunk_size is None:
+                df = _ler_do_cache(diretorio_cache, chave, 'chamados')
+                if df is None:
+                    df = carregar_chamados(filepath, formatos_datas, periodo)
+                    _gravar_no_cache(diretorio_cache, chave, 'chamados', df)
+                total_linhas = len(df)
+            else:
+                colunas = _ler_do_cache(diretorio_cache, chave, 'colunas')
+                if metricas is None or colunas is None:
+                    resumo, resumo_colunas, primeiras_linhas = resumir_em_chunks(filepath, chunk_size,
+                                                                                 formatos_datas, num_processos,
+                                                                                 periodo, calendario)
+                    metricas = calcular_metricas(resumo)
+                    _gravar_no_cache(diretorio_cache, chave, 'colunas', (resumo_colunas, primeiras_linhas))
+                    _gravar_no_cache(diretorio_cache, chave, 'metricas', metricas)
+                else:
+                    resumo_colunas, primeiras_linhas = colunas
+                total_linhas = metricas['linhas']
         print("Dados carregados com sucesso!")
-        print(f"Total de linhas no dataset: {len(df)}")
+        print(f"Total de linhas no dataset: {total_linhas}")
     except FileNotFoundError:
-        print(f"Erro: O arquivo '{filepath}' não foi encontrado.")
-        print("Certifique-se de que o script '01_gerar_arquivos_de_exemplos.py' foi executado e gerou o arquivo.")
+        _imprimir_arquivo_nao_encontrado(filepath)
         return
 
     # Resumo Geral do Dataset
-    print(f"\n{'#' * 30}\n# Visão Geral do Dataset\n{'#' * 30}")
-    print(df.head())
-    print("\nInformações do DataFrame:")
-    df.info()
-    print("\nEstatísticas Descritivas:")
-    print(df.describe(include='all'))
-    print("\nValores Nulos por Coluna:")
-    print(df.isnull().sum())
-
-    # Análise da Distribuição por LOCAL
-    print(f"\n{'#' * 30}\n# Análise por LOCAL\n{'#' * 30}")
-    print("Contagem de chamados por LOCAL:")
-    print(df['LOCAL'].value_counts())
-    plt.figure(figsize=(12, 7))
-    ax = sns.countplot(data=df, x='LOCAL', order=df['LOCAL'].value_counts().index, palette='viridis')
-    plt.title('Chamados por Local de Atendimento')
-    plt.xlabel('Local')
-    plt.ylabel('Quantidade de Chamados')
-    plt.xticks(rotation=45, ha='right')
-    # Adiciona os valores nas barras
-    for p in ax.patches:
-        ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Análise da Distribuição por SERVICO
-    print(f"\n{'#' * 30}\n# Análise por SERVICO\n{'#' * 30}")
-    print("Contagem de chamados por SERVICO:")
-    print(df['SERVICO'].value_counts())
-    plt.figure(figsize=(8, 6))
-    ax = sns.countplot(data=df, x='SERVICO', order=df['SERVICO'].value_counts().index, palette='viridis')
-    plt.title('Chamados por Tipo de Serviço')
-    plt.xlabel('Serviço')
-    plt.ylabel('Quantidade de Chamados')
-    # Adiciona os valores nas barras
-    for p in ax.patches:
-        ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Análise da Distribuição por STATUS
-    print(f"\n{'#' * 30}\n# Análise por STATUS\n{'#' * 30}")
-    print("Contagem de chamados por STATUS:")
-    print(df['STATUS'].value_counts())
-    plt.figure(figsize=(8, 6))
-    ax = sns.countplot(data=df, x='STATUS', order=df['STATUS'].value_counts().index, palette='viridis')
-    plt.title('Distribuição de Status dos Chamados')
-    plt.xlabel('Status')
-    plt.ylabel('Quantidade de Chamados')
-    # Adiciona os valores nas barras
-    for p in ax.patches:
-        ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Análise dos Motivos de Cancelamento
-    print(f"\n{'#' * 30}\n# Análise de Motivos de Cancelamento\n{'#' * 30}")
-    if 'MOTIVO_CANCELAMENTO' in df.columns:
-        cancelados = df[df['STATUS'] == 'Cancelado'].copy()
-        if not cancelados.empty:
-            print("Contagem de motivos de cancelamento:")
-            print(cancelados['MOTIVO_CANCELAMENTO'].value_counts())
-            plt.figure(figsize=(10, 7))
-            ax = sns.countplot(data=cancelados, y='MOTIVO_CANCELAMENTO',
-                               order=cancelados['MOTIVO_CANCELAMENTO'].value_counts().index, palette='viridis')
-            plt.title('Motivos de Cancelamento Mais Comuns')
-            plt.xlabel('Quantidade de Chamados Cancelados')
-            plt.ylabel('Motivo de Cancelamento')
-            # Adiciona os valores nas barras
-            for p in ax.patches:
-                ax.annotate(f'{int(p.get_width())}', (p.get_width(), p.get_y() + p.get_height() / 2.),
-                            ha='left', va='center', xytext=(5, 0), textcoords='offset points')
-            plt.tight_layout()
-            plt.show()
+    with span('visao_geral', linhas=total_linhas):
+        if chunk_size is None and estado_incremental is None:
+            imprimir_visao_geral(df)
         else:
-            print("Não há chamados com status 'Cancelado' para analisar motivos.")
-    else:
-        print("Coluna 'MOTIVO_CANCELAMENTO' não encontrada no dataset.")
-
-    # Cálculo e Análise do Tempo de Atendimento
-    print(f"\n{'#' * 30}\n# Análise do Tempo de Atendimento\n{'#' * 30}")
-    df['TEMPO_ATENDIMENTO_DIAS'] = (df['DATA_ENCERRAMENTO'] - df['DATA_ABERTURA']).dt.days
-
-    # Filtra chamados 'Atendido' para análise de tempo
-    atendidos = df[df['STATUS'] == 'Atendido'].copy()
-    if not atendidos.empty and 'TEMPO_ATENDIMENTO_DIAS' in atendidos.columns:
-        print("Estatísticas do TEMPO_ATENDIMENTO_DIAS (Chamados 'Atendido'):")
-        tempo_atendimento_media = atendidos['TEMPO_ATENDIMENTO_DIAS'].dropna().mean()
-        print(atendidos['TEMPO_ATENDIMENTO_DIAS'].dropna().describe())
-        print(f"Média do Tempo de Atendimento: {tempo_atendimento_media:.2f} dias")
-
-        plt.figure(figsize=(10, 6))
-        # Removido 'kde=True' para não gerar a linha azul
-        ax = sns.histplot(atendidos['TEMPO_ATENDIMENTO_DIAS'].dropna(), bins=20, palette='viridis')
-        plt.title('Distribuição do Tempo de Atendimento (Dias) para Chamados Atendidos')
-        plt.xlabel('Tempo de Atendimento (Dias)')
-        plt.ylabel('Frequência')
-        plt.tight_layout()
-
-        # Adiciona linha da média
-        plt.axvline(tempo_atendimento_media, color='red', linestyle='--',
-                    label=f'Média: {tempo_atendimento_media:.2f} dias')
-        plt.legend()
-
-        # Adiciona os valores nas barras do histograma
-        for p in ax.patches:
-            height = p.get_height()
-            if height > 0:  # Anota apenas barras com altura > 0
-                ax.annotate(f'{int(height)}', (p.get_x() + p.get_width() / 2., height),
-                            ha='center', va='center', xytext=(0, 5), textcoords='offset points', fontsize=8)
-        plt.show()
-    else:
-        print("Não há chamados 'Atendido' ou a coluna 'TEMPO_ATENDIMENTO_DIAS' não pôde ser calculada.")
-
-    # Análise do Cumprimento do Prazo Máximo para Encerramento
-    print(f"\n{'#' * 30}\n# Análise do Cumprimento do Prazo Máximo para Encerramento\n{'#' * 30}")
-    if 'DATA_LIMITE_ATENDIMENTO' in df.columns and 'DATA_ENCERRAMENTO' in df.columns:
-        atendidos_prazo = df[df['STATUS'] == 'Atendido'].copy()
-        if not atendidos_prazo.empty:
-            atendidos_prazo['DENTRO_DO_PRAZO_LIMITE'] = atendidos_prazo['DATA_ENCERRAMENTO'] <= atendidos_prazo[
-                'DATA_LIMITE_ATENDIMENTO']
-
-            pct_dentro_prazo = atendidos_prazo['DENTRO_DO_PRAZO_LIMITE'].mean() * 100
-            print(
-                f"Percentual de chamados 'Atendido' dentro do Prazo Máximo para Encerramento: {pct_dentro_prazo:.2f}%")
-
-            plt.figure(figsize=(8, 6))
-            ax = sns.countplot(data=atendidos_prazo, x='DENTRO_DO_PRAZO_LIMITE', palette='viridis')
-            plt.title('Cumprimento do Prazo Máximo para Encerramento para Chamados Atendidos')
-            plt.xlabel('Dentro do Prazo Limite')
-            plt.ylabel('Quantidade de Chamados')
-            plt.xticks([0, 1], ['Não (Excedido)', 'Sim (No Prazo)'])
-            # Adiciona os valores nas barras
-            for p in ax.patches:
-                ax.annotate(f'{int(p.get_height())}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                            ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-            plt.tight_layout()
-            plt.show()
-
-            # Análise do tempo de atraso/adiantamento em relação ao Prazo Limite
-            atendidos_prazo['DIAS_EM_RELACAO_AO_PRAZO_LIMITE'] = (
-                    atendidos_prazo['DATA_ENCERRAMENTO'] - atendidos_prazo['DATA_LIMITE_ATENDIMENTO']).dt.days
-
-            # Calcula a média dos dias em relação ao prazo limite
-            media_dias_em_relacao_prazo = atendidos_prazo['DIAS_EM_RELACAO_AO_PRAZO_LIMITE'].dropna().mean()
-
-            print("\nEstatísticas dos DIAS_EM_RELACAO_AO_PRAZO_LIMITE (positivo = atraso, negativo = adiantamento):")
-            print(atendidos_prazo['DIAS_EM_RELACAO_AO_PRAZO_LIMITE'].dropna().describe())
-            print(f"Média de Dias em Relação ao Prazo Limite: {media_dias_em_relacao_prazo:.2f} dias")  # Mostra a média
-
-            plt.figure(figsize=(10, 6))
-            ax = sns.histplot(atendidos_prazo['DIAS_EM_RELACAO_AO_PRAZO_LIMITE'].dropna(), bins=30, palette='viridis')
-            plt.title('Distribuição de Dias em Relação ao Prazo Máximo para Encerramento (Atendidos)')
-            plt.xlabel('Dias (Encerramento - Limite do Prazo)')
-            plt.ylabel('Frequência')
-            plt.axvline(0, color='red', linestyle='--', label='Limite do Prazo')  # Linha para o limite do prazo
-
-            # Adiciona a linha da média dos dias em relação ao prazo limite
-            # A legenda será 'Média: X.XX dias (Atraso)' ou 'Média: X.XX dias (Adiantamento)'
-            if media_dias_em_relacao_prazo > 0:
-                label_media = f'Média: {media_dias_em_relacao_prazo:.2f} dias (Atraso)'
-            elif media_dias_em_relacao_prazo < 0:
-                label_media = f'Média: {abs(media_dias_em_relacao_prazo):.2f} dias (Adiantamento)'
-            else:
-                label_media = f'Média: {media_dias_em_relacao_prazo:.2f} dias (No Prazo)'
+            imprimir_visao_geral_resumida(primeiras_linhas, resumo_colunas, total_linhas)
 
-            plt.axvline(media_dias_em_relacao_prazo, color='blue', linestyle='-.', label=label_media)
+    if metricas is None:
+        # Agregados calculados uma única vez para todas as seções
+        with span('resumir', linhas=total_linhas):
+            metricas = calcular_metricas(resumir_chunk(df, calendario))
+        _gravar_no_cache(diretorio_cache, chave, 'metricas', metricas)
 
-            plt.legend()
-            plt.tight_layout()
-            # Adiciona os valores nas barras do histograma
-            for p in ax.patches:
-                height = p.get_height()
-                if height > 0:  # Anota apenas barras com altura > 0
-                    ax.annotate(f'{int(height)}', (p.get_x() + p.get_width() / 2., height),
-                                ha='center', va='center', xytext=(0, 5), textcoords='offset points', fontsize=8)
-            plt.show()
+    if cubo is not None and metricas['cubo'] is not None:
+        gravar_cubo(metricas['cubo'], cubo)
+        print(f"Cubo LOCAL × SERVICO × mês gravado em '{cubo}'.")
 
-        else:
-            print("Não há chamados 'Atendido' para analisar o Prazo Máximo para Encerramento.")
-    else:
-        print(
-            "Colunas 'DATA_LIMITE_ATENDIMENTO' ou 'DATA_ENCERRAMENTO' não encontradas para análise do Prazo Máximo para Encerramento.")
-
-    # Análise Temporal (Evolução dos Chamados por Mês)
-    print(f"\n{'#' * 30}\n# Análise Temporal\n{'#' * 30}")
-    if 'DATA_ABERTURA' in df.columns:
-        df['ANO_MES_ABERTURA'] = df['DATA_ABERTURA'].dt.to_period('M')
-
-        chamados_por_mes = df['ANO_MES_ABERTURA'].value_counts().sort_index()
-
-        print("Chamados por Mês de Abertura:")
-        print(chamados_por_mes)
-
-        plt.figure(figsize=(10, 6))  # Largura ajustada
-        ax = chamados_por_mes.plot(kind='line', marker='o', color='skyblue')
-        plt.title('Evolução Mensal do Volume de Chamados')
-        plt.xlabel('Mês da Abertura')
-        plt.ylabel('Número de Chamados')
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.tight_layout()
-        for x, y in chamados_por_mes.items():
-            ax.annotate(f'{y}', (x, y), textcoords="offset points", xytext=(0, 10), ha='center', va='bottom')
-        plt.show()
-    else:
-        print("Coluna 'DATA_ABERTURA' não encontrada para análise temporal.")
-
-    # Análise Aprofundada: Desempenho por Local
-    print(f"\n{'#' * 30}\n# Análise Aprofundada: Desempenho por Local\n{'#' * 30}")
-
-    # Taxa de Cancelamento por Local
-    print(f"\n{'=' * 20} Taxa de Cancelamento por Local {'=' * 20}")
-    cancelamentos_por_local = df.groupby('LOCAL')['STATUS'].value_counts(normalize=True).unstack().fillna(0)
-    cancelamentos_por_local['Taxa_Cancelamento'] = cancelamentos_por_local['Cancelado'] * 100
-    cancelamentos_por_local_ordenado = cancelamentos_por_local.sort_values(by='Taxa_Cancelamento', ascending=False)
-
-    print("Taxa de Cancelamento (%) por Local:")
-    print(cancelamentos_por_local_ordenado[['Taxa_Cancelamento']])
-
-    fig, ax = plt.subplots(figsize=(10, 7))  # Usamos plt.subplots para capturar a figura e o eixo
-    sns.barplot(x=cancelamentos_por_local_ordenado.index, y=cancelamentos_por_local_ordenado['Taxa_Cancelamento'],
-                palette='viridis', ax=ax)  # Passa o 'ax' para o seaborn
-
-    plt.title('Taxa de Cancelamento por Local de Atendimento')
-    plt.xlabel('Local')
-    plt.ylabel('Taxa de Cancelamento (%)')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    for p in ax.patches:
-        ax.annotate(f'{p.get_height():.2f}%', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Percentual de Prazo Máximo para Encerramento Cumprido por Local
-    print(f"\n{'=' * 20} Percentual de Prazo Máximo para Encerramento Cumprido por Local {'=' * 20}")
-    atendidos_prazo_por_local = df[df['STATUS'] == 'Atendido'].copy()
-    atendidos_prazo_por_local['DENTRO_DO_PRAZO_LIMITE'] = atendidos_prazo_por_local['DATA_ENCERRAMENTO'] <= \
-                                                          atendidos_prazo_por_local['DATA_LIMITE_ATENDIMENTO']
-
-    prazo_cumprido_por_local = atendidos_prazo_por_local.groupby('LOCAL')['DENTRO_DO_PRAZO_LIMITE'].mean() * 100
-    prazo_cumprido_por_local_ordenado = prazo_cumprido_por_local.sort_values(ascending=True)
-
-    print("Percentual de Prazo Máximo para Encerramento Cumprido (%) por Local (Apenas Atendidos):")
-    print(prazo_cumprido_por_local_ordenado)
-
-    plt.figure(figsize=(10, 7))
-    ax = sns.barplot(x=prazo_cumprido_por_local_ordenado.index, y=prazo_cumprido_por_local_ordenado.values,
-                     palette='viridis')
-    plt.title('Percentual de Prazo Máximo para Encerramento Cumprido por Local de Atendimento')
-    plt.xlabel('Local')
-    plt.ylabel('% Prazo Cumprido')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    for p in ax.patches:
-        ax.annotate(f'{p.get_height():.2f}%', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Tempo Médio de Atendimento por Local
-    print(f"\n{'=' * 20} Tempo Médio de Atendimento por Local {'=' * 20}")
-    tempo_atendimento_por_local = atendidos.groupby('LOCAL')['TEMPO_ATENDIMENTO_DIAS'].mean()
-    tempo_atendimento_por_local_ordenado = tempo_atendimento_por_local.sort_values(ascending=False)
-
-    print("Tempo Médio de Atendimento (Dias) por Local (Apenas Atendidos):")
-    print(tempo_atendimento_por_local_ordenado)
-
-    plt.figure(figsize=(12, 7))
-    ax = sns.barplot(x=tempo_atendimento_por_local_ordenado.index, y=tempo_atendimento_por_local_ordenado.values,
-                     palette='viridis')
-    plt.title('Tempo Médio de Atendimento por Local de Atendimento')
-    plt.xlabel('Local')
-    plt.ylabel('Tempo Médio de Atendimento (Dias)')
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    for p in ax.patches:
-        ax.annotate(f'{p.get_height():.2f}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Análise Aprofundada: Desempenho por Serviço
-    print(f"\n{'#' * 30}\n# Análise Aprofundada: Desempenho por Serviço\n{'#' * 30}\n")
-
-    # Taxa de Cancelamento por Serviço
-    print(f"\n{'=' * 20} Taxa de Cancelamento por Serviço {'=' * 20}")
-    cancelamentos_por_servico = df.groupby('SERVICO')['STATUS'].value_counts(normalize=True).unstack().fillna(0)
-    cancelamentos_por_servico['Taxa_Cancelamento'] = cancelamentos_por_servico['Cancelado'] * 100
-    cancelamentos_por_servico_ordenado = cancelamentos_por_servico.sort_values(by='Taxa_Cancelamento', ascending=False)
-
-    print("Taxa de Cancelamento (%) por Serviço:")
-    print(cancelamentos_por_servico_ordenado[['Taxa_Cancelamento']])
-
-    plt.figure(figsize=(8, 6))
-    ax = sns.barplot(x=cancelamentos_por_servico_ordenado.index,
-                     y=cancelamentos_por_servico_ordenado['Taxa_Cancelamento'],
-                     palette='magma')
-    plt.title('Taxa de Cancelamento por Tipo de Serviço')
-    plt.xlabel('Serviço')
-    plt.ylabel('Taxa de Cancelamento (%)')
-    # Adiciona os valores nas barras
-    for p in ax.patches:
-        ax.annotate(f'{p.get_height():.2f}%', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Percentual de Prazo Máximo para Encerramento Cumprido por Serviço
-    print(f"\n{'=' * 20} Percentual de Prazo Máximo para Encerramento Cumprido por Serviço {'=' * 20}")
-    prazo_cumprido_por_servico = atendidos_prazo.groupby('SERVICO')['DENTRO_DO_PRAZO_LIMITE'].mean() * 100
-    prazo_cumprido_por_servico_ordenado = prazo_cumprido_por_servico.sort_values(ascending=True)
-
-    print("Percentual de Prazo Máximo para Encerramento Cumprido (%) por Serviço (Apenas Atendidos):")
-    print(prazo_cumprido_por_servico_ordenado)
-
-    plt.figure(figsize=(8, 6))
-    ax = sns.barplot(x=prazo_cumprido_por_servico_ordenado.index, y=prazo_cumprido_por_servico_ordenado.values,
-                     palette='magma')
-    plt.title('Percentual de Prazo Máximo para Encerramento Cumprido por Tipo de Serviço')
-    plt.xlabel('Serviço')
-    plt.ylabel('% Prazo Cumprido')
-    # Adiciona os valores nas barras
-    for p in ax.patches:
-        ax.annotate(f'{p.get_height():.2f}%', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Tempo Médio de Atendimento por Serviço
-    print(f"\n{'=' * 20} Tempo Médio de Atendimento por Serviço {'=' * 20}")
-    tempo_atendimento_por_servico = atendidos.groupby('SERVICO')['TEMPO_ATENDIMENTO_DIAS'].mean()
-    tempo_atendimento_por_servico_ordenado = tempo_atendimento_por_servico.sort_values(ascending=False)
-
-    print("Tempo Médio de Atendimento (Dias) por Serviço (Apenas Atendidos):")
-    print(tempo_atendimento_por_servico_ordenado)
-
-    plt.figure(figsize=(8, 6))
-    ax = sns.barplot(x=tempo_atendimento_por_servico_ordenado.index, y=tempo_atendimento_por_servico_ordenado.values,
-                     palette='magma')
-    plt.title('Tempo Médio de Atendimento por Tipo de Serviço')
-    plt.xlabel('Serviço')
-    plt.ylabel('Tempo Médio de Atendimento (Dias)')
-    # Adiciona os valores nas barras
-    for p in ax.patches:
-        ax.annotate(f'{p.get_height():.2f}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                    ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-    plt.tight_layout()
-    plt.show()
-
-    # Distribuição de Motivos de Cancelamento por Serviço
-    print(f"\n{'=' * 20} Distribuição de Motivos de Cancelamento por Serviço {'=' * 20}")
-    if not cancelados.empty:
-        plt.figure(figsize=(12, 7))
-        # Para este gráfico (countplot com hue), a lógica de anotação é um pouco mais complexa se quisermos o total por barra.
-        # Mas para manter a clareza e não poluir muito, vamos deixar os valores de contagem no eixo Y.
-        ax = sns.countplot(data=cancelados, x='SERVICO', hue='MOTIVO_CANCELAMENTO', palette='tab10')
-        plt.title('Motivos de Cancelamento por Tipo de Serviço')
-        plt.xlabel('Tipo de Serviço')
-        plt.ylabel('Quantidade de Cancelamentos')
-        plt.xticks(rotation=45, ha='right')
-        plt.legend(title='Motivo de Cancelamento', bbox_to_anchor=(1.05, 1), loc='upper left')
-        plt.tight_layout()
-        plt.show()
+    if com_graficos:
+        _exibir_ou_gravar_graficos(metricas, diretorio_graficos, num_processos)
     else:
-        print("Não há chamados cancelados para analisar motivos por serviço.")
-
-    # Análise Comparativa de Prazos (Concorrência e Expectativa do Cliente)
-    print(f"\n{'#' * 30}\n# Análise Comparativa de Prazos\n{'#' * 30}")
-
-    if 'PRAZO_MAXIMO_CONCORRENCIA_DIAS' in df.columns and 'EXPECTATIVA_CLIENTE_DIAS' in df.columns:
-        df['PRAZO_HORAS_DIAS'] = df['PRAZO_HORAS'] / 24.0
-        media_tempo_atendimento = atendidos['TEMPO_ATENDIMENTO_DIAS'].mean()
-
-        prazo_concorrencia = df['PRAZO_MAXIMO_CONCORRENCIA_DIAS'].iloc[0] if not df.empty else None
-        expectativa_cliente = df['EXPECTATIVA_CLIENTE_DIAS'].iloc[0] if not df.empty else None
-
-        print(f"\nTempo Médio de Atendimento da Cielo (Chamados Atendidos): {media_tempo_atendimento:.2f} dias")
-        if prazo_concorrencia is not None:
-            print(f"Prazo Máximo da Concorrência (Outras Adquirentes): {prazo_concorrencia:.2f} dias")
-        if expectativa_cliente is not None:
-            print(f"Expectativa do Cliente (Setor Logístico Geral): {expectativa_cliente:.2f} dias")
-
-        if media_tempo_atendimento is not None and prazo_concorrencia is not None and expectativa_cliente is not None:
-            prazos_comp = pd.DataFrame({
-                'Métrica': ['Cielo (Nosso Prazo Real)', 'Concorrência', 'Expectativa Cliente'],
-                'Dias': [media_tempo_atendimento, prazo_concorrencia, expectativa_cliente]
-            })
-
-            plt.figure(figsize=(10, 6))
-            ax = sns.barplot(x='Métrica', y='Dias', data=prazos_comp, palette='coolwarm')
-            plt.title('Comparativo: Nosso Prazo vs. Concorrência vs. Expectativa do Cliente')
-            plt.xlabel('Métrica de Prazo')
-            plt.ylabel('Tempo em Dias')
-            plt.grid(axis='y', linestyle='--', alpha=0.7)
-            # Adiciona os valores nas barras
-            for p in ax.patches:
-                ax.annotate(f'{p.get_height():.2f}', (p.get_x() + p.get_width() / 2., p.get_height()),
-                            ha='center', va='center', xytext=(0, 5), textcoords='offset points')
-            plt.tight_layout()
-            plt.show()
-        else:
-            print("Dados insuficientes para análise comparativa de prazos.")
-    else:
-        print("Colunas de comparação de prazos não encontradas.")
+        with span('relatorio'):
+            imprimir_relatorio(metricas)
 
     # Conclusão
-    print(f"\n{'#' * 30}\n# Fim da Análise Exploratória\n{'#' * 30}")
-    print("Revise os gráficos e as estatísticas para identificar padrões e possíveis problemas.")
-    print("As análises acima fornecem subsídios para responder às perguntas guias do desafio.")
+    _imprimir_conclusao(trace)
 
 
 if __name__ == "__main__":
     INPUT_FILE = 'input/dataset_cielo.csv'
-    analyze_cielo_data(INPUT_FILE)
\ No newline at end of file
+    CHUNK_SIZE = None  # Ex.: 1_000_000 para analisar em chunks, com memória limitada
+    ESTADO_INCREMENTAL = None  # Ex.: 'output/estado_incremental.pkl' para processar só os chamados novos
+    DIRETORIO_GRAFICOS = None  # Ex.: 'imagens' para gravar os gráficos em PNG sem abrir janelas
+    NUM_PROCESSOS = 1  # Processos que agregam partições (CHUNK_SIZE/APROXIMADO) e renderizam os gráficos
+    DIRETORIO_CACHE = None  # Ex.: '.cache_analise' para reaproveitar dataset tipado e métricas entre execuções
+    TRACE = None  # Ex.: 'output/trace_analise.json' para medir tempo e memória de cada etapa
+    FORMATOS_DATAS = None  # Ex.: {'DATA_ABERTURA': '%d/%m/%Y'} para CSVs com datas fora do ISO 8601
+    APROXIMADO = False  # True para estimativas rápidas, com intervalos de confiança, a partir de uma amostra
+    PERIODO = None  # Ex.: ('2025-03-01', '2025-05-01') para analisar só março e abril (fim exclusivo)
+    ARMAZEM = None  # Ex.: 'input/dataset_cielo.colunar' para converter o dataset e ler só os meses do PERIODO
+    COM_GRAFICOS = True  # False para só o relatório em texto, sem importar o matplotlib (partida mais rápida)
+    CUBO = None  # Ex.: 'output/cubo_chamados.pkl' para gravar o cubo LOCAL × SERVICO × mês das consultas
+    CALENDARIO_SLA = None  # Ex.: 'uteis' para medir os tempos do SLA só em dias úteis (sem fins de semana e feriados)
+    analyze_cielo_data(INPUT_FILE, chunk_size=CHUNK_SIZE, estado_incremental=ESTADO_INCREMENTAL,
+                       diretorio_graficos=DIRETORIO_GRAFICOS, num_processos=NUM_PROCESSOS,
+                       diretorio_cache=DIRETORIO_CACHE, trace=TRACE, formatos_datas=FORMATOS_DATAS,
+                       aproximado=APROXIMADO, periodo=PERIODO, armazem=ARMAZEM, com_graficos=COM_GRAFICOS,
+                       cubo=CUBO, calendario=CALENDARIO_SLA)
@@ -0,0 +1,66 @@
+"""
+API da análise exploratória dos chamados da Cielo.
+
+Etapas, cada uma chamável isoladamente:
+    carregar_chamados / iterar_chunks  ->  resumir_chunk / combinar_resumos  ->  calcular_metricas
+    ->  imprimir_relatorio / preparar_graficos + renderizar_graficos
+
+Exemplo:
+    >>> from analise_cielo import carregar_chamados, resumir_chunk, taxa_cancelamento_por
+    >>> resumo = resumir_chunk(carregar_chamados('input/dataset_cielo.parquet'))
+    >>> taxa_cancelamento_por(resumo, 'LOCAL')
+
+Os nomes de `analise_cielo.graficos` são carregados sob demanda: o matplotlib e o seaborn, que custam mais
+para importar que todo o restante do pacote, só são importados quando um gráfico é preparado ou renderizado.
+Os de `analise_cielo.tempo_real` também, para que o asyncio só seja importado quando há eventos a transmitir
+ou consumir.
+"""
+import importlib
+
+from .carregamento import (
+    COLUNAS_CATEGORICAS, COLUNAS_DATAS, COLUNAS_BENCHMARK,
+    detectar_formato, carregar_chamados, iterar_chunks, converter_datas, particionar, converter_para_armazem,
+)
+from .armazem import EscritorArmazem, ler_armazem
+from .esquema import CATEGORIAS, compactar_chamados, benchmarks_de
+from .sla import (
+    CalendarioSLA, feriados_nacionais, resolver_calendario, calcular_sla, horas_decorridas, somar_horas,
+)
+from .agregacao import (
+    CHAVES_AGREGACAO,
+    derivar_colunas, agregar_chamados, metricas_por, resumir_chunk, resumir_derivado, combinar_resumos,
+    combinar_varios_resumos, resumir_em_chunks, descrever_contagens,
+)
+from .metricas import (
+    contagem_por, contagem_status, motivos_cancelamento, estatisticas_tempo_atendimento, cumprimento_prazo,
+    estatisticas_dias_em_relacao_prazo, volume_mensal, taxa_cancelamento_por, pct_prazo_cumprido_por,
+    tempo_medio_atendimento_por, motivos_por_servico, comparativo_prazos, calcular_metricas,
+)
+from .relatorio import (
+    imprimir_visao_geral, imprimir_visao_geral_resumida, imprimir_relatorio, imprimir_relatorio_aproximado,
+)
+from .incremental import carregar_estado, salvar_estado, atualizar_estado_incremental
+from .amostragem import amostrar_chunk, combinar_amostras, amostrar_em_chunks, estimar_metricas
+from .quantis import EsbocoQuantis
+from .ofensores import ALFA_OFENSORES, detectar_ofensores, ajustar_holm
+from .cubo import DIMENSOES, MEDIDAS, CuboChamados, construir_cubo, combinar_cubos, gravar_cubo, ler_cubo
+from .cache import VERSAO_ANALISE, chave_cache, ler_cache, gravar_cache
+from .instrumentacao import span, ativar, desativar, gravar_trace, spans_registrados
+
+# Nomes carregados sob demanda e o submódulo de cada um
+_NOMES_SOB_DEMANDA = {
+    **dict.fromkeys(('GRAFICOS', 'preparar_graficos', 'exibir_grafico', 'renderizar_graficos'), 'graficos'),
+    **dict.fromkeys(('MetricasJanela', 'transmitir_eventos', 'consumir_eventos', 'ordenar_eventos'), 'tempo_real'),
+}
+
+
+def __getattr__(nome):
+    # Importação sob demanda dos nomes de `graficos` e de `tempo_real` (PEP 562)
+    if nome in _NOMES_SOB_DEMANDA:
+        modulo = importlib.import_module(f'.{_NOMES_SOB_DEMANDA[nome]}', __name__)
+        return getattr(modulo, nome)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_NOMES_SOB_DEMANDA))
@@ -0,0 +1,350 @@
+"""
+Colunas derivadas e agregados combináveis (resumos) dos chamados.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .carregamento import iterar_chunks, iterar_chunks_arquivo, particionar
+from .cubo import construir_cubo, combinar_cubos
+from .esquema import benchmarks_de
+from .sla import calcular_sla
+from .instrumentacao import span
+
+
+def derivar_colunas(df, calendario=None):
+    """
+    Acrescenta ao dataset, uma única vez, as colunas derivadas usadas na análise.
+
+    Os tempos vêm de `analise_cielo.sla.calcular_sla`: corridos ou, com `calendario` ('uteis' ou um
+    `CalendarioSLA`), contando só os dias úteis.
+    - TEMPO_ATENDIMENTO_HORAS / TEMPO_ATENDIMENTO_DIAS: horas e dias completos entre abertura e encerramento
+      (todas as linhas).
+    - DENTRO_DO_PRAZO_LIMITE: encerramento até o limite (booleano anulável; nulo para não atendidos).
+    - HORAS_EM_RELACAO_AO_PRAZO_LIMITE / DIAS_EM_RELACAO_AO_PRAZO_LIMITE: horas e dias iniciados entre limite e
+      encerramento, positivos quando há atraso (nulos para não atendidos).
+    - ANO_MES_ABERTURA: mês de abertura do chamado.
+    """
+    with span('derivar_colunas', linhas=len(df)):
+        atendido = (df['STATUS'] == 'Atendido').to_numpy()
+
+        sla = calcular_sla(df, calendario)
+        df['TEMPO_ATENDIMENTO_HORAS'] = sla['TEMPO_ATENDIMENTO_HORAS']
+        df['TEMPO_ATENDIMENTO_DIAS'] = sla['TEMPO_ATENDIMENTO_DIAS']
+        dentro_do_prazo = (df['DATA_ENCERRAMENTO'] <= df['DATA_LIMITE_ATENDIMENTO']).to_numpy()
+        df['DENTRO_DO_PRAZO_LIMITE'] = pd.arrays.BooleanArray(dentro_do_prazo, ~atendido)
+        df['HORAS_EM_RELACAO_AO_PRAZO_LIMITE'] = sla['HORAS_EM_RELACAO_AO_PRAZO_LIMITE'].where(atendido)
+        df['DIAS_EM_RELACAO_AO_PRAZO_LIMITE'] = sla['DIAS_EM_RELACAO_AO_PRAZO_LIMITE'].where(atendido)
+        df['ANO_MES_ABERTURA'] = df['DATA_ABERTURA'].dt.to_period('M')
+    return df
+
+
+CHAVES_AGREGACAO = ['LOCAL', 'SERVICO', 'ANO_MES_ABERTURA', 'MOTIVO_CANCELAMENTO']
+# Partições por processo na agregação paralela: partições menores equilibram a carga entre os processos
+PARTICOES_POR_PROCESSO = 4
+
+
+def agregar_chamados(df):
+    """
+    Resume o dataset (já com as colunas derivadas) em medidas aditivas, em um único groupby.
+
+    O resultado tem uma linha por combinação de LOCAL × SERVICO × ANO_MES_ABERTURA × MOTIVO_CANCELAMENTO
+    (motivo nulo para os chamados não cancelados), com contagens e somas. Por serem aditivas, as medidas
+    podem ser somadas para qualquer subconjunto das chaves sem voltar às linhas do dataset.
+    """
+    atendido = (df['STATUS'] == 'Atendido').to_numpy()
+    base = pd.DataFrame({
+        'LOCAL': df['LOCAL'],
+        'SERVICO': df['SERVICO'],
+        'ANO_MES_ABERTURA': df['ANO_MES_ABERTURA'],
+        'MOTIVO_CANCELAMENTO': df['MOTIVO_CANCELAMENTO'],
+        'CHAMADOS': 1,
+        'CANCELADOS': (df['STATUS'] == 'Cancelado').to_numpy(),
+        'ATENDIDOS': atendido,
+        'NO_PRAZO': df['DENTRO_DO_PRAZO_LIMITE'].fillna(False).to_numpy(dtype=bool),
+        # Somas em dias fracionários (horas exatas / 24), sem o truncamento dos dias inteiros
+        'SOMA_TEMPO_ATENDIMENTO_DIAS': df['TEMPO_ATENDIMENTO_HORAS'].where(atendido, 0) / 24,
+        'SOMA_DIAS_EM_RELACAO_AO_PRAZO_LIMITE': df['HORAS_EM_RELACAO_AO_PRAZO_LIMITE'].fillna(0) / 24,
+        'SOMA_HORAS_ATRASO': df['HORAS_EM_RELACAO_AO_PRAZO_LIMITE'].clip(lower=0).fillna(0),
+    })
+    return base.groupby(CHAVES_AGREGACAO, observed=True, dropna=False, sort=True).sum()
+
+
+def metricas_por(agregados, chave):
+    """
+    Consolida os agregados por `chave` (ex.: 'LOCAL' ou 'SERVICO') e calcula as métricas de desempenho.
+
+    Returns:
+        pd.DataFrame: CHAMADOS, CANCELADOS, ATENDIDOS, Taxa_Cancelamento (%), Pct_Prazo_Cumprido (%,
+        apenas atendidos) e Tempo_Medio_Atendimento_Dias (apenas atendidos, em dias fracionários), indexado por
+        `chave`.
+    """
+    totais = agregados.groupby(level=chave, observed=True).sum()
+    return pd.DataFrame({
+        'CHAMADOS': totais['CHAMADOS'],
+        'CANCELADOS': totais['CANCELADOS'],
+        'ATENDIDOS': totais['ATENDIDOS'],
+        'Taxa_Cancelamento': totais['CANCELADOS'] / totais['CHAMADOS'] * 100,
+        'Pct_Prazo_Cumprido': totais['NO_PRAZO'] / totais['ATENDIDOS'] * 100,
+        'Tempo_Medio_Atendimento_Dias': totais['SOMA_TEMPO_ATENDIMENTO_DIAS'] / totais['ATENDIDOS'],
+    })
+
+
+def _somar_agregados(a, b):
+    """
+    Soma duas tabelas de agregados (ou contagens) alinhando pelas chaves do índice.
+    """
+    if a is None:
+        return b
+    niveis = list(range(a.index.nlevels))
+    return pd.concat([a, b]).groupby(level=niveis, observed=True, dropna=False, sort=True).sum()
+
+
+def resumir_chunk(df, calendario=None):
+    """
+    Calcula os agregados parciais de um conjunto de chamados (o dataset inteiro ou um chunk).
+
+    O resumo contém apenas medidas que podem ser combinadas com `combinar_resumos`: a tabela de
+    agregados por LOCAL × SERVICO × mês × motivo, as contagens do tempo de atendimento e do tempo em relação
+    ao prazo por valor (em dias, com resolução de uma hora, apenas atendidos), o cubo LOCAL × SERVICO × mês
+    (`cubo.construir_cubo`) e os valores de benchmark. `calendario` é repassado a `derivar_colunas`.
+    """
+    return resumir_derivado(derivar_colunas(df, calendario))
+
+
+def _contar_por_hora(horas):
+    """
+    Contagens por valor, em dias, das horas arredondadas para a hora mais próxima (nulos ignorados).
+    """
+    return (horas.dropna().round() / 24).value_counts().sort_index()
+
+
+def resumir_derivado(df):
+    """
+    Como `resumir_chunk`, para chamados que já passaram por `derivar_colunas`.
+    """
+    with span('agregar', linhas=len(df)):
+        atendido = (df['STATUS'] == 'Atendido').to_numpy()
+        return {
+            'linhas': len(df),
+            'agregados': agregar_chamados(df),
+            'tempo_atendimento': _contar_por_hora(df.loc[atendido, 'TEMPO_ATENDIMENTO_HORAS']),
+            'dias_em_relacao_prazo': _contar_por_hora(df['HORAS_EM_RELACAO_AO_PRAZO_LIMITE']),
+            'cubo': construir_cubo(df),
+            'benchmarks': benchmarks_de(df),
+        }
+
+
+def _somar_contagens(a, b):
+    """
+    Soma duas séries de contagens por valor.
+    """
+    return a.add(b, fill_value=0).astype('int64').sort_index()
+
+
+def combinar_resumos(a, b):
+    """
+    Combina dois resumos parciais de `resumir_chunk` como se tivessem sido calculados juntos.
+    """
+    if a is None:
+        return b
+    return {
+        'linhas': a['linhas'] + b['linhas'],
+        'agregados': _somar_agregados(a['agregados'], b['agregados']),
+        'tempo_atendimento': _somar_contagens(a['tempo_atendimento'], b['tempo_atendimento']),
+        'dias_em_relacao_prazo': _somar_contagens(a['dias_em_relacao_prazo'], b['dias_em_relacao_prazo']),
+        'cubo': combinar_cubos([a['cubo'], b['cubo']]),
+        'benchmarks': a['benchmarks'] or b['benchmarks'],
+    }
+
+
+def combinar_varios_resumos(resumos):
+    """
+    Combina de uma só vez uma lista de resumos (com um único groupby, em vez de um por par de resumos).
+
+    Resumos None (partições vazias) são ignorados; retorna None se não sobrar nenhum.
+    """
+    resumos = [resumo for resumo in resumos if resumo is not None]
+    if len(resumos) <= 1:
+        return resumos[0] if resumos else None
+    agregados = pd.concat([resumo['agregados'] for resumo in resumos])
+    contagens = {nome: pd.concat([resumo[nome] for resumo in resumos]).groupby(level=0).sum().astype('int64')
+                 for nome in ('tempo_atendimento', 'dias_em_relacao_prazo')}
+    return {
+        'linhas': sum(resumo['linhas'] for resumo in resumos),
+        'agregados': agregados.groupby(level=list(range(agregados.index.nlevels)), observed=True, dropna=False,
+                                       sort=True).sum(),
+        'tempo_atendimento': contagens['tempo_atendimento'],
+        'dias_em_relacao_prazo': contagens['dias_em_relacao_prazo'],
+        'cubo': combinar_cubos([resumo['cubo'] for resumo in resumos]),
+        'benchmarks': next((resumo['benchmarks'] for resumo in resumos if resumo['benchmarks']), {}),
+    }
+
+
+def descrever_contagens(contagens, nome):
+    """
+    Equivalente a `Series.describe()` calculado a partir das contagens por valor (índice = valor).
+
+    Os quantis usam a mesma interpolação linear do pandas, posicionando-se pelas contagens acumuladas.
+    """
+    indice = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    valores = contagens.index.to_numpy(dtype=float)
+    pesos = contagens.to_numpy(dtype=float)
+    n = pesos.sum()
+    if n == 0:
+        # Sem valores, como o `describe()` de uma série vazia
+        return pd.Series([0.0] + [np.nan] * 7, index=indice, name=nome)
+    media = (valores * pesos).sum() / n
+    desvio = np.sqrt(((valores - media) ** 2 * pesos).sum() / (n - 1)) if n > 1 else np.nan
+    acumulado = np.cumsum(pesos)
+
+    def quantil(q):
+        posicao = (n - 1) * q
+        inferior = np.floor(posicao)
+        v_inferior = valores[np.searchsorted(acumulado, inferior, side='right')]
+        v_superior = valores[np.searchsorted(acumulado, min(inferior + 1, n - 1), side='right')]
+        return v_inferior + (posicao - inferior) * (v_superior - v_inferior)
+
+    return pd.Series([n, media, desvio, valores[0], quantil(0.25), quantil(0.5), quantil(0.75), valores[-1]],
+                     index=indice, name=nome)
+
+
+def resumir_colunas(df):
+    """
+    Resumo combinável de cada coluna original, usado na visão geral do modo em chunks.
+
+    Datas guardam contagem, mínimo, máximo e soma (em ns); as demais colunas guardam as contagens por valor.
+    """
+    resumo = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            validos = serie.dropna().astype('int64').to_numpy()
+            # Soma exata em ns, separada em segundos e frações para não estourar o int64
+            segundos, fracoes = np.divmod(validos, 1_000_000_000)
+            resumo[coluna] = {'dtype': str(serie.dtype), 'nao_nulos': len(validos),
+                              'min': serie.min(), 'max': serie.max(),
+                              'soma': int(segundos.sum()) * 1_000_000_000 + int(fracoes.sum())}
+        else:
+            contagens = serie.value_counts()
+            resumo[coluna] = {'dtype': str(serie.dtype), 'nao_nulos': int(contagens.sum()),
+                              'contagens': contagens[contagens > 0]}
+    return resumo
+
+
+def combinar_resumo_colunas(a, b):
+    """
+    Combina os resumos de colunas de dois chunks.
+    """
+    if a is None:
+        return b
+    combinado = {}
+    for coluna, info in a.items():
+        outro = b[coluna]
+        if 'contagens' in info:
+            combinado[coluna] = {'dtype': info['dtype'], 'nao_nulos': info['nao_nulos'] + outro['nao_nulos'],
+                                 'contagens': info['contagens'].add(outro['contagens'], fill_value=0)}
+        else:
+            combinado[coluna] = {'dtype': info['dtype'], 'nao_nulos': info['nao_nulos'] + outro['nao_nulos'],
+                                 # NaT quando a coluna é toda nula nos dois chunks
+                                 'min': min((v for v in (info['min'], outro['min']) if pd.notna(v)), default=pd.NaT),
+                                 'max': max((v for v in (info['max'], outro['max']) if pd.notna(v)), default=pd.NaT),
+                                 'soma': info['soma'] + outro['soma']}
+    return combinado
+
+
+def descrever_resumo_colunas(resumo_colunas):
+    """
+    Monta, a partir do resumo combinado das colunas, uma tabela no formato de `describe(include='all')`.
+
+    Os quantis das colunas de data não são combináveis de forma exata e ficam vazios.
+    """
+    descricao = {}
+    for coluna, info in resumo_colunas.items():
+        if 'contagens' not in info:
+            media = pd.Timestamp(info['soma'] // info['nao_nulos']) if info['nao_nulos'] else pd.NaT
+            descricao[coluna] = pd.Series({'count': info['nao_nulos'], 'mean': media,
+                                           'min': info['min'], 'max': info['max']})
+        elif info['dtype'] in ('category', 'object'):
+            contagens = info['contagens'].sort_values(ascending=False)
+            descricao[coluna] = pd.Series({'count': info['nao_nulos'], 'unique': len(contagens),
+                                           'top': contagens.index[0] if len(contagens) else np.nan,
+                                           'freq': contagens.iloc[0] if len(contagens) else np.nan})
+        else:
+            descricao[coluna] = descrever_contagens(info['contagens'].sort_index(), coluna)
+    ordem = ['count', 'unique', 'top', 'freq', 'mean', 'min', '25%', '50%', '75%', 'max', 'std']
+    return pd.DataFrame(descricao).reindex(ordem)
+
+
+def _acumular_chunks(chunks, calendario=None):
+    """
+    Combina os agregados parciais e o resumo das colunas de uma sequência de chunks.
+
+    Chunks vazios (por exemplo, sem chamados do período) são ignorados; se nenhum chunk tiver linhas, o
+    resumo é o de um chunk vazio, com as mesmas chaves de um dataset com chamados.
+    """
+    resumo = None
+    resumo_colunas = None
+    primeiras_linhas = None
+    vazio = None
+    for chunk in chunks:
+        if chunk.empty:
+            vazio = chunk if vazio is None else vazio
+            continue
+        with span('resumir_chunk', linhas=len(chunk)):
+            if primeiras_linhas is None:
+                primeiras_linhas = chunk.head()
+            resumo_colunas = combinar_resumo_colunas(resumo_colunas, resumir_colunas(chunk))
+            resumo = combinar_resumos(resumo, resumir_chunk(chunk, calendario))
+    if resumo is None and vazio is not None:
+        # Resumo das colunas e primeiras linhas antes de `resumir_chunk`, que acrescenta as colunas derivadas
+        resumo_colunas, primeiras_linhas = resumir_colunas(vazio), vazio.head()
+        resumo = resumir_chunk(vazio, calendario)
+    return resumo, resumo_colunas, primeiras_linhas
+
+
+def _resumir_particao(tarefa):
+    """
+    Resume uma partição do dataset (executado nos processos de `resumir_em_chunks`).
+    """
+    particao, chunk_size, formatos_datas, periodo, calendario = tarefa
+    return _acumular_chunks(iterar_chunks_arquivo(chunk_size=chunk_size, formatos_datas=formatos_datas,
+                                                  periodo=periodo, **particao), calendario)
+
+
+def resumir_em_chunks(filepath, chunk_size, formatos_datas=None, num_processos=1, periodo=None, calendario=None):
+    """
+    Percorre o dataset em chunks, combinando os agregados parciais e o resumo das colunas.
+
+    `formatos_datas` e `periodo` são repassados a `iterar_chunks` (formato das colunas de data do CSV e
+    janela de DATA_ABERTURA a analisar), e `calendario`, a `derivar_colunas`.
+
+    Com `num_processos` > 1, o dataset é dividido em partições (`particionar`) que os processos leem e
+    resumem de forma independente, direto do arquivo; só os resumos, pequenos, voltam ao processo principal,
+    onde são combinados na ordem das partições. O resultado é o mesmo da leitura sequencial.
+
+    Returns:
+        tuple: (resumo combinado, resumo combinado das colunas originais, primeiras linhas do dataset).
+    """
+    with span('resumir_em_chunks', chunk_size=chunk_size, num_processos=num_processos) as medicao:
+        if num_processos <= 1:
+            resumo, resumo_colunas, primeiras_linhas = _acumular_chunks(
+                iterar_chunks(filepath, chunk_size, formatos_datas, periodo=periodo), calendario)
+        else:
+            particoes = particionar(filepath, num_processos * PARTICOES_POR_PROCESSO, periodo)
+            tarefas = [(particao, chunk_size, formatos_datas, periodo, calendario) for particao in particoes]
+            with ProcessPoolExecutor(max_workers=min(num_processos, len(tarefas))) as executor:
+                parciais = [parcial for parcial in executor.map(_resumir_particao, tarefas) if parcial[0] is not None]
+            resumo = combinar_varios_resumos([parcial for parcial, _, _ in parciais])
+            resumo_colunas = None
+            for _, colunas_parcial, _ in parciais:
+                resumo_colunas = combinar_resumo_colunas(resumo_colunas, colunas_parcial)
+            primeiras_linhas = parciais[0][2] if parciais else None
+            if resumo is None:
+                # Nenhuma partição (dataset sem linhas): o resumo vazio vem da leitura sequencial, que só lê o
+                # cabeçalho
+                resumo, resumo_colunas, primeiras_linhas = _acumular_chunks(
+                    iterar_chunks(filepath, chunk_size, formatos_datas, periodo=periodo), calendario)
+        medicao.linhas = resumo['linhas'] if resumo is not None else 0
+    return resumo, resumo_colunas, primeiras_linhas
@@ -0,0 +1,290 @@
+"""
+Modo aproximado: estimativas com intervalo de confiança a partir de uma amostra estratificada por
+LOCAL × SERVICO, montada em uma única passada pelo dataset, sem carregá-lo inteiro.
+
+- Amostra: cada chamado recebe uma chave aleatória uniforme e cada estrato guarda os `tamanho_estrato`
+  chamados de menor chave (reservatório por prioridade). O resultado é uma amostra aleatória simples de
+  cada estrato, e duas amostras parciais se combinam mantendo de novo as menores chaves.
+- Estimativas: taxa de cancelamento, percentual no prazo e tempo médio de atendimento por LOCAL, por
+  SERVICO e no total, pelo estimador de razão estratificado, com o erro padrão linearizado, correção de
+  população finita e intervalo de confiança normal. As contagens por estrato são exatas.
+- Quantis: TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS e DIAS_EM_RELACAO_AO_PRAZO_LIMITE_FRACIONARIOS dos chamados
+  atendidos (horas exatas de `analise_cielo.sla` / 24) passam, todos, por esboços KLL
+  (`analise_cielo.quantis`), com limite de erro de rank.
+
+Os resumos amostrais são dicts combináveis, como os de `analise_cielo.agregacao`.
+"""
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .carregamento import iterar_chunks, iterar_chunks_arquivo, particionar
+from .agregacao import PARTICOES_POR_PROCESSO
+from .quantis import EsbocoQuantis
+from .sla import horas_decorridas
+from .instrumentacao import span
+
+ESTRATOS = ['LOCAL', 'SERVICO']
+# Colunas lidas no modo aproximado; as demais nem são convertidas
+COLUNAS_AMOSTRA = ESTRATOS + ['STATUS', 'DATA_ABERTURA', 'DATA_ENCERRAMENTO', 'DATA_LIMITE_ATENDIMENTO']
+TAMANHO_AMOSTRA_ESTRATO = 2_000
+CHUNK_SIZE_AMOSTRAGEM = 500_000
+NIVEL_CONFIANCA = 0.95
+QUANTIS = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def amostrar_chunk(df, tamanho_estrato=TAMANHO_AMOSTRA_ESTRATO, rng=None, calendario=None):
+    """
+    Resumo amostral de um conjunto de chamados (o dataset inteiro ou um chunk).
+
+    Os tempos são contados no `calendario` de `analise_cielo.sla` (None = horas corridas).
+
+    Returns:
+        dict: 'linhas', 'populacao' (chamados por estrato, exatos), 'amostra' (até `tamanho_estrato`
+            chamados por estrato, com as colunas usadas nas estimativas e a chave aleatória), 'tamanho_estrato'
+            e 'quantis' (esboços de TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS e
+            DIAS_EM_RELACAO_AO_PRAZO_LIMITE_FRACIONARIOS).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    atendido = (df['STATUS'] == 'Atendido').to_numpy()
+    # Mesmos tempos de `derivar_colunas`, em dias fracionários, calculados só para as colunas necessárias
+    tempo = horas_decorridas(df['DATA_ABERTURA'], df['DATA_ENCERRAMENTO'], calendario) / 24
+    dias_prazo = horas_decorridas(df['DATA_LIMITE_ATENDIMENTO'], df['DATA_ENCERRAMENTO'], calendario) / 24
+    no_prazo = atendido & (df['DATA_ENCERRAMENTO'] <= df['DATA_LIMITE_ATENDIMENTO']).to_numpy()
+    quantis = {
+        'TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS': EsbocoQuantis(semente=rng.integers(2 ** 32)).atualizar(tempo[atendido]),
+        'DIAS_EM_RELACAO_AO_PRAZO_LIMITE_FRACIONARIOS': EsbocoQuantis(semente=rng.integers(2 ** 32)).atualizar(
+            dias_prazo[atendido]),
+    }
+
+    # Só chamados com chave abaixo do limiar podem estar entre as menores chaves de um estrato que tenha
+    # ao menos `tamanho_estrato` chamados abaixo dele; estratos sem essa folga entram inteiros
+    chave = rng.random(len(df))
+    codigos = _codigos_estrato(df)
+    limiar = min(1.0, 2 * tamanho_estrato * (codigos.max(initial=0) + 1) / max(len(df), 1))
+    abaixo = chave < limiar
+    sem_folga = np.bincount(codigos[abaixo], minlength=codigos.max(initial=0) + 1) < tamanho_estrato
+    candidato = abaixo | sem_folga[codigos]
+
+    candidatos = pd.DataFrame({
+        'LOCAL': df['LOCAL'].array[candidato],
+        'SERVICO': df['SERVICO'].array[candidato],
+        'CANCELADO': (df['STATUS'] == 'Cancelado').to_numpy()[candidato],
+        'ATENDIDO': atendido[candidato],
+        'NO_PRAZO': no_prazo[candidato],
+        'TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS': np.where(atendido, tempo, 0.0)[candidato],
+        'CHAVE': chave[candidato],
+    })
+    return {
+        'linhas': len(df),
+        'populacao': df.groupby(ESTRATOS, observed=True).size(),
+        'amostra': _menores_chaves(candidatos, tamanho_estrato),
+        'tamanho_estrato': tamanho_estrato,
+        'quantis': quantis,
+    }
+
+
+def _codigos_estrato(df):
+    """
+    Código inteiro do estrato (LOCAL × SERVICO) de cada chamado, a partir dos códigos das categorias.
+    """
+    codigos = np.zeros(len(df), dtype=np.int64)
+    for coluna in ESTRATOS:
+        valores = df[coluna]
+        if not isinstance(valores.dtype, pd.CategoricalDtype):
+            valores = valores.astype('category')
+        # Código 0 reservado para nulos
+        codigos = codigos * (len(valores.cat.categories) + 1) + valores.cat.codes.to_numpy() + 1
+    return codigos
+
+
+def _menores_chaves(amostra, tamanho_estrato):
+    """
+    Mantém, em cada estrato, os `tamanho_estrato` chamados de menor chave aleatória.
+
+    Ordena pela chave e, de forma estável, pelo código do estrato; a posição de cada chamado dentro do seu
+    estrato é então a distância até o início do estrato na ordem obtida.
+    """
+    codigos = _codigos_estrato(amostra)
+    ordem = np.argsort(amostra['CHAVE'].to_numpy())
+    ordem = ordem[np.argsort(codigos[ordem], kind='stable')]
+    estratos_ordenados = codigos[ordem]
+    posicao = np.arange(len(ordem)) - np.searchsorted(estratos_ordenados, estratos_ordenados)
+    return amostra.iloc[np.sort(ordem[posicao < tamanho_estrato])].reset_index(drop=True)
+
+
+def combinar_amostras(a, b):
+    """
+    Combina dois resumos amostrais de `amostrar_chunk` como se a amostra tivesse sido feita de uma vez.
+    """
+    if a is None:
+        return b
+    amostra = pd.concat([a['amostra'], b['amostra']], ignore_index=True)
+    for coluna in ESTRATOS:
+        # Chunks com categorias diferentes: volta às categorias unidas em vez de object
+        if not isinstance(amostra[coluna].dtype, pd.CategoricalDtype):
+            amostra[coluna] = amostra[coluna].astype('category')
+    return {
+        'linhas': a['linhas'] + b['linhas'],
+        'populacao': a['populacao'].add(b['populacao'], fill_value=0).astype('int64'),
+        'amostra': _menores_chaves(amostra, a['tamanho_estrato']),
+        'tamanho_estrato': a['tamanho_estrato'],
+        'quantis': {nome: esboco.combinar(b['quantis'][nome]) for nome, esboco in a['quantis'].items()},
+    }
+
+
+def _amostrar_particao(tarefa):
+    """
+    Resumo amostral de uma partição do dataset (executado nos processos de `amostrar_em_chunks`).
+    """
+    particao, chunk_size, tamanho_estrato, semente, formatos_datas, periodo, calendario = tarefa
+    rng = np.random.default_rng(semente)
+    resumo = None
+    for chunk in iterar_chunks_arquivo(chunk_size=chunk_size, formatos_datas=formatos_datas,
+                                       colunas=COLUNAS_AMOSTRA, periodo=periodo, **particao):
+        with span('amostrar_chunk', linhas=len(chunk)):
+            resumo = combinar_amostras(resumo, amostrar_chunk(chunk, tamanho_estrato, rng, calendario))
+    return resumo
+
+
+def amostrar_em_chunks(filepath, chunk_size=CHUNK_SIZE_AMOSTRAGEM, tamanho_estrato=TAMANHO_AMOSTRA_ESTRATO,
+                       semente=None, formatos_datas=None, num_processos=1, periodo=None, calendario=None):
+    """
+    Percorre o dataset em chunks, lendo apenas `COLUNAS_AMOSTRA` (e, com `periodo`, apenas os chamados do
+    período; ver `carregar_chamados`), e combina os resumos amostrais. `calendario` é repassado a
+    `amostrar_chunk`.
+
+    Com `num_processos` > 1, as partições do dataset (`particionar`) são amostradas em paralelo, cada uma
+    com sua própria sequência aleatória, e as amostras parciais são combinadas no processo principal.
+
+    Returns:
+        dict: Resumo amostral combinado (ver `amostrar_chunk`), ou None se o dataset estiver vazio.
+    """
+    resumo = None
+    with span('amostrar_em_chunks', chunk_size=chunk_size, num_processos=num_processos) as medicao:
+        if num_processos <= 1:
+            rng = np.random.default_rng(semente)
+            for chunk in iterar_chunks(filepath, chunk_size, formatos_datas, colunas=COLUNAS_AMOSTRA,
+                                       periodo=periodo):
+                with span('amostrar_chunk', linhas=len(chunk)):
+                    resumo = combinar_amostras(resumo, amostrar_chunk(chunk, tamanho_estrato, rng, calendario))
+        else:
+            particoes = particionar(filepath, num_processos * PARTICOES_POR_PROCESSO, periodo)
+            sementes = np.random.SeedSequence(semente).spawn(len(particoes))
+            tarefas = [(particao, chunk_size, tamanho_estrato, semente_particao, formatos_datas, periodo, calendario)
+                       for particao, semente_particao in zip(particoes, sementes)]
+            with ProcessPoolExecutor(max_workers=min(num_processos, len(tarefas))) as executor:
+                for parcial in executor.map(_amostrar_particao, tarefas):
+                    if parcial is not None:
+                        resumo = combinar_amostras(resumo, parcial)
+        medicao.linhas = resumo['linhas'] if resumo is not None else 0
+    return resumo
+
+
+def _estimar_razao(estratos, numerador, denominador, chave, z):
+    """
+    Estimador de razão estratificado Σ N_h·ȳ_h / Σ N_h·x̄_h por valor de `chave` (None = total).
+
+    A variância usa a linearização z = y - R·x, com correção de população finita em cada estrato:
+    V(R) = Σ N_h² (1 - n_h/N_h) s²_z,h / n_h / X². Estratos com um único chamado amostrado (e população
+    maior) não permitem estimar a variância e deixam o erro padrão indefinido.
+
+    Args:
+        estratos (pd.DataFrame): Por estrato: 'N', 'n' e as somas amostrais de y, x, y², x² e x·y, com os
+            prefixos `numerador`/`denominador` (ver `_somas_por_estrato`).
+    """
+    y, x = numerador, denominador
+    n = estratos['n'].to_numpy(dtype=float)
+    populacao = estratos['N'].to_numpy(dtype=float)
+    rotulos = (estratos.index.get_level_values(chave) if chave is not None
+               else pd.Index(['Total'] * len(estratos)))
+    total_y = pd.Series(populacao * estratos[f'soma_{y}'] / n).groupby(rotulos, observed=True).sum()
+    total_x = pd.Series(populacao * estratos[f'soma_{x}'] / n).groupby(rotulos, observed=True).sum()
+    razao = total_y / total_x
+
+    r = razao.reindex(rotulos).to_numpy()
+    soma_z = estratos[f'soma_{y}'].to_numpy() - r * estratos[f'soma_{x}'].to_numpy()
+    soma_z2 = (estratos[f'soma_{y}2'].to_numpy() - 2 * r * estratos[f'soma_{x}_{y}'].to_numpy()
+               + r ** 2 * estratos[f'soma_{x}2'].to_numpy())
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variancia_z = (soma_z2 - soma_z ** 2 / n) / (n - 1)
+        componentes = np.where(n >= populacao, 0.0,
+                               populacao ** 2 * (1 - n / populacao) * np.maximum(variancia_z, 0) / n)
+    por_grupo = pd.Series(componentes).groupby(rotulos, observed=True)
+    # Um estrato sem variância estimável deixa indefinida a variância do grupo todo
+    variancia = por_grupo.sum().where(por_grupo.count() == por_grupo.size()) / total_x ** 2
+    erro = np.sqrt(variancia)
+    return pd.DataFrame({'Estimativa': razao, 'IC_Inferior': razao - z * erro, 'IC_Superior': razao + z * erro,
+                         'Erro_Padrao': erro})
+
+
+def _somas_por_estrato(resumo):
+    """
+    Tamanho da população e somas amostrais (valores, quadrados e produtos cruzados) de cada estrato.
+    """
+    amostra = resumo['amostra']
+    um = np.ones(len(amostra))
+    variaveis = {
+        'UM': um,
+        'CANCELADO': amostra['CANCELADO'].to_numpy(dtype=float),
+        'ATENDIDO': amostra['ATENDIDO'].to_numpy(dtype=float),
+        'NO_PRAZO': amostra['NO_PRAZO'].to_numpy(dtype=float),
+        'TEMPO': amostra['TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS'].to_numpy(dtype=float),
+    }
+    pares = [('CANCELADO', 'UM'), ('NO_PRAZO', 'ATENDIDO'), ('TEMPO', 'ATENDIDO')]
+    colunas = {'n': um}
+    for nome, valores in variaveis.items():
+        colunas[f'soma_{nome}'] = valores
+        colunas[f'soma_{nome}2'] = valores ** 2
+    for y, x in pares:
+        colunas[f'soma_{x}_{y}'] = variaveis[x] * variaveis[y]
+    somas = pd.DataFrame(colunas).groupby([amostra['LOCAL'], amostra['SERVICO']], observed=True).sum()
+    somas['N'] = resumo['populacao'].reindex(somas.index).to_numpy()
+    return somas
+
+
+def estimar_metricas(resumo, nivel_confianca=NIVEL_CONFIANCA, quantis=QUANTIS):
+    """
+    Estimativas do relatório a partir de um resumo amostral, com intervalos de confiança.
+
+    Args:
+        resumo (dict): Resumo de `amostrar_chunk`/`combinar_amostras`/`amostrar_em_chunks`.
+        nivel_confianca (float): Nível de confiança dos intervalos (aproximação normal).
+        quantis (list): Frações dos quantis estimados pelos esboços.
+
+    Returns:
+        dict: 'linhas', 'tamanho_amostra', 'tamanho_estrato', 'nivel_confianca', 'contagem_local' e 'contagem_servico'
+            (exatas); 'taxa_cancelamento_*', 'pct_prazo_cumprido_*' e 'tempo_medio_atendimento_*' para
+            'local', 'servico' e 'geral' (DataFrames com Estimativa, IC_Inferior, IC_Superior e Erro_Padrao,
+            taxas em %); 'quantis' (DataFrame por coluna) e 'erro_rank_quantis' (fração de n, 99% de confiança).
+    """
+    z = NormalDist().inv_cdf(0.5 + nivel_confianca / 2)
+    estratos = _somas_por_estrato(resumo)
+    estimativas = {
+        'linhas': resumo['linhas'],
+        'tamanho_amostra': len(resumo['amostra']),
+        'tamanho_estrato': resumo['tamanho_estrato'],
+        'nivel_confianca': nivel_confianca,
+        'contagem_local': resumo['populacao'].groupby(level='LOCAL', observed=True).sum()
+        .sort_values(ascending=False).rename('count'),
+        'contagem_servico': resumo['populacao'].groupby(level='SERVICO', observed=True).sum()
+        .sort_values(ascending=False).rename('count'),
+    }
+    for sufixo, chave in (('local', 'LOCAL'), ('servico', 'SERVICO'), ('geral', None)):
+        taxa = _estimar_razao(estratos, 'CANCELADO', 'UM', chave, z)
+        pct = _estimar_razao(estratos, 'NO_PRAZO', 'ATENDIDO', chave, z)
+        tempo = _estimar_razao(estratos, 'TEMPO', 'ATENDIDO', chave, z)
+        percentuais = ['Estimativa', 'IC_Inferior', 'IC_Superior', 'Erro_Padrao']
+        taxa[percentuais] *= 100
+        pct[percentuais] *= 100
+        estimativas[f'taxa_cancelamento_{sufixo}'] = taxa.sort_values('Estimativa', ascending=False)
+        estimativas[f'pct_prazo_cumprido_{sufixo}'] = pct.sort_values('Estimativa', ascending=True)
+        estimativas[f'tempo_medio_atendimento_{sufixo}'] = tempo.sort_values('Estimativa', ascending=False)
+
+    estimativas['quantis'] = pd.DataFrame(
+        {nome: esboco.quantis(quantis) for nome, esboco in resumo['quantis'].items()},
+        index=[f'{q:.0%}' for q in quantis])
+    estimativas['erro_rank_quantis'] = max(esboco.erro_rank() for esboco in resumo['quantis'].values())
+    return estimativas
@@ -0,0 +1,278 @@
+"""
+Armazém colunar local: um arquivo binário de largura fixa por coluna, lido por mapeamento em memória.
+
+O armazém é um diretório com:
+    - `<COLUNA>.bin`: os valores da coluna, sem cabeçalho, em um tipo NumPy de largura fixa. Colunas de
+      texto guardam os códigos do dicionário (int8 na prática); datas, datetime64[ns].
+    - `indice.json`: tipos e dicionários das colunas, benchmarks e o índice mês -> (linha inicial, final).
+
+As linhas ficam ordenadas por DATA_ABERTURA (chamados sem data de abertura no início, fora do índice). Com o
+índice, ler uma janela de datas mapeia apenas os bytes dos meses da janela: a posição exata das datas
+inicial e final é buscada só dentro do mês de cada uma, e cada coluna é mapeada a partir da linha inicial.
+
+`EscritorArmazem` grava chunks em qualquer ordem: cada chunk é distribuído em segmentos temporários por mês
+e, ao fechar, cada mês é ordenado (uma coluna por vez) e acrescentado aos arquivos finais.
+"""
+import os
+import json
+import shutil
+
+import numpy as np
+import pandas as pd
+
+VERSAO_ARMAZEM = 1
+ARQUIVO_INDICE = 'indice.json'
+EXTENSAO_COLUNA = '.bin'
+# Segmentos temporários por mês, usados enquanto o armazém é gravado
+DIRETORIO_SEGMENTOS = '_segmentos'
+SEGMENTO_SEM_DATA = 'sem_data'
+TIPO_DATAS = np.dtype('M8[ns]')
+
+
+def eh_armazem(caminho):
+    """
+    Indica se `caminho` é um diretório de armazém colunar (tem o arquivo de índice).
+    """
+    return os.path.isfile(os.path.join(caminho, ARQUIVO_INDICE))
+
+
+def ler_indice(caminho):
+    """
+    Lê o índice do armazém (ver `EscritorArmazem.fechar`).
+
+    Raises:
+        FileNotFoundError: Se `caminho` não for um armazém.
+        ValueError: Se o armazém for de outra versão.
+    """
+    with open(os.path.join(caminho, ARQUIVO_INDICE)) as arquivo:
+        indice = json.load(arquivo)
+    if indice.get('versao') != VERSAO_ARMAZEM:
+        raise ValueError(f"Armazém '{caminho}' na versão {indice.get('versao')}; esperada a {VERSAO_ARMAZEM}.")
+    return indice
+
+
+def _tipo_codigos(num_categorias):
+    """
+    Menor inteiro com sinal que guarda os códigos de um dicionário (e o -1 dos nulos).
+    """
+    for tipo in (np.int8, np.int16, np.int32):
+        if num_categorias <= np.iinfo(tipo).max:
+            return np.dtype(tipo)
+    return np.dtype(np.int64)
+
+
+def _mapear(caminho, coluna, tipo, inicio, fim):
+    """
+    Linhas [inicio, fim) de uma coluna, mapeadas em memória (somente leitura).
+    """
+    tipo = np.dtype(tipo)
+    if fim <= inicio:
+        return np.empty(0, dtype=tipo)
+    return np.memmap(os.path.join(caminho, coluna + EXTENSAO_COLUNA), dtype=tipo, mode='r',
+                     offset=inicio * tipo.itemsize, shape=(fim - inicio,))
+
+
+def _posicao(caminho, indice, data, lado):
+    """
+    Primeira linha com DATA_ABERTURA >= `data` (lado 'left') ou > `data` (lado 'right').
+
+    Pelo índice, só a coluna de datas do mês de `data` é consultada (busca binária no trecho mapeado).
+    """
+    data = pd.Timestamp(data).to_datetime64().astype(TIPO_DATAS)
+    mes = str(data.astype('M8[M]'))
+    for chave, (inicio, fim) in indice['meses'].items():
+        if chave < mes:
+            continue
+        if chave > mes:
+            return inicio
+        datas = _mapear(caminho, 'DATA_ABERTURA', indice['colunas']['DATA_ABERTURA']['tipo'], inicio, fim)
+        return inicio + int(np.searchsorted(datas, data, side=lado))
+    return indice['linhas']
+
+
+def faixa_de_linhas(caminho, indice, inicio=None, fim=None, posterior_a=None):
+    """
+    Faixa de linhas [a, b) com DATA_ABERTURA em [inicio, fim) e posterior a `posterior_a`.
+
+    Sem nenhum limite, a faixa é o armazém inteiro, incluindo os chamados sem data de abertura; com algum
+    limite, eles ficam de fora (como na comparação com NaT).
+
+    Returns:
+        tuple: (linha inicial, linha final), com a <= b.
+    """
+    if inicio is None and fim is None and posterior_a is None:
+        return 0, indice['linhas']
+    a = indice['sem_data']
+    if inicio is not None:
+        a = max(a, _posicao(caminho, indice, inicio, 'left'))
+    if posterior_a is not None:
+        a = max(a, _posicao(caminho, indice, posterior_a, 'right'))
+    b = indice['linhas'] if fim is None else _posicao(caminho, indice, fim, 'left')
+    return a, max(a, b)
+
+
+def ler_linhas(caminho, indice, inicio, fim, colunas=None):
+    """
+    Lê as linhas [inicio, fim) do armazém, apenas com `colunas` (todas, se None).
+
+    Returns:
+        pd.DataFrame: Chamados no esquema compacto, com os benchmarks em `df.attrs['benchmarks']`.
+    """
+    dados = {}
+    for coluna, info in indice['colunas'].items():
+        if colunas is not None and coluna not in colunas:
+            continue
+        valores = np.array(_mapear(caminho, coluna, info['tipo'], inicio, fim))
+        if 'categorias' in info:
+            valores = pd.Categorical.from_codes(valores, dtype=pd.CategoricalDtype(info['categorias']))
+        dados[coluna] = valores
+    df = pd.DataFrame(dados)
+    if indice['benchmarks']:
+        df.attrs['benchmarks'] = dict(indice['benchmarks'])
+    return df
+
+
+def ler_armazem(caminho, inicio=None, fim=None, colunas=None):
+    """
+    Lê os chamados do armazém com DATA_ABERTURA em [inicio, fim) (todos, sem limites).
+
+    Args:
+        caminho (str): Diretório do armazém.
+        inicio, fim (str ou pd.Timestamp, opcional): Janela de datas de abertura, com início inclusivo e
+            fim exclusivo (por exemplo, '2025-03-01' e '2025-05-01' para março e abril).
+        colunas (list, opcional): Lê apenas essas colunas.
+    """
+    indice = ler_indice(caminho)
+    return ler_linhas(caminho, indice, *faixa_de_linhas(caminho, indice, inicio, fim), colunas=colunas)
+
+
+def _preparar_diretorio(caminho):
+    """
+    Cria o diretório do armazém, apagando um armazém anterior no mesmo caminho.
+    """
+    if os.path.isdir(caminho) and os.listdir(caminho):
+        if not eh_armazem(caminho) and not os.path.isdir(os.path.join(caminho, DIRETORIO_SEGMENTOS)):
+            raise FileExistsError(f"'{caminho}' existe e não é um armazém colunar.")
+        shutil.rmtree(caminho)
+    os.makedirs(caminho, exist_ok=True)
+
+
+class EscritorArmazem:
+    """
+    Grava chunks sucessivos de chamados (no esquema compacto) em um armazém colunar.
+
+    As colunas precisam ter tipo NumPy de largura fixa ou ser category; o primeiro chunk define as colunas.
+    O armazém só fica legível depois de `fechar`, que grava o índice por último.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._segmentos = os.path.join(caminho, DIRETORIO_SEGMENTOS)
+        self._tipos = None
+        # Dicionário de cada coluna de texto, na ordem em que os valores apareceram
+        self._categorias = {}
+        self._posicoes = {}
+        self._benchmarks = {}
+        _preparar_diretorio(caminho)
+        os.makedirs(self._segmentos)
+
+    def _iniciar(self, chunk):
+        if 'DATA_ABERTURA' not in chunk.columns:
+            raise ValueError("O armazém colunar é ordenado por DATA_ABERTURA, ausente do chunk.")
+        self._tipos = {}
+        for coluna in chunk.columns:
+            tipo = chunk[coluna].dtype
+            if isinstance(tipo, pd.CategoricalDtype):
+                self._categorias[coluna] = []
+                self._posicoes[coluna] = {}
+                self._tipos[coluna] = np.dtype(np.int32)
+            elif pd.api.types.is_datetime64_dtype(tipo):
+                self._tipos[coluna] = TIPO_DATAS
+            elif isinstance(tipo, np.dtype) and tipo.kind in 'biuf':
+                self._tipos[coluna] = tipo
+            else:
+                raise ValueError(f"Coluna '{coluna}' do tipo {tipo} não tem largura fixa; use o esquema compacto.")
+
+    def _valores(self, chunk, coluna):
+        serie = chunk[coluna]
+        if coluna not in self._categorias:
+            return serie.to_numpy(dtype=self._tipos[coluna])
+        posicoes = self._posicoes[coluna]
+        for categoria in serie.cat.categories:
+            if categoria not in posicoes:
+                posicoes[categoria] = len(self._categorias[coluna])
+                self._categorias[coluna].append(categoria)
+        # O último item recebe os códigos -1 (nulos)
+        mapa = np.array([posicoes[categoria] for categoria in serie.cat.categories] + [-1], dtype=np.int32)
+        return mapa[serie.cat.codes.to_numpy()]
+
+    def gravar(self, chunk):
+        if self._tipos is None:
+            self._iniciar(chunk)
+        if set(chunk.columns) != set(self._tipos):
+            raise ValueError(f"Colunas do chunk diferentes das do armazém: {list(chunk.columns)}.")
+        self._benchmarks.update(chunk.attrs.get('benchmarks', {}))
+        if chunk.empty:
+            return
+
+        meses = chunk['DATA_ABERTURA'].to_numpy(dtype=TIPO_DATAS).astype('M8[M]')
+        ordem = np.argsort(meses, kind='stable')
+        meses = meses[ordem]
+        unicos, inicios = np.unique(meses, return_index=True)
+        limites = list(inicios) + [len(meses)]
+        valores = {coluna: self._valores(chunk, coluna)[ordem] for coluna in self._tipos}
+        for mes, inicio, fim in zip(unicos, limites[:-1], limites[1:]):
+            diretorio = os.path.join(self._segmentos, SEGMENTO_SEM_DATA if np.isnat(mes) else str(mes))
+            os.makedirs(diretorio, exist_ok=True)
+            for coluna, array in valores.items():
+                with open(os.path.join(diretorio, coluna + EXTENSAO_COLUNA), 'ab') as arquivo:
+                    array[inicio:fim].tofile(arquivo)
+
+    def fechar(self):
+        """
+        Ordena cada mês por DATA_ABERTURA, grava os arquivos finais das colunas e, por último, o índice.
+        """
+        tipos = dict(self._tipos or {})
+        remapeamentos = {}
+        for coluna, categorias in self._categorias.items():
+            # Dicionários em ordem alfabética, como em `analise_cielo.esquema`
+            ordenadas = sorted(categorias)
+            posicoes = {categoria: i for i, categoria in enumerate(ordenadas)}
+            remapeamentos[coluna] = (ordenadas, np.array([posicoes[c] for c in categorias] + [-1]))
+            tipos[coluna] = _tipo_codigos(len(ordenadas))
+
+        meses = sorted(nome for nome in os.listdir(self._segmentos) if nome != SEGMENTO_SEM_DATA)
+        if os.path.isdir(os.path.join(self._segmentos, SEGMENTO_SEM_DATA)):
+            meses.insert(0, SEGMENTO_SEM_DATA)
+        indice = {'versao': VERSAO_ARMAZEM, 'linhas': 0, 'sem_data': 0, 'colunas': {}, 'meses': {},
+                  'benchmarks': self._benchmarks}
+        for coluna, tipo in tipos.items():
+            indice['colunas'][coluna] = {'tipo': tipo.str}
+            if coluna in remapeamentos:
+                indice['colunas'][coluna]['categorias'] = remapeamentos[coluna][0]
+            open(os.path.join(self.caminho, coluna + EXTENSAO_COLUNA), 'wb').close()
+
+        for mes in meses:
+            diretorio = os.path.join(self._segmentos, mes)
+            datas = np.fromfile(os.path.join(diretorio, 'DATA_ABERTURA' + EXTENSAO_COLUNA), dtype=TIPO_DATAS)
+            ordem = np.argsort(datas, kind='stable')
+            for coluna, tipo in tipos.items():
+                valores = np.fromfile(os.path.join(diretorio, coluna + EXTENSAO_COLUNA), dtype=self._tipos[coluna])
+                valores = valores[ordem]
+                if coluna in remapeamentos:
+                    valores = remapeamentos[coluna][1][valores].astype(tipo)
+                with open(os.path.join(self.caminho, coluna + EXTENSAO_COLUNA), 'ab') as arquivo:
+                    valores.tofile(arquivo)
+            inicio, fim = indice['linhas'], indice['linhas'] + len(datas)
+            if mes == SEGMENTO_SEM_DATA:
+                indice['sem_data'] = len(datas)
+            else:
+                indice['meses'][mes] = [inicio, fim]
+            indice['linhas'] = fim
+            shutil.rmtree(diretorio)
+        shutil.rmtree(self._segmentos)
+
+        temporario = os.path.join(self.caminho, ARQUIVO_INDICE + '.tmp')
+        with open(temporario, 'w') as arquivo:
+            json.dump(indice, arquivo, ensure_ascii=False, indent=1)
+        os.replace(temporario, os.path.join(self.caminho, ARQUIVO_INDICE))
@@ -0,0 +1,137 @@
+"""
+Cache em disco do dataset já tipado e das métricas, endereçado pelo conteúdo do arquivo de entrada.
+"""
+import os
+import json
+import shutil
+import hashlib
+
+import pandas as pd
+
+from .carregamento import listar_arquivos
+from .armazem import ARQUIVO_INDICE
+from .esquema import para_tabela_arrow, restaurar_benchmarks
+from .sla import assinatura_calendario
+from .instrumentacao import span
+
+# Versão da análise: incrementar sempre que a leitura, os agregados ou as métricas mudarem, para que
+# entradas calculadas por versões anteriores deixem de ser usadas
+VERSAO_ANALISE = 6
+LIMITE_CACHE_BYTES = 2 * 1024 ** 3
+BYTES_BLOCO_HASH = 1024 * 1024
+
+
+def _hash_arquivo(arquivo):
+    """
+    SHA-256 do conteúdo de um arquivo (ou de todos os arquivos de um armazém colunar), lido em blocos.
+    """
+    sha = hashlib.sha256()
+    arquivos = sorted(os.listdir(arquivo)) if os.path.isdir(arquivo) else ['']
+    for nome in arquivos:
+        with open(os.path.join(arquivo, nome) if nome else arquivo, 'rb') as fonte:
+            for bloco in iter(lambda: fonte.read(BYTES_BLOCO_HASH), b''):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+def chave_cache(filepath, por_conteudo=False, periodo=None, calendario=None, formatos_datas=None):
+    """
+    Calcula a chave do cache de um dataset.
+
+    Args:
+        filepath (str): Arquivo do dataset ou diretório com as partes.
+        por_conteudo (bool): Se True, usa o hash do conteúdo de cada arquivo (lê os bytes, mas não faz
+            parsing); caso contrário, usa tamanho e data de modificação, sem ler o arquivo. Do armazém
+            colunar, vale a data do índice, gravado por último.
+        periodo (tuple, opcional): Janela de DATA_ABERTURA analisada (ver `carregar_chamados`).
+        calendario (str ou CalendarioSLA, opcional): Calendário do SLA das métricas (ver `analise_cielo.sla`).
+        formatos_datas (dict, opcional): Formato das colunas de data do CSV (ver `carregar_chamados`); colunas
+            sem formato contam como omitidas.
+
+    Returns:
+        str: Chave hexadecimal, que também depende de `VERSAO_ANALISE`.
+    """
+    identificacao = {'versao': VERSAO_ANALISE, 'arquivos': []}
+    if periodo is not None:
+        identificacao['periodo'] = [None if limite is None else str(limite) for limite in periodo]
+    if assinatura_calendario(calendario) is not None:
+        identificacao['calendario'] = assinatura_calendario(calendario)
+    formatos = sorted((coluna, formato) for coluna, formato in (formatos_datas or {}).items() if formato)
+    if formatos:
+        identificacao['formatos_datas'] = formatos
+    for arquivo in listar_arquivos(filepath):
+        info = os.stat(os.path.join(arquivo, ARQUIVO_INDICE) if os.path.isdir(arquivo) else arquivo)
+        if por_conteudo:
+            assinatura = [os.path.basename(arquivo), _hash_arquivo(arquivo)]
+        else:
+            assinatura = [os.path.abspath(arquivo), info.st_size, info.st_mtime_ns]
+        identificacao['arquivos'].append(assinatura)
+    return hashlib.sha256(json.dumps(identificacao).encode('utf-8')).hexdigest()
+
+
+def _caminho_item(diretorio_cache, chave, nome):
+    extensao = '.feather' if nome == 'chamados' else '.pkl'
+    return os.path.join(diretorio_cache, chave, nome + extensao)
+
+
+def ler_cache(diretorio_cache, chave, nome):
+    """
+    Lê um item do cache ('chamados' é o DataFrame tipado; os demais nomes são objetos em pickle).
+
+    Returns:
+        O item armazenado, ou None se não houver entrada. A leitura marca a entrada como usada (LRU).
+    """
+    caminho = _caminho_item(diretorio_cache, chave, nome)
+    if not os.path.exists(caminho):
+        return None
+    with span(f'cache:ler:{nome}'):
+        if nome == 'chamados':
+            import pyarrow.feather as feather
+            tabela = feather.read_table(caminho)
+            item = restaurar_benchmarks(tabela.to_pandas(), tabela.schema.metadata)
+        else:
+            item = pd.read_pickle(caminho)
+    os.utime(os.path.join(diretorio_cache, chave))
+    return item
+
+
+def gravar_cache(diretorio_cache, chave, nome, item, limite_bytes=LIMITE_CACHE_BYTES):
+    """
+    Grava um item no cache e remove as entradas usadas há mais tempo até o total caber em `limite_bytes`.
+
+    O DataFrame 'chamados' é gravado em Feather (Arrow IPC), que preserva as categorias e as datas
+    e é lido sem parsing, com os benchmarks nos metadados do schema; os demais itens, em pickle.
+    """
+    diretorio_chave = os.path.join(diretorio_cache, chave)
+    os.makedirs(diretorio_chave, exist_ok=True)
+    caminho = _caminho_item(diretorio_cache, chave, nome)
+    temporario = caminho + '.tmp'
+    with span(f'cache:gravar:{nome}'):
+        if nome == 'chamados':
+            import pyarrow.feather as feather
+            feather.write_feather(para_tabela_arrow(item), temporario)
+        else:
+            pd.to_pickle(item, temporario)
+    os.replace(temporario, caminho)
+    os.utime(diretorio_chave)
+    _remover_excedente(diretorio_cache, limite_bytes, manter=chave)
+
+
+def _tamanho_diretorio(diretorio):
+    return sum(entrada.stat().st_size for entrada in os.scandir(diretorio) if entrada.is_file())
+
+
+def _remover_excedente(diretorio_cache, limite_bytes, manter=None):
+    """
+    Remove entradas inteiras do cache, da usada há mais tempo para a mais recente, até o total caber no limite.
+    """
+    entradas = [entrada for entrada in os.scandir(diretorio_cache) if entrada.is_dir()]
+    tamanhos = {entrada.path: _tamanho_diretorio(entrada.path) for entrada in entradas}
+    total = sum(tamanhos.values())
+    for entrada in sorted(entradas, key=lambda entrada: entrada.stat().st_mtime_ns):
+        if total <= limite_bytes:
+            break
+        if entrada.name == manter:
+            continue
+        shutil.rmtree(entrada.path, ignore_errors=True)
+        total -= tamanhos[entrada.path]
@@ -0,0 +1,493 @@
+"""
+Leitura do dataset de chamados (CSV, Parquet, Feather ou armazém colunar), inteiro ou em chunks, com tipos
+explícitos.
+"""
+import io
+import os
+import glob
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from .esquema import COLUNAS_CATEGORICAS, COLUNAS_BENCHMARK, compactar_chamados, restaurar_benchmarks
+from .armazem import EscritorArmazem, eh_armazem, ler_indice, faixa_de_linhas, ler_linhas
+from .instrumentacao import span
+
+COLUNAS_DATAS = ['DATA_ABERTURA', 'DATA_ENCERRAMENTO', 'DATA_LIMITE_ATENDIMENTO']
+
+# Datas sem formato declarado são lidas como ISO 8601 (o que o gerador grava). Valores em outro formato caem
+# na inferência com dia antes do mês (`dayfirst=True`), o comportamento original da leitura.
+FORMATO_DATAS_PADRAO = 'ISO8601'
+# Cache por valor distinto: usado quando, na amostra inicial da coluna, no máximo essa fração dos
+# valores é distinta (datas de abertura e limites se repetem muito; encerramentos com microssegundos, não)
+AMOSTRA_CACHE_DATAS = 10_000
+FRACAO_MAXIMA_DISTINTOS_CACHE = 0.5
+
+# Assinaturas usadas para reconhecer o formato quando a extensão do arquivo não é conhecida
+EXTENSOES_FORMATOS = {'.csv': 'csv', '.parquet': 'parquet', '.feather': 'feather', '.arrow': 'feather',
+                      '.colunar': 'colunar'}
+ASSINATURAS_FORMATOS = {b'PAR1': 'parquet', b'ARROW1': 'feather'}
+# Linhas lidas por vez ao converter um dataset para o armazém colunar
+CHUNK_SIZE_CONVERSAO = 1_000_000
+
+
+def detectar_formato(filepath):
+    """
+    Detecta o formato do dataset ('csv', 'parquet', 'feather' ou 'colunar') pela extensão ou pelos bytes iniciais.
+
+    Diretórios são armazéns colunares (ver `analise_cielo.armazem`) ou datasets gravados em partes, que
+    assumem o formato da primeira parte encontrada.
+    """
+    if os.path.isdir(filepath):
+        if eh_armazem(filepath):
+            return 'colunar'
+        partes = sorted(glob.glob(os.path.join(filepath, 'part-*')))
+        if not partes:
+            raise FileNotFoundError(filepath)
+        return detectar_formato(partes[0])
+
+    extensao = os.path.splitext(filepath)[1].lower()
+    if extensao in EXTENSOES_FORMATOS:
+        return EXTENSOES_FORMATOS[extensao]
+
+    with open(filepath, 'rb') as arquivo:
+        inicio = arquivo.read(8)
+    for assinatura, formato in ASSINATURAS_FORMATOS.items():
+        if inicio.startswith(assinatura):
+            return formato
+    return 'csv'
+
+
+def _converter_valores(valores, formato):
+    """
+    Converte um array de textos em datas no `formato` declarado ou, sem formato, como ISO 8601.
+    """
+    if formato is not None:
+        return pd.to_datetime(valores, format=formato)
+    try:
+        return pd.to_datetime(valores, format=FORMATO_DATAS_PADRAO)
+    except ValueError:
+        # Formato desconhecido: inferência com dia antes do mês, como na leitura original
+        return pd.to_datetime(valores, dayfirst=True)
+
+
+def converter_datas(serie, formato=None):
+    """
+    Converte uma coluna de textos (ou category de textos) em datetime64, convertendo cada valor distinto uma vez.
+
+    Args:
+        serie (pd.Series): Coluna lida do CSV.
+        formato (str, opcional): Formato `strftime` declarado para a coluna (por exemplo, '%d/%m/%Y %H:%M').
+            Sem formato, usa o caminho rápido de ISO 8601 e, se falhar, a inferência com `dayfirst=True`.
+
+    Returns:
+        pd.Series: Datas em datetime64, com o mesmo índice de `serie`.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos, unicos = serie.cat.codes.to_numpy(), serie.cat.categories
+    else:
+        amostra = serie.iloc[:AMOSTRA_CACHE_DATAS]
+        if amostra.nunique() > len(amostra) * FRACAO_MAXIMA_DISTINTOS_CACHE:
+            return pd.Series(_converter_valores(serie, formato), index=serie.index, name=serie.name)
+        codigos, unicos = pd.factorize(serie)
+    datas = _converter_valores(unicos, formato).to_numpy()
+    # Códigos -1 (nulos) apontam para o último valor e são substituídos por NaT
+    valores = datas[codigos] if len(datas) else np.full(len(codigos), np.datetime64('NaT'), dtype='M8[ns]')
+    valores[codigos < 0] = np.datetime64('NaT')
+    return pd.Series(valores, index=serie.index, name=serie.name)
+
+
+def _aplicar_tipos(df, formatos_datas=None):
+    """
+    Garante os tipos explícitos do dataset: datetime64 para as datas e o esquema compacto de
+    `compactar_chamados` (dicionários compartilhados, PRAZO_HORAS em int16 e benchmarks em `df.attrs`).
+    """
+    formatos_datas = formatos_datas or {}
+    for coluna in COLUNAS_DATAS:
+        if coluna in df.columns and not pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = converter_datas(df[coluna], formatos_datas.get(coluna))
+    return compactar_chamados(df)
+
+
+def _opcoes_csv_arrow(formatos_datas, colunas=None):
+    """
+    Tipos explícitos das colunas para o leitor de CSV do pyarrow (ver `_ler_csv_arrow`).
+    """
+    import pyarrow as pa
+    import pyarrow.csv as csv
+
+    dicionario = pa.dictionary(pa.int32(), pa.string())
+    tipos = {coluna: dicionario for coluna in COLUNAS_CATEGORICAS}
+    tipos.update({coluna: dicionario if coluna in formatos_datas else pa.timestamp('ns')
+                  for coluna in COLUNAS_DATAS})
+    tipos.update({'PRAZO_HORAS': pa.int64(), **{coluna: pa.float64() for coluna in COLUNAS_BENCHMARK}})
+    return csv.ConvertOptions(column_types=tipos, strings_can_be_null=True, include_columns=colunas)
+
+
+def _ler_csv_arrow(filepath, formatos_datas):
+    """
+    Lê um CSV inteiro com o leitor do pyarrow, sem criar um objeto Python por valor de texto.
+
+    Datas sem formato declarado são convertidas pelo próprio leitor (ISO 8601); as de formato declarado e
+    as colunas de texto chegam como dicionário (category), de modo que cada valor distinto é convertido uma vez.
+    """
+    import pyarrow.csv as csv
+
+    return csv.read_csv(filepath, convert_options=_opcoes_csv_arrow(formatos_datas)).to_pandas()
+
+
+def _iterar_csv_arrow(fonte, chunk_size, formatos_datas, colunas, nomes):
+    """
+    Lê linhas de CSV sem cabeçalho (colunas `nomes`) em chunks de `chunk_size` linhas com o leitor
+    incremental do pyarrow (mesmos tipos de `_ler_csv_arrow`), acumulando os blocos até completar cada chunk.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as csv
+
+    leitor = csv.open_csv(fonte, read_options=csv.ReadOptions(column_names=nomes),
+                          convert_options=_opcoes_csv_arrow(formatos_datas, colunas))
+    pendentes, linhas = [], 0
+    for lote in leitor:
+        pendentes.append(lote)
+        linhas += lote.num_rows
+        while linhas >= chunk_size:
+            tabela = pa.Table.from_batches(pendentes, schema=leitor.schema)
+            yield tabela.slice(0, chunk_size).to_pandas()
+            restante = tabela.slice(chunk_size)
+            pendentes, linhas = restante.to_batches(), restante.num_rows
+    if linhas:
+        yield pa.Table.from_batches(pendentes, schema=leitor.schema).to_pandas()
+
+
+def _iterar_csv(arquivo, chunk_size, inicio_bytes=0, fim_bytes=None, formatos_datas=None, colunas=None):
+    """
+    Lê em chunks as linhas de um CSV entre `inicio_bytes` e `fim_bytes` (inícios de linha), sem aplicar tipos.
+
+    Com o pyarrow, o trecho é lido do arquivo mapeado em memória, sem cópia. Se alguma data não for ISO 8601
+    (nem do formato declarado), o restante do trecho é lido pelo `read_csv` do pandas.
+    """
+    with open(arquivo, 'rb') as fonte:
+        nomes = fonte.readline().decode('utf-8').strip().split(',')
+        inicio = max(inicio_bytes, fonte.tell())
+    fim = os.path.getsize(arquivo) if fim_bytes is None else fim_bytes
+    if fim <= inicio:
+        if inicio_bytes == 0 and fim_bytes is None:
+            # CSV só com o cabeçalho: um chunk vazio com as colunas, como o `read_csv(chunksize=...)` do pandas
+            yield pd.DataFrame({nome: pd.Series(dtype=object) for nome in nomes if colunas is None or nome in colunas})
+        return
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        pa = None
+    lidas = 0
+    if pa is not None:
+        with pa.memory_map(arquivo) as mapa:
+            lotes = _iterar_csv_arrow(pa.BufferReader(mapa.read_at(fim - inicio, inicio)), chunk_size,
+                                      formatos_datas or {}, colunas, nomes)
+            while True:
+                try:
+                    chunk = next(lotes, None)
+                except pa.ArrowInvalid:
+                    break
+                if chunk is None:
+                    return
+                lidas += len(chunk)
+                yield chunk
+
+    dtype = {coluna: 'category' for coluna in COLUNAS_CATEGORICAS if colunas is None or coluna in colunas}
+    with open(arquivo, 'rb') as fonte:
+        fonte.seek(inicio)
+        # Trecho que não vai até o fim do arquivo: lido para a memória, para o pandas parar no limite
+        trecho = fonte if fim_bytes is None else io.BytesIO(fonte.read(fim - inicio))
+        yield from pd.read_csv(trecho, sep=',', header=None, names=nomes, usecols=colunas, chunksize=chunk_size,
+                               dtype=dtype, skiprows=lidas)
+
+
+def _ler_csv(filepath, formatos_datas):
+    """
+    Lê um CSV inteiro: pelo pyarrow quando disponível e, se ele não estiver instalado ou alguma data não for
+    ISO 8601 (nem do formato declarado), pelo `read_csv` do pandas, convertendo as datas depois.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        pa = None
+    if pa is not None:
+        try:
+            return _ler_csv_arrow(filepath, formatos_datas)
+        except pa.ArrowInvalid:
+            pass
+    return pd.read_csv(filepath, sep=',', dtype={coluna: 'category' for coluna in COLUNAS_CATEGORICAS})
+
+
+def _ler_arquivo(filepath, formato, formatos_datas=None, periodo=None):
+    """
+    Lê um único arquivo do dataset no formato informado. Do armazém colunar, lê só as linhas do `periodo`.
+    """
+    if formato == 'colunar':
+        indice = ler_indice(filepath)
+        return ler_linhas(filepath, indice, *faixa_de_linhas(filepath, indice, *_limites_periodo(periodo)))
+    if formato in ('parquet', 'feather'):
+        import pyarrow.parquet as pq
+        import pyarrow.feather as feather
+        tabela = pq.read_table(filepath) if formato == 'parquet' else feather.read_table(filepath)
+        return restaurar_benchmarks(tabela.to_pandas(), tabela.schema.metadata)
+    return _ler_csv(filepath, formatos_datas or {})
+
+
+def listar_arquivos(filepath):
+    """
+    Lista os arquivos do dataset: o próprio arquivo (ou armazém) ou as partes `part-*` de um diretório.
+    """
+    if os.path.isdir(filepath) and not eh_armazem(filepath):
+        return sorted(glob.glob(os.path.join(filepath, 'part-*')))
+    return [filepath]
+
+
+def _limites_periodo(periodo):
+    """
+    Início (inclusivo) e fim (exclusivo) de um período `(inicio, fim)` como Timestamps; None sem limite.
+    """
+    if periodo is None:
+        return None, None
+    return tuple(None if limite is None else pd.Timestamp(limite) for limite in periodo)
+
+
+def _filtrar_periodo(df, inicio, fim):
+    """
+    Linhas de `df` com DATA_ABERTURA em [inicio, fim).
+    """
+    if inicio is None and fim is None:
+        return df
+    mascara = np.ones(len(df), dtype=bool)
+    if inicio is not None:
+        mascara &= (df['DATA_ABERTURA'] >= inicio).to_numpy()
+    if fim is not None:
+        mascara &= (df['DATA_ABERTURA'] < fim).to_numpy()
+    return df if mascara.all() else df[mascara]
+
+
+def carregar_chamados(filepath, formatos_datas=None, periodo=None):
+    """
+    Carrega o dataset de chamados em CSV, Parquet, Feather (Arrow IPC) ou armazém colunar, com tipos explícitos.
+
+    Args:
+        filepath (str): Arquivo do dataset, diretório com as partes `part-*` geradas em paralelo ou armazém
+            colunar (ver `analise_cielo.armazem`).
+        formatos_datas (dict, opcional): Formato `strftime` das colunas de data do CSV, por coluna
+            (por exemplo, {'DATA_ABERTURA': '%d/%m/%Y'}). Colunas omitidas são lidas como ISO 8601.
+        periodo (tuple, opcional): `(inicio, fim)` de DATA_ABERTURA, com início inclusivo e fim exclusivo
+            (None em qualquer lado = sem limite), por exemplo ('2025-03-01', '2025-05-01'). Do armazém
+            colunar, só as linhas do período são lidas; dos demais formatos, o dataset é lido e filtrado.
+
+    Returns:
+        pd.DataFrame: Chamados no esquema compacto (ver `analise_cielo.esquema`), com datas em datetime64
+            e os valores de benchmark em `df.attrs['benchmarks']`.
+    """
+    formato = detectar_formato(filepath)
+    with span('carregar_chamados', formato=formato) as medicao:
+        arquivos = listar_arquivos(filepath)
+        if arquivos != [filepath]:
+            df = pd.concat([_ler_arquivo(parte, formato, formatos_datas, periodo) for parte in arquivos],
+                           ignore_index=True)
+        else:
+            df = _ler_arquivo(filepath, formato, formatos_datas, periodo)
+        df = _aplicar_tipos(df, formatos_datas)
+        if formato != 'colunar' and periodo is not None:
+            df = _filtrar_periodo(df, *_limites_periodo(periodo)).reset_index(drop=True)
+        medicao.linhas = len(df)
+    return df
+
+
+def iterar_chunks_arquivo(arquivo, formato, chunk_size, marca_dagua=None, inicio_bytes=0, formatos_datas=None,
+                          colunas=None, fim_bytes=None, unidades=None, periodo=None):
+    """
+    Lê um único arquivo do dataset em chunks, opcionalmente apenas com as linhas posteriores à marca d'água.
+
+    Args:
+        arquivo (str): Arquivo do dataset (ou diretório do armazém colunar).
+        formato (str): 'csv', 'parquet', 'feather' ou 'colunar'.
+        chunk_size (int): Número máximo de linhas por chunk.
+        marca_dagua (pd.Timestamp, opcional): Quando informada, só retorna chunks com DATA_ABERTURA posterior
+            a ela. Row groups do Parquet e record batches do Feather inteiramente anteriores são descartados
+            sem serem convertidos, pelas estatísticas do Parquet ou pelo máximo da coluna no lote; no
+            armazém colunar, a leitura começa na primeira linha posterior à marca.
+        inicio_bytes (int): Para CSV, posição a partir da qual ler (início de uma linha). O cabeçalho
+            continua sendo lido da primeira linha do arquivo.
+        formatos_datas (dict, opcional): Formato das colunas de data do CSV (ver `carregar_chamados`).
+        colunas (list, opcional): Lê apenas essas colunas (as demais nem são convertidas).
+        fim_bytes (int, opcional): Para CSV, posição (início de uma linha) em que parar a leitura.
+        unidades (range, opcional): Para Parquet e Feather, os row groups ou record batches a ler; para o
+            armazém colunar, as linhas.
+        periodo (tuple, opcional): Só retorna chamados com DATA_ABERTURA no período `(inicio, fim)` (ver
+            `carregar_chamados`). Row groups e lotes fora do período são descartados como os anteriores à
+            marca d'água; do armazém colunar, só as linhas do período são lidas.
+    """
+    inicio_periodo, fim_periodo = _limites_periodo(periodo)
+
+    def filtrar(chunk, metadados=None):
+        chunk = _aplicar_tipos(restaurar_benchmarks(chunk, metadados), formatos_datas)
+        if marca_dagua is not None:
+            chunk = chunk[chunk['DATA_ABERTURA'] > marca_dagua]
+        return _filtrar_periodo(chunk, inicio_periodo, fim_periodo)
+
+    def descartar(minimo, maximo):
+        # Pelo mínimo e máximo de DATA_ABERTURA de um row group ou lote, nenhuma linha passa pelos filtros
+        if maximo is None:
+            return False
+        return ((marca_dagua is not None and maximo <= marca_dagua)
+                or (inicio_periodo is not None and maximo < inicio_periodo)
+                or (fim_periodo is not None and minimo >= fim_periodo))
+
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(arquivo)
+        grupos = list(range(parquet.metadata.num_row_groups) if unidades is None else unidades)
+        if marca_dagua is not None or periodo is not None:
+            indice = parquet.schema_arrow.get_field_index('DATA_ABERTURA')
+            grupos = [grupo for grupo in grupos
+                      if not descartar(*_minimo_maximo_grupo(parquet.metadata.row_group(grupo).column(indice)))]
+        if not grupos:
+            return
+        for lote in parquet.iter_batches(batch_size=chunk_size, row_groups=grupos, columns=colunas):
+            yield filtrar(lote.to_pandas(), parquet.schema_arrow.metadata)
+    elif formato == 'feather':
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        with pa.memory_map(arquivo) as fonte:
+            leitor = pa.ipc.open_file(fonte)
+            for i in range(leitor.num_record_batches) if unidades is None else unidades:
+                lote = leitor.get_batch(i)
+                if (marca_dagua is not None or periodo is not None) and lote.num_rows:
+                    extremos = pc.min_max(lote.column('DATA_ABERTURA'))
+                    minimo, maximo = extremos['min'].as_py(), extremos['max'].as_py()
+                    if maximo is not None and descartar(pd.Timestamp(minimo), pd.Timestamp(maximo)):
+                        continue
+                if colunas is not None:
+                    lote = lote.select(colunas)
+                for inicio in range(0, lote.num_rows, chunk_size):
+                    yield filtrar(lote.slice(inicio, chunk_size).to_pandas(), leitor.schema.metadata)
+    elif formato == 'colunar':
+        indice = ler_indice(arquivo)
+        inicio, fim = faixa_de_linhas(arquivo, indice, inicio_periodo, fim_periodo, marca_dagua)
+        if unidades is not None:
+            inicio, fim = max(inicio, unidades.start), min(fim, unidades.stop)
+        for linha in range(inicio, fim, chunk_size):
+            yield filtrar(ler_linhas(arquivo, indice, linha, min(linha + chunk_size, fim), colunas))
+    else:
+        for chunk in _iterar_csv(arquivo, chunk_size, inicio_bytes, fim_bytes, formatos_datas, colunas):
+            yield filtrar(chunk)
+
+
+def _minimo_maximo_grupo(coluna):
+    """
+    Mínimo e máximo de DATA_ABERTURA pelas estatísticas de um row group do Parquet; (None, None) sem elas.
+    """
+    estatisticas = coluna.statistics
+    if estatisticas is None or not estatisticas.has_min_max:
+        return None, None
+    return pd.Timestamp(estatisticas.min), pd.Timestamp(estatisticas.max)
+
+
+def iterar_chunks(filepath, chunk_size, formatos_datas=None, colunas=None, periodo=None):
+    """
+    Lê o dataset em chunks de até `chunk_size` linhas, com os mesmos tipos de `carregar_chamados`.
+
+    Apenas um chunk fica em memória por vez: CSV pelo leitor incremental do pyarrow (ou, sem ele,
+    `read_csv(chunksize=...)`), Parquet por lotes de row groups, Feather/Arrow IPC por fatias dos
+    record batches mapeados em memória e o armazém colunar por faixas de linhas mapeadas em memória.
+    Com `colunas`, só essas colunas são lidas; com `periodo`, só os chamados do período (ver `carregar_chamados`).
+    """
+    formato = detectar_formato(filepath)
+    for arquivo in listar_arquivos(filepath):
+        yield from iterar_chunks_arquivo(arquivo, formato, chunk_size, formatos_datas=formatos_datas,
+                                         colunas=colunas, periodo=periodo)
+
+
+def converter_para_armazem(filepath, caminho_armazem, chunk_size=CHUNK_SIZE_CONVERSAO, formatos_datas=None):
+    """
+    Grava o dataset (em qualquer formato) como armazém colunar, lendo-o em chunks de `chunk_size` linhas.
+
+    Returns:
+        str: `caminho_armazem`.
+    """
+    with span('converter_para_armazem', chunk_size=chunk_size) as medicao:
+        escritor = EscritorArmazem(caminho_armazem)
+        linhas = 0
+        for chunk in iterar_chunks(filepath, chunk_size, formatos_datas):
+            escritor.gravar(chunk)
+            linhas += len(chunk)
+        escritor.fechar()
+        medicao.linhas = linhas
+    return caminho_armazem
+
+
+def _limites_csv(arquivo, num_partes):
+    """
+    Posições (inícios de linha) que dividem as linhas de dados de um CSV em até `num_partes` trechos.
+    """
+    tamanho = os.path.getsize(arquivo)
+    with open(arquivo, 'rb') as fonte:
+        fonte.readline()
+        inicio = fonte.tell()
+        limites = [inicio]
+        for i in range(1, num_partes):
+            fonte.seek(max(inicio + (tamanho - inicio) * i // num_partes - 1, limites[-1]))
+            fonte.readline()
+            if fonte.tell() > limites[-1] and fonte.tell() < tamanho:
+                limites.append(fonte.tell())
+    return limites + [tamanho]
+
+
+def particionar(filepath, num_particoes, periodo=None):
+    """
+    Divide o dataset em partições independentes, para leitura em paralelo.
+
+    Cada arquivo (ou parte `part-*`) é dividido em trechos contíguos: intervalos de bytes alinhados ao início
+    das linhas no CSV, faixas de row groups no Parquet, de record batches no Feather e de linhas no armazém
+    colunar (apenas as do `periodo`, quando informado). Cada processo lê
+    apenas a sua partição diretamente do arquivo (mapeado em memória no CSV e no Feather), sem que os dados
+    passem pelo processo principal.
+
+    Args:
+        filepath (str): Arquivo do dataset ou diretório com as partes.
+        num_particoes (int): Número desejado de partições (o número real depende dos row groups e batches).
+
+    Returns:
+        list: Partições, na ordem do dataset, como dicts de argumentos de `iterar_chunks_arquivo`
+            ('arquivo', 'formato' e 'inicio_bytes'/'fim_bytes' ou 'unidades').
+    """
+    formato = detectar_formato(filepath)
+    arquivos = listar_arquivos(filepath)
+    partes_por_arquivo = max(1, -(-num_particoes // len(arquivos)))
+    particoes = []
+    for arquivo in arquivos:
+        if formato == 'colunar':
+            inicio, fim = faixa_de_linhas(arquivo, ler_indice(arquivo), *_limites_periodo(periodo))
+            limites = np.linspace(inicio, fim, min(partes_por_arquivo, max(fim - inicio, 1)) + 1).astype(int)
+            particoes.extend({'arquivo': arquivo, 'formato': formato, 'unidades': range(a, b)}
+                             for a, b in zip(limites[:-1], limites[1:]) if b > a)
+            continue
+        if formato == 'csv':
+            if importlib.util.find_spec('pyarrow') is None:
+                # Sem o pyarrow, cada arquivo CSV é lido inteiro por um único processo
+                particoes.append({'arquivo': arquivo, 'formato': formato})
+                continue
+            limites = _limites_csv(arquivo, partes_por_arquivo)
+            particoes.extend({'arquivo': arquivo, 'formato': formato, 'inicio_bytes': inicio, 'fim_bytes': fim}
+                             for inicio, fim in zip(limites[:-1], limites[1:]))
+            continue
+        if formato == 'parquet':
+            import pyarrow.parquet as pq
+            num_unidades = pq.ParquetFile(arquivo).metadata.num_row_groups
+        else:
+            import pyarrow as pa
+            with pa.memory_map(arquivo) as fonte:
+                num_unidades = pa.ipc.open_file(fonte).num_record_batches
+        for indices in np.array_split(np.arange(num_unidades), min(partes_por_arquivo, max(num_unidades, 1))):
+            if len(indices):
+                particoes.append({'arquivo': arquivo, 'formato': formato,
+                                  'unidades': range(int(indices[0]), int(indices[-1]) + 1)})
+    return particoes
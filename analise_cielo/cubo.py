@@ -0,0 +1,270 @@
+"""
+Cubo LOCAL × SERVICO × ANO_MES_ABERTURA com medidas aditivas, para detalhar e consolidar qualquer recorte
+sem voltar às linhas do dataset.
+
+Cada célula guarda contagens e somas em arrays NumPy densos: chamados, cancelados (também por
+MOTIVO_CANCELAMENTO), atendidos, atendidos no prazo, soma e soma dos quadrados do tempo de atendimento e do
+tempo em relação ao prazo, e o histograma dos dias em relação ao prazo. Por serem aditivas, as medidas de
+qualquer combinação de células são somas de fatias do cubo, e dois cubos (de chunks, partes ou processos) são
+combinados somando-os célula a célula (`combinar_cubos`).
+
+Convenções dos tempos (ver `analise_cielo.sla`):
+    - as somas SOMA_* e as médias e desvios de `consultar` são em dias fracionários (horas exatas / 24), os
+      mesmos do relatório, e não nos dias inteiros das colunas TEMPO_ATENDIMENTO_DIAS e
+      DIAS_EM_RELACAO_AO_PRAZO_LIMITE;
+    - o histograma usa a coluna DIAS_EM_RELACAO_AO_PRAZO_LIMITE, em dias iniciados (2 horas de atraso caem na
+      faixa 1; 2 horas de adiantamento, na faixa 0).
+
+Exemplo:
+    >>> cubo = construir_cubo(derivar_colunas(carregar_chamados('input/dataset_cielo.parquet')))
+    >>> cubo.consultar(local='Guarulhos', servico='Manutenção', mes='2025-03')
+    >>> cubo.consultar(por=['LOCAL', 'SERVICO'])
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+DIMENSOES = ['LOCAL', 'SERVICO', 'ANO_MES_ABERTURA']
+# Contagens (inteiras) seguidas das somas (em dias fracionários)
+CONTAGENS = ['CHAMADOS', 'CANCELADOS', 'ATENDIDOS', 'NO_PRAZO']
+MEDIDAS = [
+    'CHAMADOS', 'CANCELADOS', 'ATENDIDOS', 'NO_PRAZO',
+    'SOMA_TEMPO_ATENDIMENTO_DIAS', 'SOMA_QUADRADOS_TEMPO_ATENDIMENTO_DIAS',
+    'SOMA_DIAS_EM_RELACAO_AO_PRAZO_LIMITE', 'SOMA_QUADRADOS_DIAS_EM_RELACAO_AO_PRAZO_LIMITE',
+]
+# Histograma de DIAS_EM_RELACAO_AO_PRAZO_LIMITE (dias iniciados): uma faixa por dia entre os limites e uma
+# para cada extremo
+LIMITES_HISTOGRAMA_PRAZO = (-10, 10)
+
+
+def _faixas_histograma():
+    inferior, superior = LIMITES_HISTOGRAMA_PRAZO
+    return [f'<{inferior}'] + [str(dia) for dia in range(inferior, superior + 1)] + [f'>{superior}']
+
+
+class CuboChamados:
+    """
+    Medidas aditivas por célula LOCAL × SERVICO × ANO_MES_ABERTURA. Use `construir_cubo` para montá-lo.
+
+    Atributos:
+        eixos (dict): Rótulos de cada dimensão, na ordem dos arrays.
+        motivos (list): Rótulos de MOTIVO_CANCELAMENTO, na ordem de `cancelamentos`.
+        medidas (np.ndarray): float64 (locais, serviços, meses, len(MEDIDAS)); as contagens são exatas.
+        cancelamentos (np.ndarray): int64 (locais, serviços, meses, motivos), cancelados por motivo.
+        histograma (np.ndarray): int64 (locais, serviços, meses, faixas), atendidos por faixa de dias em
+            relação ao prazo (ver `LIMITES_HISTOGRAMA_PRAZO`).
+    """
+
+    def __init__(self, eixos, motivos, medidas, cancelamentos, histograma):
+        self.eixos = eixos
+        self.motivos = motivos
+        self.medidas = medidas
+        self.cancelamentos = cancelamentos
+        self.histograma = histograma
+
+    def _selecao(self, dimensao, valores):
+        rotulos = self.eixos[dimensao]
+        if valores is None:
+            return np.arange(len(rotulos))
+        if dimensao == 'ANO_MES_ABERTURA':
+            valores = [pd.Period(valor, freq='M') for valor in np.atleast_1d(valores)]
+        posicoes = {rotulo: i for i, rotulo in enumerate(rotulos)}
+        return np.array([posicoes[valor] for valor in np.atleast_1d(valores) if valor in posicoes], dtype=int)
+
+    def _somar(self, array, por, local, servico, mes):
+        """
+        Soma de `array` nas células selecionadas, mantendo apenas as dimensões de `por`.
+
+        Returns:
+            tuple: (array com as dimensões de `por` seguidas da última dimensão de `array`, índice).
+        """
+        por = [por] if isinstance(por, str) else list(por)
+        desconhecidas = set(por) - set(DIMENSOES)
+        if desconhecidas:
+            raise ValueError(f"Dimensões desconhecidas: {sorted(desconhecidas)}. Use {DIMENSOES}.")
+        selecoes = [self._selecao(dimensao, valores)
+                    for dimensao, valores in zip(DIMENSOES, (local, servico, mes))]
+        fatia = array[np.ix_(*selecoes, np.arange(array.shape[-1]))]
+        somadas = tuple(eixo for eixo, dimensao in enumerate(DIMENSOES) if dimensao not in por)
+        fatia = fatia.sum(axis=somadas)
+        # Dimensões na ordem pedida em `por`
+        mantidas = [dimensao for dimensao in DIMENSOES if dimensao in por]
+        fatia = np.moveaxis(fatia, [mantidas.index(dimensao) for dimensao in por], list(range(len(por))))
+        if not por:
+            return fatia.reshape(1, -1), pd.Index(['Total'])
+        rotulos = [np.asarray(self.eixos[dimensao], dtype=object)[selecoes[DIMENSOES.index(dimensao)]]
+                   for dimensao in por]
+        indice = pd.MultiIndex.from_product(rotulos, names=por) if len(por) > 1 else pd.Index(rotulos[0],
+                                                                                            name=por[0])
+        return fatia.reshape(len(indice), -1), indice
+
+    def consultar(self, por=(), local=None, servico=None, mes=None):
+        """
+        Medidas e métricas do recorte, consolidadas pelas dimensões de `por`.
+
+        Args:
+            por (str ou list): Dimensões mantidas no resultado (subconjunto de `DIMENSOES`, na ordem desejada);
+                vazio consolida tudo em uma linha 'Total'.
+            local, servico, mes: Valor ou lista de valores para filtrar cada dimensão (mes como '2025-03' ou
+                pd.Period); None não filtra.
+
+        Returns:
+            pd.DataFrame: `MEDIDAS` e as métricas Taxa_Cancelamento (%), Pct_Prazo_Cumprido (%),
+                Tempo_Medio_Atendimento_Dias, Desvio_Tempo_Atendimento_Dias e Media_Dias_Em_Relacao_Ao_Prazo
+                (as três últimas, dos atendidos, em dias fracionários), sem as combinações que não têm chamados.
+        """
+        valores, indice = self._somar(self.medidas, por, local, servico, mes)
+        tabela = pd.DataFrame(valores, index=indice, columns=MEDIDAS).astype(dict.fromkeys(CONTAGENS, 'int64'))
+        tabela = tabela[tabela['CHAMADOS'] > 0]
+        atendidos = tabela['ATENDIDOS'].where(tabela['ATENDIDOS'] > 0)
+        soma_tempo = tabela['SOMA_TEMPO_ATENDIMENTO_DIAS']
+        variancia = (tabela['SOMA_QUADRADOS_TEMPO_ATENDIMENTO_DIAS'] - soma_tempo ** 2 / atendidos) / (atendidos - 1)
+        return tabela.assign(
+            Taxa_Cancelamento=tabela['CANCELADOS'] / tabela['CHAMADOS'] * 100,
+            Pct_Prazo_Cumprido=tabela['NO_PRAZO'] / atendidos * 100,
+            Tempo_Medio_Atendimento_Dias=soma_tempo / atendidos,
+            Desvio_Tempo_Atendimento_Dias=np.sqrt(variancia.clip(lower=0)),
+            Media_Dias_Em_Relacao_Ao_Prazo=tabela['SOMA_DIAS_EM_RELACAO_AO_PRAZO_LIMITE'] / atendidos,
+        )
+
+    def cancelamentos_por_motivo(self, por=(), local=None, servico=None, mes=None):
+        """
+        Cancelados por MOTIVO_CANCELAMENTO (colunas) no recorte, consolidados por `por` (ver `consultar`).
+        """
+        valores, indice = self._somar(self.cancelamentos, por, local, servico, mes)
+        tabela = pd.DataFrame(valores, index=indice, columns=pd.Index(self.motivos, name='MOTIVO_CANCELAMENTO'))
+        return tabela[tabela.sum(axis=1) > 0]
+
+    def histograma_prazo(self, por=(), local=None, servico=None, mes=None):
+        """
+        Atendidos por faixa de DIAS_EM_RELACAO_AO_PRAZO_LIMITE (colunas, em dias iniciados) no recorte (ver
+        `consultar`).
+        """
+        valores, indice = self._somar(self.histograma, por, local, servico, mes)
+        tabela = pd.DataFrame(valores, index=indice,
+                              columns=pd.Index(_faixas_histograma(), name='DIAS_EM_RELACAO_AO_PRAZO_LIMITE'))
+        return tabela[tabela.sum(axis=1) > 0]
+
+
+def _codigos(serie):
+    """
+    Códigos e rótulos de uma coluna (category ou Period), com -1 para nulos.
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(dtype=np.int64), list(serie.cat.categories)
+    codigos, rotulos = pd.factorize(serie, sort=True)
+    return codigos.astype(np.int64), list(rotulos)
+
+
+def construir_cubo(df):
+    """
+    Monta o cubo em uma única passada vetorizada sobre chamados já derivados (`derivar_colunas`).
+
+    Cada chamado é mapeado ao índice linear da sua célula, e cada medida é um `np.bincount` sobre esses
+    índices. Chamados sem LOCAL, SERVICO ou mês de abertura ficam fora do cubo.
+
+    Returns:
+        CuboChamados: Cubo com todas as categorias de LOCAL/SERVICO/MOTIVO_CANCELAMENTO e os meses presentes.
+    """
+    (local, locais), (servico, servicos), (mes, meses) = (_codigos(df[dimensao]) for dimensao in DIMENSOES)
+    motivo, motivos = _codigos(df['MOTIVO_CANCELAMENTO'])
+    forma = (len(locais), len(servicos), len(meses))
+    num_celulas = int(np.prod(forma))
+
+    # Chamados sem alguma das chaves vão para uma célula extra, descartada ao final
+    validos = (local >= 0) & (servico >= 0) & (mes >= 0)
+    celula = np.where(validos, (local * forma[1] + servico) * forma[2] + mes, num_celulas)
+    status = df['STATUS']
+    atendido = (status == 'Atendido').to_numpy()
+    cancelado = (status == 'Cancelado').to_numpy()
+
+    def somar(indices, tamanho=1, pesos=None):
+        soma = np.bincount(indices, weights=pesos, minlength=(num_celulas + 1) * tamanho)[:num_celulas * tamanho]
+        return soma.reshape(*forma, tamanho)
+
+    def contar(indices, tamanho=1):
+        # Contagens: o float64 do bincount é exato até 2**53
+        return np.rint(somar(indices, tamanho)).astype(np.int64)
+
+    # Contagens em uma única passada: 0 = outro status, 1 = cancelado, 2 = atendido fora do prazo, 3 = no prazo
+    situacao = cancelado + 2 * atendido + df['DENTRO_DO_PRAZO_LIMITE'].to_numpy(dtype=bool, na_value=False)
+    por_situacao = contar(celula * 4 + situacao, 4)
+    celula_atendido = celula[atendido]
+    tempo = df['TEMPO_ATENDIMENTO_HORAS'].to_numpy(dtype=float, na_value=0)[atendido] / 24
+    horas_prazo = df['HORAS_EM_RELACAO_AO_PRAZO_LIMITE'].to_numpy(dtype=float, na_value=0)[atendido]
+    medidas = np.concatenate([
+        por_situacao.sum(axis=-1, keepdims=True),
+        por_situacao[..., 1:2],
+        por_situacao[..., 2:].sum(axis=-1, keepdims=True),
+        por_situacao[..., 3:],
+        *(somar(celula_atendido, pesos=pesos) for pesos in (tempo, tempo ** 2, horas_prazo / 24,
+                                                           (horas_prazo / 24) ** 2)),
+    ], axis=-1)
+
+    inferior, superior = LIMITES_HISTOGRAMA_PRAZO
+    num_faixas = superior - inferior + 3
+    dias = df['DIAS_EM_RELACAO_AO_PRAZO_LIMITE'].to_numpy(dtype=float, na_value=0)[atendido]
+    faixa = (np.clip(dias, inferior - 1, superior + 1) - (inferior - 1)).astype(np.int64)
+    histograma = contar(celula_atendido * num_faixas + faixa, num_faixas)
+
+    com_motivo = cancelado & (motivo >= 0)
+    cancelamentos = contar(celula[com_motivo] * len(motivos) + motivo[com_motivo], len(motivos))
+    return CuboChamados(dict(zip(DIMENSOES, (locais, servicos, meses))), motivos, medidas, cancelamentos,
+                        histograma)
+
+
+def _expandir(array, eixo, de, para):
+    """
+    Reposiciona `array` dos rótulos `de` para os rótulos `para` (superconjunto) ao longo de `eixo`, com zeros.
+    """
+    forma = list(array.shape)
+    forma[eixo] = len(para)
+    expandido = np.zeros(forma, dtype=array.dtype)
+    posicoes = {rotulo: i for i, rotulo in enumerate(para)}
+    destino = [slice(None)] * array.ndim
+    destino[eixo] = [posicoes[rotulo] for rotulo in de]
+    expandido[tuple(destino)] = array
+    return expandido
+
+
+def combinar_cubos(cubos):
+    """
+    Soma uma lista de cubos célula a célula, unindo os rótulos de cada dimensão e os motivos.
+
+    Cubos None são ignorados; retorna None se não sobrar nenhum.
+    """
+    cubos = [cubo for cubo in cubos if cubo is not None]
+    if len(cubos) <= 1:
+        return cubos[0] if cubos else None
+    eixos = {dimensao: sorted(set().union(*(cubo.eixos[dimensao] for cubo in cubos))) for dimensao in DIMENSOES}
+    motivos = sorted(set().union(*(cubo.motivos for cubo in cubos)))
+    combinado = None
+    for cubo in cubos:
+        arrays = [cubo.medidas, cubo.cancelamentos, cubo.histograma]
+        for eixo, dimensao in enumerate(DIMENSOES):
+            if cubo.eixos[dimensao] != eixos[dimensao]:
+                arrays = [_expandir(array, eixo, cubo.eixos[dimensao], eixos[dimensao]) for array in arrays]
+        if cubo.motivos != motivos:
+            arrays[1] = _expandir(arrays[1], 3, cubo.motivos, motivos)
+        combinado = arrays if combinado is None else [total + array for total, array in zip(combinado, arrays)]
+    return CuboChamados(eixos, motivos, *combinado)
+
+
+def gravar_cubo(cubo, caminho):
+    """
+    Grava o cubo em pickle, de forma atômica (arquivo temporário + rename).
+    """
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    temporario = caminho + '.tmp'
+    pd.to_pickle(cubo, temporario)
+    os.replace(temporario, caminho)
+
+
+def ler_cubo(caminho):
+    """
+    Lê um cubo gravado por `gravar_cubo`.
+    """
+    return pd.read_pickle(caminho)
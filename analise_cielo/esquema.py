@@ -0,0 +1,133 @@
+"""
+Esquema compacto dos chamados em memória, usado tanto pelo gerador quanto pela análise.
+
+- As colunas de texto são category com dicionários compartilhados (`CATEGORIAS`): todos os chunks,
+  partes e formatos usam as mesmas categorias, na mesma ordem, com códigos de 1 byte.
+- PRAZO_HORAS é int16.
+- Os valores de benchmark, constantes em todo o dataset, ficam uma única vez em `df.attrs['benchmarks']`
+  e, nos arquivos Parquet/Feather, nos metadados do schema Arrow, em vez de colunas repetidas por linha.
+  O CSV, que não tem metadados, continua gravando uma coluna por benchmark.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_CATEGORICAS = ['LOCAL', 'SERVICO', 'STATUS', 'MOTIVO_CANCELAMENTO', 'ENTREGA']
+COLUNAS_BENCHMARK = ['PRAZO_MAXIMO_CONCORRENCIA_DIAS', 'EXPECTATIVA_CLIENTE_DIAS']
+
+# Dicionários das colunas de texto, em ordem alfabética (a mesma de `astype('category')`, da qual dependem
+# as ordenações do relatório). Valores fora do dicionário são acrescentados, mantendo a ordem alfabética.
+CATEGORIAS = {
+    'LOCAL': sorted([
+        'Pinheiros', 'Moema', 'Jardins', 'Vila Madalena', 'Lapa', 'Santo Amaro',
+        'Itaim Bibi', 'Barra Funda', 'Tatuapé', 'Guarulhos', 'Osasco'
+    ]),
+    'SERVICO': sorted(['Instalação', 'Manutenção']),
+    'STATUS': sorted(['Atendido', 'Cancelado']),
+    'MOTIVO_CANCELAMENTO': sorted([
+        'Cliente ausente', 'Solicitação do cliente', 'Problema técnico',
+        'Equipamento indisponível', 'Endereço errado'
+    ]),
+    'ENTREGA': sorted(['Sim', 'Não']),
+}
+
+TIPO_PRAZO_HORAS = np.int16
+
+# Chave dos metadados do schema Arrow (Parquet/Feather) com os valores de benchmark em JSON
+CHAVE_METADADOS_BENCHMARKS = b'cielo.benchmarks'
+
+
+def tipo_categoria(coluna, valores=()):
+    """
+    Tipo category da coluna: o dicionário compartilhado, acrescido dos `valores` que não estiverem nele.
+    """
+    categorias = CATEGORIAS[coluna]
+    extras = set(valores).difference(categorias)
+    if extras:
+        categorias = sorted(set(categorias) | extras)
+    return pd.CategoricalDtype(categorias)
+
+
+def compactar_chamados(df):
+    """
+    Converte os chamados para o esquema compacto (modificando `df`).
+
+    Colunas de benchmark só saem do DataFrame quando são constantes; caso contrário são mantidas como estão.
+
+    Returns:
+        pd.DataFrame: O próprio `df`, compactado.
+    """
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna not in df.columns:
+            continue
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            tipo = tipo_categoria(coluna, serie.cat.categories)
+            if not serie.cat.categories.equals(tipo.categories):
+                df[coluna] = serie.cat.set_categories(tipo.categories)
+        else:
+            df[coluna] = serie.astype(tipo_categoria(coluna, serie.dropna().unique()))
+
+    if 'PRAZO_HORAS' in df.columns and pd.api.types.is_integer_dtype(df['PRAZO_HORAS']):
+        limites = np.iinfo(TIPO_PRAZO_HORAS)
+        prazo = df['PRAZO_HORAS']
+        if prazo.empty or (limites.min <= prazo.min() and prazo.max() <= limites.max):
+            df['PRAZO_HORAS'] = prazo.astype(TIPO_PRAZO_HORAS)
+
+    benchmarks = dict(df.attrs.get('benchmarks', {}))
+    constantes = [coluna for coluna in COLUNAS_BENCHMARK
+                  if coluna in df.columns and df[coluna].nunique(dropna=False) <= 1]
+    for coluna in constantes:
+        if not df.empty:
+            benchmarks[coluna] = float(df[coluna].iloc[0])
+    if constantes:
+        df.drop(columns=constantes, inplace=True)
+    if benchmarks:
+        df.attrs['benchmarks'] = benchmarks
+    return df
+
+
+def benchmarks_de(df):
+    """
+    Valores de benchmark do dataset, dos metadados ou, em datasets não compactados, da primeira linha.
+    """
+    benchmarks = dict(df.attrs.get('benchmarks', {}))
+    if not df.empty:
+        for coluna in COLUNAS_BENCHMARK:
+            if coluna in df.columns and coluna not in benchmarks:
+                benchmarks[coluna] = df[coluna].iloc[0]
+    return benchmarks
+
+
+def com_colunas_benchmark(df):
+    """
+    Cópia rasa de `df` com os benchmarks de volta como colunas, para formatos sem metadados (CSV).
+    """
+    benchmarks = {coluna: valor for coluna, valor in df.attrs.get('benchmarks', {}).items()
+                  if coluna not in df.columns}
+    return df.assign(**benchmarks) if benchmarks else df
+
+
+def para_tabela_arrow(df):
+    """
+    Converte os chamados em tabela Arrow, com os benchmarks nos metadados do schema.
+    """
+    import pyarrow as pa
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    benchmarks = df.attrs.get('benchmarks')
+    if benchmarks:
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[CHAVE_METADADOS_BENCHMARKS] = json.dumps(benchmarks).encode('utf-8')
+        tabela = tabela.replace_schema_metadata(metadados)
+    return tabela
+
+
+def restaurar_benchmarks(df, metadados):
+    """
+    Copia para `df.attrs` os benchmarks dos metadados de um schema Arrow (dict de bytes ou None).
+    """
+    if metadados and CHAVE_METADADOS_BENCHMARKS in metadados:
+        df.attrs['benchmarks'] = json.loads(metadados[CHAVE_METADADOS_BENCHMARKS])
+    return df
@@ -0,0 +1,402 @@
+"""
+Gráficos do relatório, desenhados a partir de tabelas agregadas, exibidos na tela ou gravados em PNG.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from .instrumentacao import span
+
+
+def _anotar_barras(ax, formato='{:.0f}', **kwargs):
+    """
+    Escreve o valor de cada barra (vertical) acima dela.
+    """
+    for p in ax.patches:
+        ax.annotate(formato.format(p.get_height()), (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='center', xytext=(0, 5), textcoords='offset points', **kwargs)
+
+
+def _barras(rotulos, valores, paleta='viridis', horizontal=False):
+    """
+    Desenha uma barra por categoria a partir de valores já agregados, com as cores da paleta.
+    """
+    ax = plt.gca()
+    rotulos = [str(rotulo) for rotulo in rotulos]
+    posicoes = np.arange(len(rotulos))
+    # Mesma dessaturação que o seaborn aplica às barras
+    cores = sns.color_palette(paleta, len(rotulos), desat=0.75)
+    if horizontal:
+        ax.barh(posicoes, valores, height=0.8, color=cores)
+        ax.set_yticks(posicoes, rotulos)
+        ax.set_ylim(len(rotulos) - 0.5, -0.5)
+    else:
+        ax.bar(posicoes, valores, width=0.8, color=cores)
+        ax.set_xticks(posicoes, rotulos)
+        ax.set_xlim(-0.5, len(rotulos) - 0.5)
+    return ax
+
+
+def _histograma(contagens, bins):
+    """
+    Desenha o histograma a partir das contagens por valor (índice = valor), com as faixas de `np.histogram`.
+    """
+    frequencias, limites = np.histogram(contagens.index.to_numpy(dtype=float), bins=bins,
+                                        weights=contagens.to_numpy())
+    ax = plt.gca()
+    ax.bar(limites[:-1], frequencias, width=np.diff(limites), align='edge', alpha=0.75, edgecolor='white')
+    return ax
+
+
+# Gráficos do relatório. Cada função recebe apenas os dados já agregados (tabelas pequenas) e devolve a
+# figura, para que possa ser exibida na tela ou renderizada em arquivo por processos independentes.
+
+def _grafico_chamados_por_local(contagem_local):
+    plt.figure(figsize=(12, 7))
+    ax = _barras(contagem_local.index, contagem_local.values)
+    plt.title('Chamados por Local de Atendimento')
+    plt.xlabel('Local')
+    plt.ylabel('Quantidade de Chamados')
+    plt.xticks(rotation=45, ha='right')
+    # Adiciona os valores nas barras
+    _anotar_barras(ax)
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_chamados_por_servico(contagem_servico):
+    plt.figure(figsize=(8, 6))
+    ax = _barras(contagem_servico.index, contagem_servico.values)
+    plt.title('Chamados por Tipo de Serviço')
+    plt.xlabel('Serviço')
+    plt.ylabel('Quantidade de Chamados')
+    # Adiciona os valores nas barras
+    _anotar_barras(ax)
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_status(contagem_status):
+    plt.figure(figsize=(8, 6))
+    ax = _barras(contagem_status.index, contagem_status.values)
+    plt.title('Distribuição de Status dos Chamados')
+    plt.xlabel('Status')
+    plt.ylabel('Quantidade de Chamados')
+    # Adiciona os valores nas barras
+    _anotar_barras(ax)
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_motivos_cancelamento(contagem_motivos):
+    plt.figure(figsize=(10, 7))
+    ax = _barras(contagem_motivos.index, contagem_motivos.values, horizontal=True)
+    plt.title('Motivos de Cancelamento Mais Comuns')
+    plt.xlabel('Quantidade de Chamados Cancelados')
+    plt.ylabel('Motivo de Cancelamento')
+    # Adiciona os valores nas barras
+    for p in ax.patches:
+        ax.annotate(f'{int(p.get_width())}', (p.get_width(), p.get_y() + p.get_height() / 2.),
+                    ha='left', va='center', xytext=(5, 0), textcoords='offset points')
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_tempo_atendimento(tempo_atendimento, media):
+    plt.figure(figsize=(10, 6))
+    ax = _histograma(tempo_atendimento, bins=20)
+    plt.title('Distribuição do Tempo de Atendimento (Dias) para Chamados Atendidos')
+    plt.xlabel('Tempo de Atendimento (Dias)')
+    plt.ylabel('Frequência')
+    plt.tight_layout()
+
+    # Adiciona linha da média
+    plt.axvline(media, color='red', linestyle='--', label=f'Média: {media:.2f} dias')
+    plt.legend()
+
+    # Adiciona os valores nas barras do histograma
+    for p in ax.patches:
+        height = p.get_height()
+        if height > 0:  # Anota apenas barras com altura > 0
+            ax.annotate(f'{int(height)}', (p.get_x() + p.get_width() / 2., height),
+                        ha='center', va='center', xytext=(0, 5), textcoords='offset points', fontsize=8)
+    return plt.gcf()
+
+
+def _grafico_cumprimento_prazo(excedidos, no_prazo):
+    plt.figure(figsize=(8, 6))
+    ax = _barras(['Não (Excedido)', 'Sim (No Prazo)'], [excedidos, no_prazo])
+    plt.title('Cumprimento do Prazo Máximo para Encerramento para Chamados Atendidos')
+    plt.xlabel('Dentro do Prazo Limite')
+    plt.ylabel('Quantidade de Chamados')
+    # Adiciona os valores nas barras
+    _anotar_barras(ax)
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_dias_em_relacao_prazo(dias_em_relacao_prazo, media):
+    plt.figure(figsize=(10, 6))
+    ax = _histograma(dias_em_relacao_prazo, bins=30)
+    plt.title('Distribuição de Dias em Relação ao Prazo Máximo para Encerramento (Atendidos)')
+    plt.xlabel('Dias (Encerramento - Limite do Prazo)')
+    plt.ylabel('Frequência')
+    plt.axvline(0, color='red', linestyle='--', label='Limite do Prazo')  # Linha para o limite do prazo
+
+    # Adiciona a linha da média dos dias em relação ao prazo limite
+    # A legenda será 'Média: X.XX dias (Atraso)' ou 'Média: X.XX dias (Adiantamento)'
+    if media > 0:
+        label_media = f'Média: {media:.2f} dias (Atraso)'
+    elif media < 0:
+        label_media = f'Média: {abs(media):.2f} dias (Adiantamento)'
+    else:
+        label_media = f'Média: {media:.2f} dias (No Prazo)'
+
+    plt.axvline(media, color='blue', linestyle='-.', label=label_media)
+
+    plt.legend()
+    plt.tight_layout()
+    # Adiciona os valores nas barras do histograma
+    for p in ax.patches:
+        height = p.get_height()
+        if height > 0:  # Anota apenas barras com altura > 0
+            ax.annotate(f'{int(height)}', (p.get_x() + p.get_width() / 2., height),
+                        ha='center', va='center', xytext=(0, 5), textcoords='offset points', fontsize=8)
+    return plt.gcf()
+
+
+def _grafico_evolucao_mensal(chamados_por_mes):
+    plt.figure(figsize=(10, 6))  # Largura ajustada
+    ax = chamados_por_mes.plot(kind='line', marker='o', color='skyblue')
+    plt.title('Evolução Mensal do Volume de Chamados')
+    plt.xlabel('Mês da Abertura')
+    plt.ylabel('Número de Chamados')
+    plt.xticks(rotation=45, ha='right')
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    for x, y in chamados_por_mes.items():
+        ax.annotate(f'{y}', (x, y), textcoords="offset points", xytext=(0, 10), ha='center', va='bottom')
+    return plt.gcf()
+
+
+def _grafico_por_local(valores, titulo, rotulo_y, formato, largura=10):
+    """
+    Barras de uma métrica por LOCAL, já ordenada, com o valor escrito sobre cada barra.
+    """
+    plt.figure(figsize=(largura, 7))
+    ax = _barras(valores.index, valores.values)
+    plt.title(titulo)
+    plt.xlabel('Local')
+    plt.ylabel(rotulo_y)
+    plt.xticks(rotation=45, ha='right')
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    _anotar_barras(ax, formato)
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_por_servico(valores, titulo, rotulo_y, formato):
+    """
+    Barras de uma métrica por SERVICO, já ordenada, com o valor escrito sobre cada barra.
+    """
+    plt.figure(figsize=(8, 6))
+    ax = _barras(valores.index, valores.values, paleta='magma')
+    plt.title(titulo)
+    plt.xlabel('Serviço')
+    plt.ylabel(rotulo_y)
+    # Adiciona os valores nas barras
+    _anotar_barras(ax, formato)
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_motivos_por_servico(motivos_por_servico):
+    plt.figure(figsize=(12, 7))
+    # Para este gráfico (barras agrupadas por motivo), a lógica de anotação é um pouco mais complexa se quisermos o total por barra.
+    # Mas para manter a clareza e não poluir muito, vamos deixar os valores de contagem no eixo Y.
+    ax = plt.gca()
+    posicoes = np.arange(len(motivos_por_servico.index))
+    largura = 0.8 / len(motivos_por_servico.columns)
+    cores = sns.color_palette('tab10', len(motivos_por_servico.columns), desat=0.75)
+    for i, motivo in enumerate(motivos_por_servico.columns):
+        ax.bar(posicoes - 0.4 + largura * (i + 0.5), motivos_por_servico[motivo].to_numpy(), width=largura,
+               color=cores[i], label=motivo)
+    ax.set_xticks(posicoes, motivos_por_servico.index)
+    plt.title('Motivos de Cancelamento por Tipo de Serviço')
+    plt.xlabel('Tipo de Serviço')
+    plt.ylabel('Quantidade de Cancelamentos')
+    plt.xticks(rotation=45, ha='right')
+    plt.legend(title='Motivo de Cancelamento', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def _grafico_comparativo_prazos(prazos_comp):
+    plt.figure(figsize=(10, 6))
+    ax = _barras(prazos_comp['Métrica'], prazos_comp['Dias'].to_numpy(), paleta='coolwarm')
+    plt.title('Comparativo: Nosso Prazo vs. Concorrência vs. Expectativa do Cliente')
+    plt.xlabel('Métrica de Prazo')
+    plt.ylabel('Tempo em Dias')
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    # Adiciona os valores nas barras
+    _anotar_barras(ax, '{:.2f}')
+    plt.tight_layout()
+    return plt.gcf()
+
+
+# Nome estável (arquivo PNG, o mesmo de `imagens/`) de cada gráfico do relatório, na ordem de exibição
+GRAFICOS = {
+    'chamados_por_local_de_atendimento': _grafico_chamados_por_local,
+    'chamados_por_tipo_de_servico': _grafico_chamados_por_servico,
+    'distribuicao_de_status_por_chamados': _grafico_status,
+    'motivos_de_cancelamento_mais_comuns': _grafico_motivos_cancelamento,
+    'distribuicao_do_tempo_de_atendimento_para_chamados_atendidos': _grafico_tempo_atendimento,
+    'cumprimento_do_prazo_para_chamados_atendidos': _grafico_cumprimento_prazo,
+    'distribuicao_de_dias_em_relacao_ao_prazo': _grafico_dias_em_relacao_prazo,
+    'evolucao_mensal_do_volume_de_chamados': _grafico_evolucao_mensal,
+    'taxa_de_cancelamento_por_local': _grafico_por_local,
+    'percentual_de_prazo_cumprido_por_local': _grafico_por_local,
+    'tempo_medio_de_atendimento_por_local': _grafico_por_local,
+    'taxa_de_cancelamento_por_tipo_de_servico': _grafico_por_servico,
+    'perc_de_prazo_cumprido_por_tipo_de_servico': _grafico_por_servico,
+    'tempo_medio_de_atendimento_por_tipo_de_servico': _grafico_por_servico,
+    'motivo_de_cancelamento_por_tipo_de_servico': _grafico_motivos_por_servico,
+    'comparativo_nosso_prazo_concorrencia_expectativa': _grafico_comparativo_prazos,
+}
+
+
+def _texto(tabela):
+    """
+    Converte os rótulos (índice e colunas) de uma tabela agregada para texto, como exibidos nos eixos.
+    """
+    tabela = tabela.copy()
+    tabela.index = tabela.index.astype(str)
+    if hasattr(tabela, 'columns'):
+        tabela.columns = tabela.columns.astype(str)
+    return tabela
+
+
+def preparar_graficos(metricas):
+    """
+    Monta os dados de cada gráfico do relatório a partir das métricas de `calcular_metricas`.
+
+    Returns:
+        dict: Dados (argumentos da função de `GRAFICOS`) por nome de gráfico, na ordem do relatório.
+            Gráficos cujas métricas não se aplicam ao dataset ficam de fora.
+    """
+    graficos = {
+        'chamados_por_local_de_atendimento': {'contagem_local': metricas['contagem_local']},
+        'chamados_por_tipo_de_servico': {'contagem_servico': metricas['contagem_servico']},
+        'distribuicao_de_status_por_chamados': {'contagem_status': metricas['contagem_status']},
+    }
+    if metricas['motivos_cancelamento'] is not None:
+        graficos['motivos_de_cancelamento_mais_comuns'] = {'contagem_motivos': metricas['motivos_cancelamento']}
+    if metricas['estatisticas_tempo_atendimento'] is not None:
+        graficos['distribuicao_do_tempo_de_atendimento_para_chamados_atendidos'] = {
+            'tempo_atendimento': metricas['distribuicao_tempo_atendimento'],
+            'media': metricas['estatisticas_tempo_atendimento']['mean']}
+    if metricas['cumprimento_prazo'] is not None:
+        graficos['cumprimento_do_prazo_para_chamados_atendidos'] = {
+            'excedidos': metricas['cumprimento_prazo']['excedidos'],
+            'no_prazo': metricas['cumprimento_prazo']['no_prazo']}
+        graficos['distribuicao_de_dias_em_relacao_ao_prazo'] = {
+            'dias_em_relacao_prazo': metricas['distribuicao_dias_em_relacao_prazo'],
+            'media': metricas['estatisticas_dias_em_relacao_prazo']['mean']}
+    if metricas['volume_mensal'] is not None:
+        graficos['evolucao_mensal_do_volume_de_chamados'] = {'chamados_por_mes': metricas['volume_mensal']}
+    graficos['taxa_de_cancelamento_por_local'] = {
+        'valores': metricas['taxa_cancelamento_local']['Taxa_Cancelamento'],
+        'titulo': 'Taxa de Cancelamento por Local de Atendimento',
+        'rotulo_y': 'Taxa de Cancelamento (%)', 'formato': '{:.2f}%'}
+    graficos['percentual_de_prazo_cumprido_por_local'] = {
+        'valores': metricas['pct_prazo_cumprido_local'],
+        'titulo': 'Percentual de Prazo Máximo para Encerramento Cumprido por Local de Atendimento',
+        'rotulo_y': '% Prazo Cumprido', 'formato': '{:.2f}%'}
+    graficos['tempo_medio_de_atendimento_por_local'] = {
+        'valores': metricas['tempo_medio_atendimento_local'],
+        'titulo': 'Tempo Médio de Atendimento por Local de Atendimento',
+        'rotulo_y': 'Tempo Médio de Atendimento (Dias)', 'formato': '{:.2f}', 'largura': 12}
+    graficos['taxa_de_cancelamento_por_tipo_de_servico'] = {
+        'valores': metricas['taxa_cancelamento_servico']['Taxa_Cancelamento'],
+        'titulo': 'Taxa de Cancelamento por Tipo de Serviço',
+        'rotulo_y': 'Taxa de Cancelamento (%)', 'formato': '{:.2f}%'}
+    graficos['perc_de_prazo_cumprido_por_tipo_de_servico'] = {
+        'valores': metricas['pct_prazo_cumprido_servico'],
+        'titulo': 'Percentual de Prazo Máximo para Encerramento Cumprido por Tipo de Serviço',
+        'rotulo_y': '% Prazo Cumprido', 'formato': '{:.2f}%'}
+    graficos['tempo_medio_de_atendimento_por_tipo_de_servico'] = {
+        'valores': metricas['tempo_medio_atendimento_servico'],
+        'titulo': 'Tempo Médio de Atendimento por Tipo de Serviço',
+        'rotulo_y': 'Tempo Médio de Atendimento (Dias)', 'formato': '{:.2f}'}
+    if metricas['motivos_por_servico'] is not None:
+        graficos['motivo_de_cancelamento_por_tipo_de_servico'] = {
+            'motivos_por_servico': _texto(metricas['motivos_por_servico'])}
+    if metricas['comparativo_prazos'] is not None:
+        graficos['comparativo_nosso_prazo_concorrencia_expectativa'] = {
+            'prazos_comp': metricas['comparativo_prazos']}
+    return graficos
+
+
+def exibir_grafico(nome, dados):
+    """
+    Desenha um gráfico do relatório e o exibe na tela (modo interativo).
+    """
+    with span(f'grafico:{nome}'):
+        figura = GRAFICOS[nome](**dados)
+    plt.show()
+    plt.close(figura)
+
+
+def _inicializar_renderizacao():
+    """
+    Prepara um processo para renderizar gráficos sem interface gráfica.
+    """
+    plt.switch_backend('Agg')
+    plt.style.use('seaborn-v0_8')
+
+
+def _renderizar_grafico(tarefa):
+    """
+    Desenha um gráfico do relatório e o grava em PNG, fechando a figura em seguida.
+
+    Args:
+        tarefa (tuple): (nome do gráfico, dados agregados, diretório de saída).
+
+    Returns:
+        str: Caminho do arquivo gravado.
+    """
+    nome, dados, diretorio = tarefa
+    with span(f'grafico:{nome}'):
+        figura = GRAFICOS[nome](**dados)
+        caminho = os.path.join(diretorio, f'{nome}.png')
+        try:
+            figura.savefig(caminho)
+        finally:
+            plt.close(figura)
+    return caminho
+
+
+def renderizar_graficos(graficos, diretorio, num_processos=1):
+    """
+    Renderiza os gráficos do relatório em arquivos PNG, sem exibir janelas.
+
+    Args:
+        graficos (dict): Dados por nome de gráfico, como retornados por `preparar_graficos`.
+        diretorio (str): Diretório de saída; cada gráfico é gravado como `<nome>.png`.
+        num_processos (int): Número de processos que renderizam os gráficos em paralelo.
+
+    Returns:
+        list: Caminhos dos arquivos gravados, na ordem do relatório.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    tarefas = [(nome, dados, diretorio) for nome, dados in graficos.items()]
+    # Com vários processos, os spans de cada gráfico ficam nos processos filhos; aqui mede-se o total
+    with span('renderizar_graficos', graficos=len(tarefas), num_processos=num_processos):
+        if num_processos <= 1:
+            _inicializar_renderizacao()
+            return [_renderizar_grafico(tarefa) for tarefa in tarefas]
+        with ProcessPoolExecutor(max_workers=num_processos, initializer=_inicializar_renderizacao) as executor:
+            return list(executor.map(_renderizar_grafico, tarefas))
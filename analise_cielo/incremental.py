@@ -0,0 +1,135 @@
+"""
+Modo incremental: estado persistido com os agregados e a marca d'água de DATA_ABERTURA.
+"""
+import os
+
+import pandas as pd
+
+from .carregamento import detectar_formato, listar_arquivos, iterar_chunks_arquivo
+from .agregacao import combinar_resumos, resumir_chunk, resumir_colunas, combinar_resumo_colunas
+from .sla import assinatura_calendario
+from .instrumentacao import span
+
+# Versão do arquivo de estado do modo incremental; estados de outra versão são recalculados do zero
+VERSAO_ESTADO_INCREMENTAL = 4
+CHUNK_SIZE_INCREMENTAL = 1_000_000
+# Bytes finais já processados de cada CSV, usados para confirmar que o arquivo só recebeu linhas ao final
+BYTES_ASSINATURA_CSV = 4096
+
+
+def carregar_estado(caminho_estado, calendario=None):
+    """
+    Carrega o estado persistido do modo incremental.
+
+    Returns:
+        dict ou None: Estado salvo por `salvar_estado`, ou None se o arquivo não existir, for de outra versão
+            ou tiver sido calculado com outro calendário do SLA (`calendario`, ver `analise_cielo.sla`).
+    """
+    if not os.path.exists(caminho_estado):
+        return None
+    estado = pd.read_pickle(caminho_estado)
+    if not isinstance(estado, dict) or estado.get('versao') != VERSAO_ESTADO_INCREMENTAL:
+        return None
+    if estado.get('calendario') != assinatura_calendario(calendario):
+        return None
+    return estado
+
+
+def salvar_estado(estado, caminho_estado):
+    """
+    Grava o estado do modo incremental de forma atômica (arquivo temporário + rename).
+    """
+    diretorio = os.path.dirname(caminho_estado)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    temporario = caminho_estado + '.tmp'
+    pd.to_pickle(estado, temporario)
+    os.replace(temporario, caminho_estado)
+
+
+def _assinatura_csv(arquivo, fim):
+    """
+    Últimos bytes de um CSV até a posição `fim`, para verificar se o trecho já processado não mudou.
+    """
+    inicio = max(0, fim - BYTES_ASSINATURA_CSV)
+    with open(arquivo, 'rb') as fonte:
+        fonte.seek(inicio)
+        return fonte.read(fim - inicio)
+
+
+def atualizar_estado_incremental(filepath, caminho_estado, chunk_size=CHUNK_SIZE_INCREMENTAL,
+                                 formatos_datas=None, calendario=None):
+    """
+    Incorpora ao estado persistido apenas os chamados novos do dataset e grava o estado atualizado.
+
+    O estado guarda o resumo combinável (`resumir_chunk`/`combinar_resumos`, com os agregados por
+    LOCAL × SERVICO × mês), o resumo das colunas, a marca d'água (maior DATA_ABERTURA já incorporada)
+    e, por arquivo, o tamanho e a data de modificação já processados. Para que o custo dependa do
+    volume novo e não do histórico:
+        - arquivos inalterados desde a última execução não são abertos;
+        - CSVs que só cresceram ao final são lidos a partir do último byte processado, e todas as linhas
+          lidas são novas, mesmo as do dia da marca d'água;
+        - arquivos novos são lidos por inteiro;
+        - nos demais arquivos alterados, são novos os chamados com DATA_ABERTURA posterior à marca d'água,
+          o que supõe cargas por dia completo: row groups do Parquet e lotes do Feather anteriores à marca
+          são descartados sem conversão, e as linhas restantes são filtradas pela marca.
+
+    Args:
+        filepath (str): Arquivo do dataset (CSV, Parquet ou Feather) ou diretório com as partes.
+        caminho_estado (str): Arquivo de estado (pickle); criado na primeira execução.
+        chunk_size (int): Número máximo de linhas lidas por vez.
+        formatos_datas (dict, opcional): Formato das colunas de data do CSV (ver `carregar_chamados`).
+        calendario (str ou CalendarioSLA, opcional): Calendário do SLA (ver `derivar_colunas`); um estado
+            calculado com outro calendário é recalculado do zero.
+
+    Returns:
+        tuple: (estado atualizado, número de chamados novos incorporados).
+    """
+    with span('atualizar_estado_incremental') as medicao:
+        estado = carregar_estado(caminho_estado, calendario) or {
+            'versao': VERSAO_ESTADO_INCREMENTAL, 'calendario': assinatura_calendario(calendario), 'resumo': None,
+            'resumo_colunas': None, 'primeiras_linhas': None, 'marca_dagua': None, 'arquivos': {},
+        }
+        formato = detectar_formato(filepath)
+        marca_dagua = estado['marca_dagua']
+        nova_marca = marca_dagua
+        linhas_novas = 0
+
+        for arquivo in listar_arquivos(filepath):
+            chave = os.path.abspath(arquivo)
+            info = os.stat(arquivo)
+            anterior = estado['arquivos'].get(chave)
+            if (anterior is not None
+                    and (anterior['tamanho'], anterior['mtime_ns']) == (info.st_size, info.st_mtime_ns)):
+                continue
+
+            inicio_bytes = 0
+            if (formato == 'csv' and anterior is not None and info.st_size > anterior['tamanho']
+                    and _assinatura_csv(arquivo, anterior['tamanho']) == anterior['assinatura']):
+                inicio_bytes = anterior['tamanho']
+
+            # A marca d'água só filtra arquivos já vistos que não apenas cresceram: nos arquivos novos todas as
+            # linhas são novas, e nos CSVs que só cresceram o último byte processado já separa as novas
+            marca_arquivo = marca_dagua if anterior is not None and inicio_bytes == 0 else None
+            for chunk in iterar_chunks_arquivo(arquivo, formato, chunk_size, marca_arquivo, inicio_bytes,
+                                               formatos_datas):
+                if chunk.empty:
+                    continue
+                if estado['primeiras_linhas'] is None:
+                    estado['primeiras_linhas'] = chunk.head()
+                estado['resumo_colunas'] = combinar_resumo_colunas(estado['resumo_colunas'],
+                                                                   resumir_colunas(chunk))
+                estado['resumo'] = combinar_resumos(estado['resumo'], resumir_chunk(chunk, calendario))
+                maximo = chunk['DATA_ABERTURA'].max()
+                nova_marca = maximo if nova_marca is None or maximo > nova_marca else nova_marca
+                linhas_novas += len(chunk)
+
+            estado['arquivos'][chave] = {
+                'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns,
+                'assinatura': _assinatura_csv(arquivo, info.st_size) if formato == 'csv' else None,
+            }
+
+        estado['marca_dagua'] = nova_marca
+        salvar_estado(estado, caminho_estado)
+        medicao.linhas = linhas_novas
+    return estado, linhas_novas
@@ -0,0 +1,171 @@
+"""
+Instrumentação por etapas (spans): tempo, linhas processadas e variação de memória de cada trecho nomeado.
+
+Desligada por padrão, com custo praticamente nulo: `span()` devolve sempre o mesmo objeto inerte.
+Liga-se com `ativar(caminho)` ou com a variável de ambiente `CIELO_TRACE=<arquivo.json>`; ao fim do
+processo (ou em `gravar_trace`) os spans são gravados no formato de trace do Chrome, que pode ser aberto
+em chrome://tracing ou em https://ui.perfetto.dev. Cada span também é emitido no logger
+`analise_cielo.instrumentacao` (nível DEBUG) como uma linha JSON.
+
+Exemplo:
+    >>> with span('carregar') as s:
+    ...     df = carregar_chamados(caminho)
+    ...     s.linhas = len(df)
+"""
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+import multiprocessing
+
+VARIAVEL_AMBIENTE = 'CIELO_TRACE'
+
+logger = logging.getLogger(__name__)
+
+_ativo = False
+_caminho_trace = None
+_eventos = []
+_origem = time.perf_counter()
+
+try:
+    _BYTES_PAGINA = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    _BYTES_PAGINA = None
+
+
+def _rss_bytes():
+    """
+    Memória residente atual do processo (Linux); None quando não disponível.
+    """
+    if _BYTES_PAGINA is None:
+        return None
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * _BYTES_PAGINA
+    except OSError:
+        return None
+
+
+class _SpanInativo:
+    """
+    Span usado quando a instrumentação está desligada: não mede nada e ignora atribuições.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+
+_SPAN_INATIVO = _SpanInativo()
+
+
+class _Span:
+    __slots__ = ('nome', 'linhas', 'atributos', '_inicio', '_rss_inicio')
+
+    def __init__(self, nome, linhas, atributos):
+        self.nome = nome
+        self.linhas = linhas
+        self.atributos = atributos
+
+    def __enter__(self):
+        self._rss_inicio = _rss_bytes()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_excecao, *exc):
+        fim = time.perf_counter()
+        rss_fim = _rss_bytes()
+        argumentos = dict(self.atributos)
+        if self.linhas is not None:
+            argumentos['linhas'] = int(self.linhas)
+        if rss_fim is not None and self._rss_inicio is not None:
+            argumentos['rss_mb'] = round(rss_fim / 1024 ** 2, 1)
+            argumentos['delta_memoria_mb'] = round((rss_fim - self._rss_inicio) / 1024 ** 2, 1)
+        if tipo_excecao is not None:
+            argumentos['erro'] = tipo_excecao.__name__
+        evento = {
+            'name': self.nome, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+            'ts': round((self._inicio - _origem) * 1e6), 'dur': round((fim - self._inicio) * 1e6),
+            'args': argumentos,
+        }
+        _eventos.append(evento)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({'span': self.nome, 'segundos': round(fim - self._inicio, 6), **argumentos}))
+        return False
+
+
+def span(nome, linhas=None, **atributos):
+    """
+    Delimita um trecho medido. Use como `with span('nome') as s:`; `s.linhas` pode ser definido dentro do bloco.
+
+    Args:
+        nome (str): Nome do span no trace.
+        linhas (int, opcional): Linhas processadas no trecho, quando já conhecidas.
+        **atributos: Valores adicionais registrados no span.
+    """
+    if not _ativo:
+        return _SPAN_INATIVO
+    return _Span(nome, linhas, atributos)
+
+
+def instrumentacao_ativa():
+    return _ativo
+
+
+def ativar(caminho_trace=None):
+    """
+    Liga a instrumentação. Se `caminho_trace` for informado, o trace é gravado nele ao fim do processo.
+    """
+    global _ativo, _caminho_trace
+    _ativo = True
+    if caminho_trace is not None:
+        _caminho_trace = caminho_trace
+
+
+def desativar():
+    global _ativo
+    _ativo = False
+
+
+def spans_registrados():
+    """
+    Lista (cópia) dos spans registrados, no formato de eventos do trace do Chrome.
+    """
+    return list(_eventos)
+
+
+def gravar_trace(caminho=None):
+    """
+    Grava os spans registrados em JSON (formato de trace do Chrome).
+
+    Returns:
+        str ou None: Caminho gravado, ou None se não houver caminho definido.
+    """
+    caminho = caminho or _caminho_trace
+    if caminho is None:
+        return None
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    with open(caminho, 'w') as arquivo:
+        json.dump({'traceEvents': _eventos, 'displayTimeUnit': 'ms'}, arquivo, indent=1)
+    return caminho
+
+
+def _gravar_ao_sair():
+    # Processos filhos (por exemplo, os que renderizam gráficos) herdam a configuração, mas não gravam o trace
+    if _ativo and _caminho_trace is not None and _eventos and multiprocessing.parent_process() is None:
+        gravar_trace()
+
+
+if os.environ.get(VARIAVEL_AMBIENTE):
+    ativar(os.environ[VARIAVEL_AMBIENTE])
+atexit.register(_gravar_ao_sair)
@@ -0,0 +1,191 @@
+"""
+Métricas da análise calculadas a partir de um resumo de `resumir_chunk`/`combinar_resumos`.
+
+Todas as funções recebem o resumo (apenas agregados, independente do tamanho do dataset) e retornam
+Series, DataFrames ou dicts; quando a métrica não se aplica (por exemplo, nenhum chamado cancelado), retornam None.
+"""
+import pandas as pd
+
+from .esquema import COLUNAS_BENCHMARK
+from .agregacao import metricas_por, descrever_contagens
+from .ofensores import detectar_ofensores
+from .instrumentacao import span
+
+
+def contagem_por(resumo, chave):
+    """
+    Número de chamados por LOCAL ou SERVICO, em ordem decrescente.
+    """
+    return metricas_por(resumo['agregados'], chave)['CHAMADOS'].sort_values(ascending=False).rename('count')
+
+
+def contagem_status(resumo):
+    """
+    Número de chamados por STATUS, em ordem decrescente.
+    """
+    agregados = resumo['agregados']
+    return pd.Series(
+        {'Atendido': int(agregados['ATENDIDOS'].sum()), 'Cancelado': int(agregados['CANCELADOS'].sum())},
+        name='count').rename_axis('STATUS').sort_values(ascending=False)
+
+
+def motivos_cancelamento(resumo):
+    """
+    Número de chamados cancelados por MOTIVO_CANCELAMENTO, em ordem decrescente.
+    """
+    agregados = resumo['agregados']
+    if agregados['CANCELADOS'].sum() == 0:
+        return None
+    return (agregados.groupby(level='MOTIVO_CANCELAMENTO', observed=True)['CANCELADOS'].sum()
+            .sort_values(ascending=False).rename('count'))
+
+
+def estatisticas_tempo_atendimento(resumo):
+    """
+    Estatísticas descritivas do tempo de atendimento dos chamados atendidos, em dias fracionários (horas exatas
+    / 24, com resolução de uma hora), e não nos dias completos da coluna TEMPO_ATENDIMENTO_DIAS.
+    """
+    if resumo['tempo_atendimento'].sum() == 0:
+        return None
+    return descrever_contagens(resumo['tempo_atendimento'], 'TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS')
+
+
+def cumprimento_prazo(resumo):
+    """
+    Chamados atendidos dentro e fora do Prazo Máximo para Encerramento.
+
+    Returns:
+        dict ou None: 'atendidos', 'no_prazo', 'excedidos', 'pct_no_prazo' e 'horas_atraso_medio' (atraso
+            médio, em horas exatas, dos excedidos; None se nenhum excedeu o prazo).
+    """
+    agregados = resumo['agregados']
+    atendidos = int(agregados['ATENDIDOS'].sum())
+    if atendidos == 0:
+        return None
+    no_prazo = int(agregados['NO_PRAZO'].sum())
+    excedidos = atendidos - no_prazo
+    return {'atendidos': atendidos, 'no_prazo': no_prazo, 'excedidos': excedidos,
+            'pct_no_prazo': no_prazo / atendidos * 100,
+            'horas_atraso_medio': agregados['SOMA_HORAS_ATRASO'].sum() / excedidos if excedidos else None}
+
+
+def estatisticas_dias_em_relacao_prazo(resumo):
+    """
+    Estatísticas descritivas do tempo em relação ao prazo limite (positivo = atraso) dos chamados atendidos, em
+    dias fracionários (horas exatas / 24, com resolução de uma hora), e não nos dias iniciados da coluna
+    DIAS_EM_RELACAO_AO_PRAZO_LIMITE.
+    """
+    if resumo['agregados']['ATENDIDOS'].sum() == 0:
+        return None
+    return descrever_contagens(resumo['dias_em_relacao_prazo'], 'DIAS_EM_RELACAO_AO_PRAZO_LIMITE_FRACIONARIOS')
+
+
+def volume_mensal(resumo):
+    """
+    Número de chamados por mês de abertura.
+    """
+    agregados = resumo['agregados']
+    if not len(agregados):
+        return None
+    return (agregados.groupby(level='ANO_MES_ABERTURA', observed=True)['CHAMADOS'].sum()
+            .sort_index().rename('count'))
+
+
+def taxa_cancelamento_por(resumo, chave):
+    """
+    Taxa de cancelamento (%) por LOCAL ou SERVICO, em ordem decrescente.
+    """
+    metricas = metricas_por(resumo['agregados'], chave)
+    return metricas.sort_values(by='Taxa_Cancelamento', ascending=False)[['Taxa_Cancelamento']]
+
+
+def pct_prazo_cumprido_por(resumo, chave):
+    """
+    Percentual de chamados atendidos dentro do prazo por LOCAL ou SERVICO, em ordem crescente.
+    """
+    metricas = metricas_por(resumo['agregados'], chave)
+    return metricas['Pct_Prazo_Cumprido'].rename('DENTRO_DO_PRAZO_LIMITE').sort_values(ascending=True)
+
+
+def tempo_medio_atendimento_por(resumo, chave):
+    """
+    Tempo médio de atendimento (dias fracionários) dos chamados atendidos por LOCAL ou SERVICO, em ordem
+    decrescente.
+    """
+    metricas = metricas_por(resumo['agregados'], chave)
+    return (metricas['Tempo_Medio_Atendimento_Dias'].rename('TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS')
+            .sort_values(ascending=False))
+
+
+def motivos_por_servico(resumo):
+    """
+    Tabela SERVICO × MOTIVO_CANCELAMENTO com o número de chamados cancelados.
+    """
+    agregados = resumo['agregados']
+    motivos = motivos_cancelamento(resumo)
+    if motivos is None:
+        return None
+    servicos = metricas_por(agregados, 'SERVICO').index
+    return (agregados.groupby(level=['SERVICO', 'MOTIVO_CANCELAMENTO'], observed=True)['CANCELADOS']
+            .sum().unstack(fill_value=0)
+            .reindex(index=servicos, columns=motivos.sort_index().index, fill_value=0))
+
+
+def comparativo_prazos(resumo):
+    """
+    Tempo médio de atendimento da Cielo comparado ao prazo da concorrência e à expectativa do cliente.
+
+    Returns:
+        pd.DataFrame ou None: Colunas 'Métrica' e 'Dias' (NaN para a Cielo sem chamados atendidos); None se o
+            dataset não tiver as colunas de benchmark.
+    """
+    benchmarks = resumo['benchmarks']
+    if not all(coluna in benchmarks for coluna in COLUNAS_BENCHMARK):
+        return None
+    agregados = resumo['agregados']
+    atendidos = agregados['ATENDIDOS'].sum()
+    media_tempo_atendimento = agregados['SOMA_TEMPO_ATENDIMENTO_DIAS'].sum() / atendidos if atendidos else float('nan')
+    return pd.DataFrame({
+        'Métrica': ['Cielo (Nosso Prazo Real)', 'Concorrência', 'Expectativa Cliente'],
+        'Dias': [media_tempo_atendimento, benchmarks['PRAZO_MAXIMO_CONCORRENCIA_DIAS'],
+                 benchmarks['EXPECTATIVA_CLIENTE_DIAS']]
+    })
+
+
+def calcular_metricas(resumo):
+    """
+    Calcula todas as métricas do relatório.
+
+    Returns:
+        dict: Métricas por nome, incluindo as distribuições por valor usadas nos histogramas e o cubo
+            LOCAL × SERVICO × mês ('cubo') para consultas detalhadas, com os segmentos ofensores já
+            testados ('ofensores', ver `analise_cielo.ofensores`).
+    """
+    with span('calcular_metricas'):
+        return _calcular_metricas(resumo)
+
+
+def _calcular_metricas(resumo):
+    return {
+        'linhas': resumo['linhas'],
+        'contagem_local': contagem_por(resumo, 'LOCAL'),
+        'contagem_servico': contagem_por(resumo, 'SERVICO'),
+        'contagem_status': contagem_status(resumo),
+        'motivos_cancelamento': motivos_cancelamento(resumo),
+        'distribuicao_tempo_atendimento': resumo['tempo_atendimento'],
+        'estatisticas_tempo_atendimento': estatisticas_tempo_atendimento(resumo),
+        'cumprimento_prazo': cumprimento_prazo(resumo),
+        'distribuicao_dias_em_relacao_prazo': resumo['dias_em_relacao_prazo'],
+        'estatisticas_dias_em_relacao_prazo': estatisticas_dias_em_relacao_prazo(resumo),
+        'volume_mensal': volume_mensal(resumo),
+        'taxa_cancelamento_local': taxa_cancelamento_por(resumo, 'LOCAL'),
+        'pct_prazo_cumprido_local': pct_prazo_cumprido_por(resumo, 'LOCAL'),
+        'tempo_medio_atendimento_local': tempo_medio_atendimento_por(resumo, 'LOCAL'),
+        'taxa_cancelamento_servico': taxa_cancelamento_por(resumo, 'SERVICO'),
+        'pct_prazo_cumprido_servico': pct_prazo_cumprido_por(resumo, 'SERVICO'),
+        'tempo_medio_atendimento_servico': tempo_medio_atendimento_por(resumo, 'SERVICO'),
+        'motivos_por_servico': motivos_por_servico(resumo),
+        'comparativo_prazos': comparativo_prazos(resumo),
+        'cubo': resumo['cubo'],
+        'ofensores': detectar_ofensores(resumo['cubo']),
+    }
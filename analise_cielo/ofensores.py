@@ -0,0 +1,193 @@
+"""
+Detecção automática de ofensores: cada LOCAL, SERVICO e LOCAL × SERVICO comparado com o restante dos chamados.
+
+Para cada segmento são testadas três métricas contra os chamados fora dele:
+    - taxa de cancelamento (cancelados / chamados): teste z de duas proporções;
+    - percentual no prazo (no prazo / atendidos): teste z de duas proporções;
+    - tempo médio de atendimento (atendidos): teste t de Welch, com média e variância das somas do cubo.
+
+Os testes usam apenas as medidas do cubo (`analise_cielo.cubo`), todos de uma vez em arrays NumPy, e por isso
+custam o mesmo para mil ou cem milhões de chamados. Os p-valores (bilaterais) são corrigidos para comparações
+múltiplas pelo método de Holm sobre todos os testes, e um segmento é ofensor quando o p-valor ajustado fica
+abaixo de `alfa` com a métrica pior que a do restante.
+
+Exemplo:
+    >>> detectar_ofensores(metricas['cubo'])
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from .cubo import MEDIDAS
+from .instrumentacao import span
+
+ALFA_OFENSORES = 0.05
+# Segmentos comparados com o restante: nome -> dimensões do cubo
+SEGMENTOS = {'LOCAL': ['LOCAL'], 'SERVICO': ['SERVICO'], 'LOCAL × SERVICO': ['LOCAL', 'SERVICO']}
+# Acima desses graus de liberdade, a distribuição t de Welch é tratada como normal (diferença desprezível)
+GRAUS_LIBERDADE_NORMAL = 1000
+ITERACOES_FRACAO_CONTINUA = 200
+
+_lgamma = np.vectorize(math.lgamma, otypes=[float])
+_erfc = np.vectorize(math.erfc, otypes=[float])
+
+
+def _beta_incompleta(a, b, x):
+    """
+    Função beta incompleta regularizada I_x(a, b), pela fração contínua de Lentz.
+    """
+    troca = x > (a + 1) / (a + b + 2)
+    a, b, x = np.where(troca, b, a), np.where(troca, a, b), np.where(troca, 1 - x, x)
+    with np.errstate(divide='ignore'):
+        frente = np.exp(_lgamma(a + b) - _lgamma(a) - _lgamma(b) + a * np.log(x) + b * np.log1p(-x)) / a
+
+    minimo = 1e-300
+
+    def passo(numerador, c, d):
+        d = 1 + numerador * d
+        d = 1 / np.where(np.abs(d) < minimo, minimo, d)
+        c = 1 + numerador / c
+        c = np.where(np.abs(c) < minimo, minimo, c)
+        return c, d, c * d
+
+    c = np.ones_like(x)
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / np.where(np.abs(d) < minimo, minimo, d)
+    fracao = d
+    for m in range(1, ITERACOES_FRACAO_CONTINUA + 1):
+        c, d, fator = passo(m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)), c, d)
+        fracao = fracao * fator
+        c, d, fator = passo(-(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)), c, d)
+        fracao = fracao * fator
+    resultado = frente * fracao
+    return np.where(troca, 1 - resultado, resultado)
+
+
+def _p_valor_normal(z):
+    """
+    P-valor bilateral da estatística z.
+    """
+    return _erfc(np.abs(z) / math.sqrt(2))
+
+
+def _p_valor_t(t, graus_liberdade):
+    """
+    P-valor bilateral da estatística t com `graus_liberdade` (não necessariamente inteiros).
+    """
+    p = _p_valor_normal(t)
+    pequenos = np.isfinite(t) & (graus_liberdade <= GRAUS_LIBERDADE_NORMAL)
+    if pequenos.any():
+        gl, tp = graus_liberdade[pequenos], t[pequenos]
+        p[pequenos] = _beta_incompleta(gl / 2, np.full_like(gl, 0.5), gl / (gl + tp ** 2))
+    return p
+
+
+def _teste_proporcoes(sucessos, total, sucessos_resto, total_resto):
+    """
+    Teste z de duas proporções (com a proporção combinada no erro padrão).
+
+    Returns:
+        tuple: (proporção do segmento, proporção do restante, estatística z do segmento - restante, p-valor).
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p, p_resto = sucessos / total, sucessos_resto / total_resto
+        combinada = (sucessos + sucessos_resto) / (total + total_resto)
+        erro = np.sqrt(combinada * (1 - combinada) * (1 / total + 1 / total_resto))
+        z = np.where(erro > 0, (p - p_resto) / erro, np.nan)
+    return p, p_resto, z, _p_valor_normal(z)
+
+
+def _teste_welch(soma, soma_quadrados, n, soma_resto, soma_quadrados_resto, n_resto):
+    """
+    Teste t de Welch a partir de somas, somas dos quadrados e tamanhos dos dois grupos.
+
+    Returns:
+        tuple: (média do segmento, média do restante, estatística t do segmento - restante, p-valor).
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media, media_resto = soma / n, soma_resto / n_resto
+        variancia = np.maximum(soma_quadrados - soma ** 2 / n, 0) / (n - 1)
+        variancia_resto = np.maximum(soma_quadrados_resto - soma_resto ** 2 / n_resto, 0) / (n_resto - 1)
+        v, v_resto = variancia / n, variancia_resto / n_resto
+        erro = np.sqrt(v + v_resto)
+        t = np.where(erro > 0, (media - media_resto) / erro, np.nan)
+        graus_liberdade = (v + v_resto) ** 2 / (v ** 2 / (n - 1) + v_resto ** 2 / (n_resto - 1))
+    return media, media_resto, t, _p_valor_t(t, graus_liberdade)
+
+
+def ajustar_holm(p_valores):
+    """
+    P-valores ajustados pelo método de Holm (controle da taxa de erro da família); NaN fica fora da família.
+    """
+    p_valores = np.asarray(p_valores, dtype=float)
+    ajustados = np.full_like(p_valores, np.nan)
+    validos = np.flatnonzero(~np.isnan(p_valores))
+    ordem = validos[np.argsort(p_valores[validos], kind='stable')]
+    fatores = len(ordem) - np.arange(len(ordem))
+    ajustados[ordem] = np.minimum(np.maximum.accumulate(p_valores[ordem] * fatores), 1)
+    return ajustados
+
+
+def _medidas_segmentos(cubo):
+    """
+    Medidas (float) de cada segmento de `SEGMENTOS`, uma linha por segmento, e do total.
+    """
+    tabelas = []
+    for dimensao, por in SEGMENTOS.items():
+        tabela = cubo.consultar(por=por)[MEDIDAS]
+        rotulos = [' × '.join(map(str, rotulo)) if isinstance(rotulo, tuple) else str(rotulo)
+                   for rotulo in tabela.index]
+        tabelas.append(tabela.set_axis(pd.MultiIndex.from_product([[dimensao], rotulos],
+                                                                  names=['Dimensao', 'Segmento'])))
+    segmentos = pd.concat(tabelas).astype(float)
+    total = pd.Series(cubo.medidas.sum(axis=(0, 1, 2)), index=MEDIDAS, dtype=float)
+    return segmentos, total
+
+
+def detectar_ofensores(cubo, alfa=ALFA_OFENSORES, apenas_ofensores=True):
+    """
+    Testa cada LOCAL, SERVICO e LOCAL × SERVICO contra o restante dos chamados, nas três métricas do relatório.
+
+    Args:
+        cubo (CuboChamados): Cubo da análise (`metricas['cubo']` ou `construir_cubo`).
+        alfa (float): Nível de significância da família de testes (após a correção de Holm).
+        apenas_ofensores (bool): Com False, retorna todos os testes, não só os dos ofensores.
+
+    Returns:
+        pd.DataFrame: Uma linha por segmento e métrica, ordenada da maior evidência de desempenho pior para a
+            menor: 'Dimensao', 'Segmento', 'Metrica', 'Chamados', 'Valor_Segmento', 'Valor_Restante' (em % para
+            as taxas, em dias para o tempo), 'Estatistica' (z ou t, positiva quando o segmento é pior que o
+            restante), 'P_Valor', 'P_Ajustado' e 'Ofensor'.
+    """
+    with span('detectar_ofensores'):
+        segmentos, total = _medidas_segmentos(cubo)
+        resto = total - segmentos
+        testes = {
+            'Taxa_Cancelamento': (1, _teste_proporcoes(
+                segmentos['CANCELADOS'], segmentos['CHAMADOS'], resto['CANCELADOS'], resto['CHAMADOS'])),
+            'Pct_Prazo_Cumprido': (-1, _teste_proporcoes(
+                segmentos['NO_PRAZO'], segmentos['ATENDIDOS'], resto['NO_PRAZO'], resto['ATENDIDOS'])),
+            'Tempo_Medio_Atendimento_Dias': (1, _teste_welch(
+                segmentos['SOMA_TEMPO_ATENDIMENTO_DIAS'], segmentos['SOMA_QUADRADOS_TEMPO_ATENDIMENTO_DIAS'],
+                segmentos['ATENDIDOS'], resto['SOMA_TEMPO_ATENDIMENTO_DIAS'],
+                resto['SOMA_QUADRADOS_TEMPO_ATENDIMENTO_DIAS'], resto['ATENDIDOS'])),
+        }
+        tabelas = []
+        for metrica, (sentido, (valor, valor_resto, estatistica, p_valor)) in testes.items():
+            escala = 1 if metrica == 'Tempo_Medio_Atendimento_Dias' else 100
+            tabelas.append(pd.DataFrame({
+                'Metrica': metrica,
+                'Chamados': segmentos['CHAMADOS'].astype('int64'),
+                'Valor_Segmento': np.asarray(valor) * escala,
+                'Valor_Restante': np.asarray(valor_resto) * escala,
+                'Estatistica': sentido * np.asarray(estatistica),
+                'P_Valor': np.asarray(p_valor),
+            }, index=segmentos.index))
+        resultado = pd.concat(tabelas).reset_index()
+        resultado['P_Ajustado'] = ajustar_holm(resultado['P_Valor'])
+        resultado['Ofensor'] = (resultado['P_Ajustado'] < alfa) & (resultado['Estatistica'] > 0)
+        if apenas_ofensores:
+            resultado = resultado[resultado['Ofensor']]
+        return resultado.sort_values(['Ofensor', 'Estatistica'], ascending=False, na_position='last',
+                                     ignore_index=True)
@@ -0,0 +1,127 @@
+"""
+Esboço de quantis combinável (KLL) para estimar quantis de colunas numéricas sem guardar todos os valores.
+
+O esboço mantém uma pilha de níveis: cada valor do nível h representa 2**h valores originais. Quando um
+nível passa da sua capacidade, ele é ordenado e metade dos valores (os de posição par ou ímpar, por sorteio)
+sobe para o nível seguinte. Cada compactação erra o rank de qualquer valor em no máximo o peso do nível,
+para mais ou para menos com a mesma probabilidade, o que dá o limite de erro de `erro_rank`.
+
+Dois esboços são combinados nível a nível (`combinar`), de modo que chunks, partes ou processos podem ser
+resumidos separadamente, como os resumos de `analise_cielo.agregacao`.
+"""
+import math
+
+import numpy as np
+
+# Capacidade do nível mais alto; os níveis abaixo dele têm capacidade decrescente (fator 2/3 por nível)
+K_PADRAO = 200
+FATOR_CAPACIDADE = 2 / 3
+CAPACIDADE_MINIMA = 8
+
+
+class EsbocoQuantis:
+    """
+    Esboço KLL de uma coluna numérica. Use `atualizar` com arrays de valores e `quantis` para consultá-lo.
+
+    Args:
+        k (int): Capacidade do nível mais alto. Com k=200, o esboço guarda menos de 1.000 valores e o erro
+            de rank fica em torno de 1% a 2% (ver `erro_rank`).
+        semente (int, opcional): Semente dos sorteios das compactações.
+    """
+
+    def __init__(self, k=K_PADRAO, semente=None):
+        self.k = k
+        self.n = 0
+        self.minimo = np.inf
+        self.maximo = -np.inf
+        self.niveis = [np.empty(0)]
+        # Soma dos quadrados dos pesos das compactações feitas, usada no limite de erro
+        self.soma_pesos_quadrados = 0.0
+        self._rng = np.random.default_rng(semente)
+
+    def _capacidade(self, nivel):
+        altura = len(self.niveis) - 1 - nivel
+        return max(int(math.ceil(self.k * FATOR_CAPACIDADE ** altura)), CAPACIDADE_MINIMA)
+
+    def atualizar(self, valores):
+        """
+        Acrescenta ao esboço os valores não nulos de `valores` (array ou Series).
+        """
+        valores = np.asarray(valores, dtype=float)
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return self
+        self.n += len(valores)
+        self.minimo = min(self.minimo, valores.min())
+        self.maximo = max(self.maximo, valores.max())
+        self.niveis[0] = np.concatenate([self.niveis[0], valores])
+        self._compactar()
+        return self
+
+    def combinar(self, outro):
+        """
+        Incorpora `outro` a este esboço (como se os dois tivessem recebido os mesmos valores).
+        """
+        while len(self.niveis) < len(outro.niveis):
+            self.niveis.append(np.empty(0))
+        for nivel, itens in enumerate(outro.niveis):
+            self.niveis[nivel] = np.concatenate([self.niveis[nivel], itens])
+        self.n += outro.n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.soma_pesos_quadrados += outro.soma_pesos_quadrados
+        self._compactar()
+        return self
+
+    def _compactar(self):
+        nivel = 0
+        while nivel < len(self.niveis):
+            itens = self.niveis[nivel]
+            if len(itens) > self._capacidade(nivel):
+                if nivel + 1 == len(self.niveis):
+                    self.niveis.append(np.empty(0))
+                itens = np.sort(itens)
+                # Com número ímpar de itens, o menor fica no nível; dos demais, sobe um de cada par
+                impar = len(itens) % 2
+                promovidos = itens[impar + self._rng.integers(2)::2]
+                self.niveis[nivel] = itens[:impar]
+                self.niveis[nivel + 1] = np.concatenate([self.niveis[nivel + 1], promovidos])
+                self.soma_pesos_quadrados += 4.0 ** nivel
+            nivel += 1
+
+    def _itens_ponderados(self):
+        valores = np.concatenate(self.niveis)
+        pesos = np.concatenate([np.full(len(itens), 2.0 ** nivel) for nivel, itens in enumerate(self.niveis)])
+        ordem = np.argsort(valores, kind='stable')
+        return valores[ordem], np.cumsum(pesos[ordem])
+
+    def quantis(self, qs):
+        """
+        Quantis estimados para as frações `qs` (0 e 1 retornam o mínimo e o máximo exatos).
+
+        Returns:
+            np.ndarray: Um valor por fração; NaN se o esboço estiver vazio.
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        valores, acumulado = self._itens_ponderados()
+        posicoes = np.searchsorted(acumulado, qs * acumulado[-1], side='left')
+        resultado = valores[np.minimum(posicoes, len(valores) - 1)]
+        resultado[qs <= 0] = self.minimo
+        resultado[qs >= 1] = self.maximo
+        return resultado
+
+    def erro_rank(self, confianca=0.99):
+        """
+        Limite do erro de rank normalizado (fração de n) de qualquer quantil, com a confiança informada.
+
+        Cada compactação do nível h desloca o rank de um valor em 0 ou ±2**h, com sinal sorteado; pela
+        desigualdade de Hoeffding, |erro| <= sqrt(2 * Σ(2**h)² * ln(2 / (1 - confiança))).
+        """
+        if self.n == 0:
+            return 0.0
+        return math.sqrt(2 * self.soma_pesos_quadrados * math.log(2 / (1 - confianca))) / self.n
+
+    def __len__(self):
+        return sum(len(itens) for itens in self.niveis)
@@ -0,0 +1,262 @@
+"""
+Relatório em texto da análise exploratória, impresso a partir das métricas de `calcular_metricas`.
+"""
+import pandas as pd
+
+from .agregacao import descrever_resumo_colunas
+from .esquema import benchmarks_de
+from .instrumentacao import span
+
+# Linhas da tabela de ofensores impressas no relatório (as de maior evidência)
+LINHAS_OFENSORES_RELATORIO = 15
+
+
+def imprimir_visao_geral(df):
+    """
+    Imprime a visão geral de um dataset carregado em memória (amostra, tipos, estatísticas e nulos).
+    """
+    print(f"\n{'#' * 30}\n# Visão Geral do Dataset\n{'#' * 30}")
+    print(df.head())
+    print("\nInformações do DataFrame:")
+    df.info()
+    print("\nEstatísticas Descritivas:")
+    with span('describe', linhas=len(df)):
+        descricao = df.describe(include='all')
+    print(descricao)
+    print("\nValores Nulos por Coluna:")
+    print(df.isnull().sum())
+    _imprimir_benchmarks(df)
+
+
+def _imprimir_benchmarks(df):
+    """
+    Imprime os valores de benchmark, guardados nos metadados do dataset e não como colunas.
+    """
+    benchmarks = benchmarks_de(df)
+    if benchmarks:
+        print("\nValores de Benchmark (constantes do dataset):")
+        print(pd.Series(benchmarks))
+
+
+def imprimir_visao_geral_resumida(primeiras_linhas, resumo_colunas, total_linhas):
+    """
+    Imprime a visão geral a partir do resumo combinado das colunas (modos em chunks e incremental).
+    """
+    print(f"\n{'#' * 30}\n# Visão Geral do Dataset\n{'#' * 30}")
+    print(primeiras_linhas)
+    print("\nInformações do DataFrame:")
+    print(pd.DataFrame({
+        'Non-Null Count': {coluna: info['nao_nulos'] for coluna, info in resumo_colunas.items()},
+        'Dtype': {coluna: info['dtype'] for coluna, info in resumo_colunas.items()},
+    }))
+    print("\nEstatísticas Descritivas:")
+    print(descrever_resumo_colunas(resumo_colunas))
+    print("\nValores Nulos por Coluna:")
+    print(pd.Series({coluna: total_linhas - info['nao_nulos'] for coluna, info in resumo_colunas.items()}))
+    _imprimir_benchmarks(primeiras_linhas)
+
+
+def imprimir_relatorio(metricas, grafico=None):
+    """
+    Imprime as estatísticas da análise, seção por seção.
+
+    Args:
+        metricas (dict): Métricas de `calcular_metricas`.
+        grafico (callable, opcional): Chamado como `grafico(nome)` ao fim de cada seção que tem gráfico,
+            com o nome estável de `GRAFICOS` (por exemplo, para exibi-lo na tela logo após o texto).
+    """
+    if grafico is None:
+        def grafico(nome):
+            pass
+
+    # Análise da Distribuição por LOCAL
+    print(f"\n{'#' * 30}\n# Análise por LOCAL\n{'#' * 30}")
+    print("Contagem de chamados por LOCAL:")
+    print(metricas['contagem_local'])
+    grafico('chamados_por_local_de_atendimento')
+
+    # Análise da Distribuição por SERVICO
+    print(f"\n{'#' * 30}\n# Análise por SERVICO\n{'#' * 30}")
+    print("Contagem de chamados por SERVICO:")
+    print(metricas['contagem_servico'])
+    grafico('chamados_por_tipo_de_servico')
+
+    # Análise da Distribuição por STATUS
+    print(f"\n{'#' * 30}\n# Análise por STATUS\n{'#' * 30}")
+    print("Contagem de chamados por STATUS:")
+    print(metricas['contagem_status'])
+    grafico('distribuicao_de_status_por_chamados')
+
+    # Análise dos Motivos de Cancelamento
+    print(f"\n{'#' * 30}\n# Análise de Motivos de Cancelamento\n{'#' * 30}")
+    if metricas['motivos_cancelamento'] is not None:
+        print("Contagem de motivos de cancelamento:")
+        print(metricas['motivos_cancelamento'])
+        grafico('motivos_de_cancelamento_mais_comuns')
+    else:
+        print("Não há chamados com status 'Cancelado' para analisar motivos.")
+
+    # Cálculo e Análise do Tempo de Atendimento
+    print(f"\n{'#' * 30}\n# Análise do Tempo de Atendimento\n{'#' * 30}")
+    descricao_tempo = metricas['estatisticas_tempo_atendimento']
+    if descricao_tempo is not None:
+        print("Estatísticas do TEMPO_ATENDIMENTO_DIAS_FRACIONARIOS (horas exatas / 24, Chamados 'Atendido'):")
+        print(descricao_tempo)
+        print(f"Média do Tempo de Atendimento: {descricao_tempo['mean']:.2f} dias")
+        grafico('distribuicao_do_tempo_de_atendimento_para_chamados_atendidos')
+    else:
+        print("Não há chamados 'Atendido' ou o tempo de atendimento não pôde ser calculado.")
+
+    # Análise do Cumprimento do Prazo Máximo para Encerramento
+    print(f"\n{'#' * 30}\n# Análise do Cumprimento do Prazo Máximo para Encerramento\n{'#' * 30}")
+    cumprimento = metricas['cumprimento_prazo']
+    if cumprimento is not None:
+        print(
+            "Percentual de chamados 'Atendido' dentro do Prazo Máximo para Encerramento: "
+            f"{cumprimento['pct_no_prazo']:.2f}%")
+        if cumprimento['horas_atraso_medio'] is not None:
+            print(f"Atraso médio dos chamados fora do prazo: {cumprimento['horas_atraso_medio']:.2f} horas")
+        grafico('cumprimento_do_prazo_para_chamados_atendidos')
+
+        # Análise do tempo de atraso/adiantamento em relação ao Prazo Limite
+        descricao_dias = metricas['estatisticas_dias_em_relacao_prazo']
+        print("\nEstatísticas dos DIAS_EM_RELACAO_AO_PRAZO_LIMITE_FRACIONARIOS (horas exatas / 24; "
+              "positivo = atraso, negativo = adiantamento):")
+        print(descricao_dias)
+        print(f"Média de Dias em Relação ao Prazo Limite: {descricao_dias['mean']:.2f} dias")  # Mostra a média
+        grafico('distribuicao_de_dias_em_relacao_ao_prazo')
+
+    else:
+        print("Não há chamados 'Atendido' para analisar o Prazo Máximo para Encerramento.")
+
+    # Análise Temporal (Evolução dos Chamados por Mês)
+    print(f"\n{'#' * 30}\n# Análise Temporal\n{'#' * 30}")
+    if metricas['volume_mensal'] is not None:
+        print("Chamados por Mês de Abertura:")
+        print(metricas['volume_mensal'])
+        grafico('evolucao_mensal_do_volume_de_chamados')
+    else:
+        print("Coluna 'DATA_ABERTURA' não encontrada para análise temporal.")
+
+    # Análise Aprofundada: Desempenho por Local
+    print(f"\n{'#' * 30}\n# Análise Aprofundada: Desempenho por Local\n{'#' * 30}")
+
+    # Taxa de Cancelamento por Local
+    print(f"\n{'=' * 20} Taxa de Cancelamento por Local {'=' * 20}")
+    print("Taxa de Cancelamento (%) por Local:")
+    print(metricas['taxa_cancelamento_local'].rename_axis(columns='STATUS'))
+    grafico('taxa_de_cancelamento_por_local')
+
+    # Percentual de Prazo Máximo para Encerramento Cumprido por Local
+    print(f"\n{'=' * 20} Percentual de Prazo Máximo para Encerramento Cumprido por Local {'=' * 20}")
+    print("Percentual de Prazo Máximo para Encerramento Cumprido (%) por Local (Apenas Atendidos):")
+    print(metricas['pct_prazo_cumprido_local'])
+    grafico('percentual_de_prazo_cumprido_por_local')
+
+    # Tempo Médio de Atendimento por Local
+    print(f"\n{'=' * 20} Tempo Médio de Atendimento por Local {'=' * 20}")
+    print("Tempo Médio de Atendimento (Dias) por Local (Apenas Atendidos):")
+    print(metricas['tempo_medio_atendimento_local'])
+    grafico('tempo_medio_de_atendimento_por_local')
+
+    # Análise Aprofundada: Desempenho por Serviço
+    print(f"\n{'#' * 30}\n# Análise Aprofundada: Desempenho por Serviço\n{'#' * 30}\n")
+
+    # Taxa de Cancelamento por Serviço
+    print(f"\n{'=' * 20} Taxa de Cancelamento por Serviço {'=' * 20}")
+    print("Taxa de Cancelamento (%) por Serviço:")
+    print(metricas['taxa_cancelamento_servico'].rename_axis(columns='STATUS'))
+    grafico('taxa_de_cancelamento_por_tipo_de_servico')
+
+    # Percentual de Prazo Máximo para Encerramento Cumprido por Serviço
+    print(f"\n{'=' * 20} Percentual de Prazo Máximo para Encerramento Cumprido por Serviço {'=' * 20}")
+    print("Percentual de Prazo Máximo para Encerramento Cumprido (%) por Serviço (Apenas Atendidos):")
+    print(metricas['pct_prazo_cumprido_servico'])
+    grafico('perc_de_prazo_cumprido_por_tipo_de_servico')
+
+    # Tempo Médio de Atendimento por Serviço
+    print(f"\n{'=' * 20} Tempo Médio de Atendimento por Serviço {'=' * 20}")
+    print("Tempo Médio de Atendimento (Dias) por Serviço (Apenas Atendidos):")
+    print(metricas['tempo_medio_atendimento_servico'])
+    grafico('tempo_medio_de_atendimento_por_tipo_de_servico')
+
+    # Distribuição de Motivos de Cancelamento por Serviço
+    print(f"\n{'=' * 20} Distribuição de Motivos de Cancelamento por Serviço {'=' * 20}")
+    if metricas['motivos_por_servico'] is not None:
+        grafico('motivo_de_cancelamento_por_tipo_de_servico')
+    else:
+        print("Não há chamados cancelados para analisar motivos por serviço.")
+
+    # Análise Comparativa de Prazos (Concorrência e Expectativa do Cliente)
+    print(f"\n{'#' * 30}\n# Análise Comparativa de Prazos\n{'#' * 30}")
+    prazos_comp = metricas['comparativo_prazos']
+    if prazos_comp is not None:
+        media_tempo_atendimento, prazo_concorrencia, expectativa_cliente = prazos_comp['Dias']
+        print(f"\nTempo Médio de Atendimento da Cielo (Chamados Atendidos): {media_tempo_atendimento:.2f} dias")
+        print(f"Prazo Máximo da Concorrência (Outras Adquirentes): {prazo_concorrencia:.2f} dias")
+        print(f"Expectativa do Cliente (Setor Logístico Geral): {expectativa_cliente:.2f} dias")
+        grafico('comparativo_nosso_prazo_concorrencia_expectativa')
+    else:
+        print("Colunas de comparação de prazos não encontradas.")
+
+    # Detecção de Ofensores (cada segmento contra o restante dos chamados)
+    print(f"\n{'#' * 30}\n# Detecção de Ofensores\n{'#' * 30}")
+    ofensores = metricas['ofensores']
+    if len(ofensores):
+        print("Segmentos significativamente piores que o restante dos chamados "
+              "(z/t positivo = pior; p-valor ajustado por Holm):")
+        print(ofensores[['Dimensao', 'Segmento', 'Metrica', 'Valor_Segmento', 'Valor_Restante', 'Estatistica',
+                         'P_Ajustado']].head(LINHAS_OFENSORES_RELATORIO).round(4).to_string(index=False))
+        if len(ofensores) > LINHAS_OFENSORES_RELATORIO:
+            print(f"... e mais {len(ofensores) - LINHAS_OFENSORES_RELATORIO} (ver metricas['ofensores']).")
+    else:
+        print("Nenhum LOCAL, SERVICO ou LOCAL × SERVICO significativamente pior que o restante dos chamados.")
+
+
+def _imprimir_estimativas(titulo, estimativas, unidade, nivel):
+    """
+    Imprime uma tabela de estimativas com o intervalo de confiança (ver `estimar_metricas`).
+    """
+    print(f"{titulo} ({unidade}, IC de {nivel}):")
+    print(estimativas[['Estimativa', 'IC_Inferior', 'IC_Superior']].round(2))
+
+
+def imprimir_relatorio_aproximado(estimativas):
+    """
+    Imprime as estimativas do modo aproximado, com os intervalos de confiança e o erro dos quantis.
+
+    Args:
+        estimativas (dict): Estimativas de `analise_cielo.amostragem.estimar_metricas`.
+    """
+    nivel = f"{estimativas['nivel_confianca']:.0%}"
+    print(f"\n{'#' * 30}\n# Análise Aproximada (Amostra Estratificada)\n{'#' * 30}")
+    print(f"Amostra de {estimativas['tamanho_amostra']} de {estimativas['linhas']} chamados, "
+          f"até {estimativas['tamanho_estrato']} por LOCAL × SERVICO.")
+    print(f"Estimativas com intervalo de confiança de {nivel}; as contagens por LOCAL e SERVICO são exatas.")
+
+    print(f"\n{'=' * 20} Visão Geral {'=' * 20}")
+    for titulo, nome, unidade in (('Taxa de Cancelamento', 'taxa_cancelamento_geral', '%'),
+                                  ('Percentual de Prazo Máximo para Encerramento Cumprido',
+                                   'pct_prazo_cumprido_geral', '%'),
+                                  ('Tempo Médio de Atendimento', 'tempo_medio_atendimento_geral', ' dias')):
+        geral = estimativas[nome].iloc[0]
+        print(f"{titulo}: {geral['Estimativa']:.2f}{unidade} "
+              f"(IC de {nivel}: {geral['IC_Inferior']:.2f}{unidade} a {geral['IC_Superior']:.2f}{unidade})")
+
+    for chave, sufixo in (('LOCAL', 'local'), ('SERVICO', 'servico')):
+        print(f"\n{'#' * 30}\n# Desempenho por {chave} (Aproximado)\n{'#' * 30}")
+        print(f"Contagem de chamados por {chave} (exata):")
+        print(estimativas[f'contagem_{sufixo}'])
+        print()
+        _imprimir_estimativas('Taxa de Cancelamento', estimativas[f'taxa_cancelamento_{sufixo}'], '%', nivel)
+        print()
+        _imprimir_estimativas('Percentual de Prazo Máximo para Encerramento Cumprido (Apenas Atendidos)',
+                              estimativas[f'pct_prazo_cumprido_{sufixo}'], '%', nivel)
+        print()
+        _imprimir_estimativas('Tempo Médio de Atendimento (Apenas Atendidos)',
+                              estimativas[f'tempo_medio_atendimento_{sufixo}'], 'dias', nivel)
+
+    print(f"\n{'#' * 30}\n# Quantis (Chamados 'Atendido')\n{'#' * 30}")
+    print(estimativas['quantis'])
+    print(f"Erro máximo de rank dos quantis: {estimativas['erro_rank_quantis']:.2%} dos chamados "
+          f"(99% de confiança).")
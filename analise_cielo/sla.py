@@ -0,0 +1,260 @@
+"""
+Cálculo vetorizado do SLA: tempo decorrido e tempo em relação ao prazo, em horas e em dias, corridos ou úteis.
+
+Sem calendário, o tempo é o corrido. Com um `CalendarioSLA`, só contam os dias úteis: cada dia útil vale
+24 horas, e sábados, domingos e feriados são pulados por inteiro. O tempo útil entre dois instantes é a parte
+útil do primeiro e do último dia mais 24 horas por dia útil entre eles, e somar horas úteis a um instante
+avança dias úteis. Os dias úteis do período dos dados são calculados uma vez (`np.is_busday`) em uma tabela
+acumulada, e cada chamado só lê posições dela, em arrays de nanossegundos e sem laço por chamado: o modo de
+dias úteis custa praticamente o mesmo que o de dias corridos.
+
+Os dias vêm das horas exatas, sem o truncamento de `.dt.days` (que conta 2 horas de atraso como 0 dias e
+2 horas de adiantamento como -1 dia):
+    - TEMPO_ATENDIMENTO_DIAS: dias completos decorridos;
+    - DIAS_EM_RELACAO_AO_PRAZO_LIMITE: dias iniciados em relação ao limite (2 horas de atraso = 1 dia;
+      2 horas de adiantamento = 0; 26 horas de adiantamento = -1), positivo se e somente se houve atraso.
+
+Exemplo:
+    >>> calcular_sla(df, CalendarioSLA())      # dias úteis, com os feriados nacionais
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+NS_POR_HORA = 3_600_000_000_000
+NS_POR_DIA = 24 * NS_POR_HORA
+# Máscara de dias úteis de segunda a domingo, no formato do `weekmask` do NumPy
+DIAS_SEMANA_UTEIS = '1111100'
+# Anos cobertos pelos feriados do calendário padrão
+ANOS_FERIADOS = range(2000, 2101)
+# Feriados nacionais de data fixa (mês, dia) e o ano a partir do qual valem
+FERIADOS_FIXOS = [
+    ((1, 1), None), ((4, 21), None), ((5, 1), None), ((9, 7), None), ((10, 12), None), ((11, 2), None),
+    ((11, 15), None), ((11, 20), 2024), ((12, 25), None),
+]
+CALENDARIOS_SLA = ('corridos', 'uteis')
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _pascoa(anos):
+    """
+    Domingo de Páscoa de cada ano (algoritmo de Meeus/Jones/Butcher, calendário gregoriano).
+    """
+    anos = np.asarray(anos, dtype=np.int64)
+    a, b, c = anos % 19, anos // 100, anos % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return ((anos - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (mes - 1).astype('timedelta64[M]')
+            ).astype('datetime64[D]') + (dia - 1).astype('timedelta64[D]')
+
+
+def feriados_nacionais(anos=ANOS_FERIADOS):
+    """
+    Feriados nacionais do Brasil nos `anos`: os de data fixa (`FERIADOS_FIXOS`) e a Sexta-feira Santa.
+
+    Carnaval e Corpus Christi são pontos facultativos e ficam de fora; feriados estaduais e municipais também.
+    Para incluí-los, passe-os em `feriados` de `CalendarioSLA` junto com estes.
+
+    Returns:
+        np.ndarray: Datas (datetime64[D]) ordenadas.
+    """
+    anos = np.asarray(list(anos), dtype=np.int64)
+    datas = [_pascoa(anos) - np.timedelta64(2, 'D')]
+    for (mes, dia), desde in FERIADOS_FIXOS:
+        validos = anos if desde is None else anos[anos >= desde]
+        datas.append(np.array([f'{ano:04d}-{mes:02d}-{dia:02d}' for ano in validos], dtype='datetime64[D]'))
+    return np.sort(np.concatenate(datas))
+
+
+class CalendarioSLA:
+    """
+    Calendário de dias úteis do SLA: dias da semana úteis e feriados.
+
+    Guarda só a máscara e as datas (o `np.busdaycalendar` não pode ser serializado), de modo que pode ir para
+    os processos da análise paralela e identificar o cálculo no cache e no estado incremental.
+
+    Args:
+        feriados (array-like, opcional): Datas sem expediente; por padrão, `feriados_nacionais()`.
+        dias_semana (str): Dias úteis de segunda a domingo, como '1111100' (o `weekmask` do NumPy).
+    """
+
+    def __init__(self, feriados=None, dias_semana=DIAS_SEMANA_UTEIS):
+        self.feriados = np.unique(np.asarray(feriados_nacionais() if feriados is None else feriados,
+                                             dtype='datetime64[D]'))
+        self.dias_semana = dias_semana
+
+    def tabela(self, primeiro_dia, ultimo_dia):
+        """
+        Tabela dos dias úteis de `primeiro_dia` a `ultimo_dia` (dias desde 1970-01-01), inclusive.
+        """
+        return _TabelaDiasUteis(self, primeiro_dia, ultimo_dia)
+
+    def assinatura(self):
+        """
+        Identificação estável do calendário, para chaves de cache e para o estado incremental.
+        """
+        sha = hashlib.sha256(self.dias_semana.encode('ascii'))
+        sha.update(self.feriados.astype(np.int64).tobytes())
+        return sha.hexdigest()
+
+
+class _TabelaDiasUteis:
+    """
+    Dias úteis de um intervalo de dias, para converter instantes em tempo útil por indexação.
+
+    `np.is_busday` e `np.busday_count` procuram os feriados a cada elemento; aqui eles são consultados uma única
+    vez por dia do intervalo (poucos milhares). O tempo útil decorrido desde a 0h do primeiro dia até o instante
+    t, do dia d, é base[d] + útil[d] × t: os dias úteis anteriores inteiros, mais a parte já passada de d se ele
+    for útil. Assim, o tempo útil entre dois instantes é a diferença de duas leituras da tabela.
+    """
+
+    def __init__(self, calendario, primeiro_dia, ultimo_dia):
+        self.origem = int(primeiro_dia)
+        dias = np.arange(self.origem, int(ultimo_dia) + 1)
+        util = np.is_busday(dias.astype('datetime64[D]'), weekmask=calendario.dias_semana,
+                            holidays=calendario.feriados)
+        anteriores = np.cumsum(util, dtype=np.int64) - util
+        self.util = util.astype(np.int64)
+        self.base = (anteriores - self.util * dias) * NS_POR_DIA
+        self.dias_uteis = dias[util]
+
+    def tempo_util(self, instantes):
+        """
+        Nanossegundos úteis desde a 0h do primeiro dia da tabela até cada instante (ns, int64).
+        """
+        dias = instantes // NS_POR_DIA - self.origem
+        return self.base[dias] + self.util[dias] * instantes
+
+    def instante(self, tempos_uteis):
+        """
+        Instante em que o tempo útil desde a 0h do primeiro dia da tabela chega a cada valor (inverso de
+        `tempo_util`; um tempo que completa o dia útil cai na 0h do dia útil seguinte).
+        """
+        return self.dias_uteis[tempos_uteis // NS_POR_DIA] * NS_POR_DIA + tempos_uteis % NS_POR_DIA
+
+
+def resolver_calendario(calendario):
+    """
+    Calendário a partir da configuração dos scripts: None ou 'corridos' (dias corridos), 'uteis' (dias úteis
+    com os feriados nacionais) ou um `CalendarioSLA`.
+
+    Returns:
+        CalendarioSLA ou None: None para dias corridos.
+    """
+    if calendario is None or isinstance(calendario, CalendarioSLA):
+        return calendario
+    if calendario not in CALENDARIOS_SLA:
+        raise ValueError(f"Calendário do SLA inválido: '{calendario}'. Use um de {CALENDARIOS_SLA} "
+                         "ou um CalendarioSLA.")
+    return CalendarioSLA() if calendario == 'uteis' else None
+
+
+def assinatura_calendario(calendario):
+    """
+    Assinatura do calendário (None para dias corridos); ver `CalendarioSLA.assinatura`.
+    """
+    calendario = resolver_calendario(calendario)
+    return None if calendario is None else calendario.assinatura()
+
+
+def _instantes_ns(valores):
+    """
+    Instantes como int64 em nanossegundos (NaT = mínimo do int64), de arrays, Series ou listas de datas.
+    """
+    return np.asarray(valores, dtype='datetime64[ns]').view(np.int64)
+
+
+def _ns_uteis(inicio, fim, calendario):
+    """
+    Nanossegundos úteis de `inicio` a `fim` (negativos quando fim < inicio).
+    """
+    if not len(inicio):
+        return fim - inicio
+    tabela = calendario.tabela(min(inicio.min(), fim.min()) // NS_POR_DIA, max(inicio.max(), fim.max()) // NS_POR_DIA)
+    return tabela.tempo_util(fim) - tabela.tempo_util(inicio)
+
+
+def _ns_decorridos(inicio, fim, calendario=None):
+    """
+    Nanossegundos de `inicio` a `fim` (int64) e a máscara dos pares com algum NaT (com 0 nesses pares).
+    """
+    inicio, fim = _instantes_ns(inicio), _instantes_ns(fim)
+    nulos = (inicio == _NAT) | (fim == _NAT)
+    if nulos.any():
+        inicio, fim = np.where(nulos, 0, inicio), np.where(nulos, 0, fim)
+    calendario = resolver_calendario(calendario)
+    ns = fim - inicio if calendario is None else _ns_uteis(inicio, fim, calendario)
+    return ns, nulos
+
+
+def _com_nulos(valores, nulos):
+    """
+    `valores` com NaN nas posições de `nulos` (inalterados, e com o tipo original, se não houver nenhuma).
+    """
+    return np.where(nulos, np.nan, valores) if nulos.any() else valores
+
+
+def horas_decorridas(inicio, fim, calendario=None):
+    """
+    Horas de `inicio` a `fim`, negativas quando `fim` vem antes; só as de dias úteis com `calendario`.
+
+    Returns:
+        np.ndarray: float64, NaN onde algum dos instantes é nulo.
+    """
+    ns, nulos = _ns_decorridos(inicio, fim, calendario)
+    return _com_nulos(ns / NS_POR_HORA, nulos)
+
+
+def somar_horas(inicio, horas, calendario=None):
+    """
+    Instante a `horas` (>= 0) de `inicio`; com `calendario`, contando só as horas de dias úteis (um início em
+    dia não útil conta a partir da 0h do dia útil seguinte).
+
+    Returns:
+        np.ndarray: datetime64[ns].
+    """
+    inicio = _instantes_ns(inicio)
+    deslocamento = np.rint(np.asarray(horas, dtype=float) * NS_POR_HORA).astype(np.int64)
+    calendario = resolver_calendario(calendario)
+    if calendario is None:
+        return (inicio + deslocamento).view('datetime64[ns]')
+    if not len(inicio):
+        return inicio.view('datetime64[ns]')
+    # Inícios nulos são calculados a partir de 1970-01-01 (para não estender a tabela) e voltam nulos
+    nulos = inicio == _NAT
+    inicio = np.where(nulos, 0, inicio)
+    # A tabela vai até o dia útil de destino mais distante
+    primeiro_dia, ultimo_dia = inicio.min() // NS_POR_DIA, inicio.max() // NS_POR_DIA
+    ultimo_dia = np.busday_offset(np.datetime64(int(ultimo_dia), 'D'), int(deslocamento.max() // NS_POR_DIA) + 2,
+                                  roll='forward', weekmask=calendario.dias_semana, holidays=calendario.feriados)
+    tabela = calendario.tabela(primeiro_dia, ultimo_dia.astype(np.int64))
+    destino = tabela.instante(tabela.tempo_util(inicio) + deslocamento)
+    return np.where(nulos, _NAT, destino).view('datetime64[ns]')
+
+
+def calcular_sla(df, calendario=None):
+    """
+    Tempo de atendimento e tempo em relação ao prazo de cada chamado, em horas e em dias (úteis com `calendario`).
+
+    Returns:
+        pd.DataFrame: Com o índice de `df`: TEMPO_ATENDIMENTO_HORAS, TEMPO_ATENDIMENTO_DIAS (dias completos),
+            HORAS_EM_RELACAO_AO_PRAZO_LIMITE e DIAS_EM_RELACAO_AO_PRAZO_LIMITE (dias iniciados; positivos =
+            atraso), para todos os chamados; nulos onde falta alguma das datas.
+    """
+    ns, nulos = _ns_decorridos(df['DATA_ABERTURA'], df['DATA_ENCERRAMENTO'], calendario)
+    ns_prazo, nulos_prazo = _ns_decorridos(df['DATA_LIMITE_ATENDIMENTO'], df['DATA_ENCERRAMENTO'], calendario)
+    return pd.DataFrame({
+        'TEMPO_ATENDIMENTO_HORAS': _com_nulos(ns / NS_POR_HORA, nulos),
+        'TEMPO_ATENDIMENTO_DIAS': _com_nulos(ns // NS_POR_DIA, nulos),
+        'HORAS_EM_RELACAO_AO_PRAZO_LIMITE': _com_nulos(ns_prazo / NS_POR_HORA, nulos_prazo),
+        # Dias iniciados: a divisão arredondada para cima
+        'DIAS_EM_RELACAO_AO_PRAZO_LIMITE': _com_nulos(-(-ns_prazo // NS_POR_DIA), nulos_prazo),
+    }, index=df.index)
@@ -0,0 +1,428 @@
+"""
+Chamados em tempo real: simulador assíncrono de eventos e métricas online em janela deslizante.
+
+O simulador (`transmitir_eventos`) reproduz um dataset como eventos de abertura e de encerramento, na ordem de
+DATA_ABERTURA e DATA_ENCERRAMENTO, em JSON lines, para um arquivo, um pipe (stdout) ou um socket TCP, com a
+velocidade de reprodução escolhida.
+
+O consumidor (`MetricasJanela`, alimentado por `consumir_eventos`) mantém, por LOCAL e por SERVICO, a taxa de
+cancelamento, o percentual no prazo e os quantis do tempo de atendimento dos chamados encerrados na janela.
+A janela é dividida em faixas de tempo (um anel de contadores e de histogramas de tempo com resolução de uma
+hora): cada evento incrementa alguns contadores da sua faixa, em O(1), e uma faixa é zerada quando sai da janela.
+As somas da janela e os quantis são calculados só na consulta (`resumo`).
+
+Exemplo (o consumidor escuta, o simulador conecta):
+    >>> metricas = MetricasJanela(janela='24h')
+    >>> await consumir_eventos('tcp://127.0.0.1:8765', metricas)         # em um processo ou tarefa
+    >>> await transmitir_eventos(df, 'tcp://127.0.0.1:8765', velocidade=3600)   # em outro
+    >>> metricas.resumo()
+"""
+import sys
+import json
+import time
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .instrumentacao import span
+
+EVENTO_ABERTURA = 'abertura'
+EVENTO_ENCERRAMENTO = 'encerramento'
+PREFIXO_TCP = 'tcp://'
+# Destino/origem que representa o stdout/stdin do processo (pipe)
+DESTINO_PIPE = '-'
+# Máximo de eventos escritos de uma vez (e entre duas esperas pela vazão do destino)
+TAMANHO_LOTE_EVENTOS = 10_000
+BYTES_LEITURA_EVENTOS = 1 << 20
+# Janela e número de faixas padrão do consumidor: 24 faixas de uma hora
+JANELA_PADRAO = '24h'
+FAIXAS_PADRAO = 24
+# Tempos de atendimento acima desse limite (em horas) ficam na última classe do histograma
+LIMITE_HORAS_HISTOGRAMA = 30 * 24
+QUANTIS_TEMPO = (0.5, 0.9, 0.99)
+INTERVALO_ATUALIZACAO_SEGUNDOS = 1.0
+
+# Posição de cada contador no bloco de uma chave (dentro da faixa)
+_ENCERRADOS, _CANCELADOS, _ATENDIDOS, _NO_PRAZO = range(4)
+_CONTADORES = 4
+_SEGUNDOS_POR_HORA = 3600
+# Referência dos instantes dos eventos (sem fuso, como as datas do dataset)
+_EPOCA = datetime(1970, 1, 1)
+
+
+def _texto_instantes(serie):
+    """
+    Instantes de uma coluna de datas como texto ISO (microssegundos), que também ordena cronologicamente.
+    """
+    valores = pd.to_datetime(serie).to_numpy('datetime64[us]')
+    return np.datetime_as_string(valores, unit='us')
+
+
+def _rotulos_json(serie):
+    """
+    Códigos e rótulos já serializados em JSON de uma coluna categórica (null para os valores nulos).
+    """
+    categorias = pd.Categorical(serie)
+    rotulos = np.array([json.dumps(str(c), ensure_ascii=False) for c in categorias.categories] + ['null'],
+                       dtype=object)
+    return rotulos[np.where(categorias.codes < 0, len(rotulos) - 1, categorias.codes)]
+
+
+def ordenar_eventos(df):
+    """
+    Ordem cronológica dos eventos de abertura e de encerramento dos chamados.
+
+    Os eventos de índice i < len(df) são as aberturas e os de índice len(df) + i, os encerramentos do chamado i.
+    No mesmo instante, a abertura vem antes do encerramento.
+
+    Returns:
+        tuple: (instantes dos eventos em ordem, como int64 em ns; índices dos eventos nessa ordem).
+    """
+    instantes = np.concatenate([pd.to_datetime(df['DATA_ABERTURA']).to_numpy('datetime64[ns]').view('int64'),
+                                pd.to_datetime(df['DATA_ENCERRAMENTO']).to_numpy('datetime64[ns]').view('int64')])
+    ordem = np.argsort(instantes, kind='stable')
+    return instantes[ordem], ordem
+
+
+class _SerializadorEventos:
+    """
+    Monta as linhas JSON dos eventos sob demanda, a partir de colunas já convertidas para texto.
+    """
+
+    def __init__(self, df):
+        self.n = len(df)
+        self.abertura = _texto_instantes(df['DATA_ABERTURA']).tolist()
+        self.encerramento = _texto_instantes(df['DATA_ENCERRAMENTO']).tolist()
+        self.limite = _texto_instantes(df['DATA_LIMITE_ATENDIMENTO']).tolist()
+        self.local = _rotulos_json(df['LOCAL']).tolist()
+        self.servico = _rotulos_json(df['SERVICO']).tolist()
+        self.status = _rotulos_json(df['STATUS']).tolist()
+        self.motivo = _rotulos_json(df['MOTIVO_CANCELAMENTO']).tolist()
+
+    def linhas(self, eventos):
+        """
+        Linhas JSON (bytes, terminadas em '\\n') dos eventos de índices `eventos`.
+        """
+        n, linhas = self.n, []
+        for evento in eventos.tolist():
+            if evento < n:
+                linhas.append(
+                    f'{{"tipo": "{EVENTO_ABERTURA}", "id": {evento}, '
+                    f'"instante": "{self.abertura[evento]}", "LOCAL": {self.local[evento]}, '
+                    f'"SERVICO": {self.servico[evento]}, "DATA_LIMITE_ATENDIMENTO": "{self.limite[evento]}"}}\n')
+            else:
+                i = evento - n
+                linhas.append(
+                    f'{{"tipo": "{EVENTO_ENCERRAMENTO}", "id": {i}, '
+                    f'"instante": "{self.encerramento[i]}", "LOCAL": {self.local[i]}, '
+                    f'"SERVICO": {self.servico[i]}, "STATUS": {self.status[i]}, '
+                    f'"MOTIVO_CANCELAMENTO": {self.motivo[i]}, "DATA_ABERTURA": "{self.abertura[i]}", '
+                    f'"DATA_LIMITE_ATENDIMENTO": "{self.limite[i]}"}}\n')
+        return ''.join(linhas).encode('utf-8')
+
+
+class _SaidaArquivo:
+    """
+    Arquivo ou stdout com a mesma interface de escrita de um `asyncio.StreamWriter`.
+    """
+
+    def __init__(self, arquivo, fechar):
+        self.arquivo = arquivo
+        self.fechar = fechar
+
+    def write(self, dados):
+        self.arquivo.write(dados)
+
+    async def drain(self):
+        self.arquivo.flush()
+
+    def close(self):
+        if self.fechar:
+            self.arquivo.close()
+
+    async def wait_closed(self):
+        pass
+
+
+def _endereco_tcp(endereco):
+    """
+    Host e porta de um endereço 'tcp://host:porta'.
+    """
+    host, _, porta = endereco[len(PREFIXO_TCP):].rpartition(':')
+    return host or '127.0.0.1', int(porta)
+
+
+async def _abrir_destino(destino):
+    """
+    Escritor do destino dos eventos: 'tcp://host:porta' (conecta ao consumidor), '-' (stdout) ou um arquivo.
+    """
+    if destino.startswith(PREFIXO_TCP):
+        _, escritor = await asyncio.open_connection(*_endereco_tcp(destino))
+        return escritor
+    if destino == DESTINO_PIPE:
+        return _SaidaArquivo(sys.stdout.buffer, fechar=False)
+    return _SaidaArquivo(open(destino, 'wb'), fechar=True)
+
+
+async def transmitir_eventos(df, destino, velocidade=None, tamanho_lote=TAMANHO_LOTE_EVENTOS):
+    """
+    Emite os eventos de abertura e de encerramento dos chamados de `df`, em ordem cronológica, como JSON lines.
+
+    Cada linha é um objeto com 'tipo' ('abertura' ou 'encerramento'), 'id' (posição do chamado em `df`),
+    'instante', 'LOCAL' e 'SERVICO'; a abertura traz também DATA_LIMITE_ATENDIMENTO e o encerramento, STATUS,
+    MOTIVO_CANCELAMENTO, DATA_ABERTURA e DATA_LIMITE_ATENDIMENTO, o que basta para o consumidor calcular as
+    métricas sem guardar estado por chamado.
+
+    Args:
+        df (pd.DataFrame): Chamados com as colunas do gerador.
+        destino (str): 'tcp://host:porta' (conecta a um consumidor que escuta nesse endereço), '-' (stdout,
+            para um pipe) ou o caminho de um arquivo .jsonl.
+        velocidade (float, opcional): Segundos simulados por segundo real (3600 = uma hora por segundo).
+            None emite os eventos o mais rápido possível.
+        tamanho_lote (int): Máximo de eventos escritos de uma vez.
+
+    Returns:
+        int: Número de eventos emitidos.
+    """
+    with span('transmitir_eventos') as s:
+        instantes, ordem = ordenar_eventos(df)
+        serializador = _SerializadorEventos(df)
+        escritor = await _abrir_destino(destino)
+        loop = asyncio.get_running_loop()
+        total, inicio = len(ordem), 0
+        origem_real = loop.time()
+        origem_simulada = instantes[0] if total else 0
+        try:
+            while inicio < total:
+                fim = min(inicio + tamanho_lote, total)
+                if velocidade:
+                    # Só os eventos cujo instante simulado já chegou; sem nenhum, espera pelo próximo
+                    agora_simulado = origem_simulada + (loop.time() - origem_real) * velocidade * 1e9
+                    fim = min(fim, int(np.searchsorted(instantes, agora_simulado, side='right')))
+                    if fim <= inicio:
+                        espera = (instantes[inicio] - origem_simulada) / 1e9 / velocidade
+                        await asyncio.sleep(origem_real + espera - loop.time())
+                        continue
+                escritor.write(serializador.linhas(ordem[inicio:fim]))
+                await escritor.drain()
+                inicio = fim
+        finally:
+            escritor.close()
+            await escritor.wait_closed()
+        s.linhas = total
+        return total
+
+
+class MetricasJanela:
+    """
+    Métricas online dos chamados encerrados na janela deslizante, por LOCAL, por SERVICO e no total.
+
+    A janela é formada pelas últimas `num_faixas` faixas de tempo (a faixa do instante mais recente incluída),
+    cada uma com um bloco de contadores por chave (encerrados, cancelados, atendidos, no prazo) e um histograma
+    do tempo de atendimento em horas. O tempo da janela é o dos eventos, não o relógio: eventos atrasados
+    entram na sua faixa enquanto ela estiver na janela e são ignorados depois.
+
+    Args:
+        janela (str ou pd.Timedelta): Duração da janela.
+        num_faixas (int): Número de faixas em que a janela é dividida (a granularidade com que ela desliza).
+        limite_horas (int): Tempo de atendimento (em horas) a partir do qual os chamados vão para a última
+            classe do histograma.
+    """
+
+    def __init__(self, janela=JANELA_PADRAO, num_faixas=FAIXAS_PADRAO, limite_horas=LIMITE_HORAS_HISTOGRAMA):
+        self.janela = pd.Timedelta(janela)
+        self.num_faixas = num_faixas
+        self.largura_faixa = self.janela.total_seconds() / num_faixas
+        self.classes = limite_horas + 1
+        self.eventos = 0
+        # Chave (dimensão, valor) -> posição; a posição 0 é o total
+        self.chaves = {('Total', 'Total'): 0}
+        self.abertos = [0]
+        self.contagens = [[0] * _CONTADORES for _ in range(num_faixas)]
+        self.histogramas = [[0] * self.classes for _ in range(num_faixas)]
+        # Número absoluto (instante // largura_faixa) da faixa mais recente; None antes do primeiro evento
+        self.faixa_atual = None
+
+    def _posicao(self, dimensao, valor):
+        """
+        Posição da chave (dimensão, valor), criando seus contadores na primeira vez que ela aparece.
+        """
+        posicao = self.chaves.get((dimensao, valor))
+        if posicao is None:
+            posicao = self.chaves[(dimensao, valor)] = len(self.chaves)
+            self.abertos.append(0)
+            for contagem, histograma in zip(self.contagens, self.histogramas):
+                contagem.extend([0] * _CONTADORES)
+                histograma.extend([0] * self.classes)
+        return posicao
+
+    def _faixa(self, segundos):
+        """
+        Slot no anel da faixa do instante `segundos` (desde a época), avançando a janela se preciso;
+        None quando a faixa já saiu da janela.
+        """
+        faixa = int(segundos // self.largura_faixa)
+        atual = self.faixa_atual
+        if atual is None or faixa > atual:
+            inicio = faixa - self.num_faixas + 1 if atual is None else max(atual + 1, faixa - self.num_faixas + 1)
+            for numero in range(inicio, faixa + 1):
+                slot = numero % self.num_faixas
+                self.contagens[slot] = [0] * len(self.contagens[slot])
+                self.histogramas[slot] = [0] * len(self.histogramas[slot])
+            self.faixa_atual = faixa
+        elif faixa <= atual - self.num_faixas:
+            return None
+        return faixa % self.num_faixas
+
+    def registrar(self, evento):
+        """
+        Atualiza as métricas com um evento já decodificado (dict de uma linha de `transmitir_eventos`).
+        """
+        self.eventos += 1
+        chaves = (0, self._posicao('LOCAL', evento['LOCAL']), self._posicao('SERVICO', evento['SERVICO']))
+        if evento['tipo'] == EVENTO_ABERTURA:
+            for posicao in chaves:
+                self.abertos[posicao] += 1
+            return
+        for posicao in chaves:
+            self.abertos[posicao] -= 1
+        instante = evento['instante']
+        encerramento = datetime.fromisoformat(instante)
+        slot = self._faixa((encerramento - _EPOCA).total_seconds())
+        if slot is None:
+            return
+        contagem = self.contagens[slot]
+        if evento['STATUS'] == 'Cancelado':
+            for posicao in chaves:
+                base = posicao * _CONTADORES
+                contagem[base + _ENCERRADOS] += 1
+                contagem[base + _CANCELADOS] += 1
+            return
+        # O texto ISO de largura fixa compara na mesma ordem que os instantes
+        no_prazo = instante <= evento['DATA_LIMITE_ATENDIMENTO']
+        horas = int((encerramento - datetime.fromisoformat(evento['DATA_ABERTURA'])).total_seconds()
+                    // _SEGUNDOS_POR_HORA)
+        classe = min(max(horas, 0), self.classes - 1)
+        histograma = self.histogramas[slot]
+        for posicao in chaves:
+            base = posicao * _CONTADORES
+            contagem[base + _ENCERRADOS] += 1
+            contagem[base + _ATENDIDOS] += 1
+            contagem[base + _NO_PRAZO] += no_prazo
+            histograma[posicao * self.classes + classe] += 1
+
+    def registrar_linhas(self, linhas):
+        """
+        Atualiza as métricas com linhas JSON (bytes) de eventos; linhas vazias são ignoradas.
+        """
+        # Decodificar o bloco como um único array JSON custa cerca de metade de decodificar linha a linha
+        linhas = [linha for linha in linhas if linha.strip()]
+        if linhas:
+            registrar = self.registrar
+            for evento in json.loads(b'[' + b','.join(linhas) + b']'):
+                registrar(evento)
+
+    def resumo(self, quantis=QUANTIS_TEMPO):
+        """
+        Métricas da janela atual por chave.
+
+        Returns:
+            pd.DataFrame: Indexado por ('Dimensao', 'Valor'), com 'Encerrados', 'Cancelados', 'Atendidos',
+                'Taxa_Cancelamento' (%), 'Pct_Prazo_Cumprido' (%), um 'Tempo_Atendimento_P<q>_Dias' por quantil
+                (resolução de uma hora; a última classe vale o limite do histograma) e 'Abertos' (chamados
+                abertos e ainda não encerrados, desde o início do fluxo).
+        """
+        num_chaves = len(self.chaves)
+        contagens = np.array(self.contagens, dtype=np.int64).sum(axis=0).reshape(num_chaves, _CONTADORES)
+        histogramas = np.array(self.histogramas, dtype=np.int64).sum(axis=0).reshape(num_chaves, self.classes)
+        encerrados, cancelados, atendidos, no_prazo = contagens.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado = pd.DataFrame({
+                'Encerrados': encerrados,
+                'Cancelados': cancelados,
+                'Atendidos': atendidos,
+                'Taxa_Cancelamento': cancelados / encerrados * 100,
+                'Pct_Prazo_Cumprido': no_prazo / atendidos * 100,
+            }, index=pd.MultiIndex.from_tuples(list(self.chaves), names=['Dimensao', 'Valor']))
+        acumulado = histogramas.cumsum(axis=1)
+        for q in quantis:
+            # Primeira classe cujo acumulado alcança q dos atendidos; o tempo é o meio da classe (em dias)
+            alvo = np.ceil(q * atendidos).clip(min=1)[:, None]
+            classe = (acumulado < alvo).sum(axis=1)
+            tempo = (np.minimum(classe + 0.5, self.classes - 1)) / 24
+            resultado[f'Tempo_Atendimento_P{round(q * 100):g}_Dias'] = np.where(atendidos > 0, tempo, np.nan)
+        resultado['Abertos'] = self.abertos
+        return resultado
+
+
+class _LeitorArquivo:
+    """
+    Arquivo ou stdin com a mesma interface de leitura de um `asyncio.StreamReader`.
+    """
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+
+    async def read(self, tamanho):
+        return self.arquivo.read(tamanho)
+
+
+async def _consumir_leitor(leitor, metricas, ao_atualizar, intervalo):
+    """
+    Lê blocos de bytes do leitor até o fim, registrando as linhas completas e chamando `ao_atualizar`
+    no máximo a cada `intervalo` segundos.
+    """
+    resto, proxima = b'', time.monotonic() + intervalo
+    while True:
+        bloco = await leitor.read(BYTES_LEITURA_EVENTOS)
+        if not bloco:
+            break
+        linhas = (resto + bloco).split(b'\n')
+        resto = linhas.pop()
+        metricas.registrar_linhas(linhas)
+        if ao_atualizar is not None and time.monotonic() >= proxima:
+            ao_atualizar(metricas)
+            proxima = time.monotonic() + intervalo
+    metricas.registrar_linhas([resto])
+
+
+async def consumir_eventos(origem, metricas=None, ao_atualizar=None, intervalo=INTERVALO_ATUALIZACAO_SEGUNDOS):
+    """
+    Consome um fluxo de eventos de `transmitir_eventos` até o fim, atualizando as métricas da janela.
+
+    Args:
+        origem (str): 'tcp://host:porta' (escuta nesse endereço e consome a primeira conexão até ela fechar),
+            '-' (stdin, para um pipe) ou o caminho de um arquivo .jsonl.
+        metricas (MetricasJanela, opcional): Métricas a atualizar; por padrão, uma nova com a janela padrão.
+        ao_atualizar (callable, opcional): Chamada com as métricas durante o consumo (por exemplo, para
+            imprimir `metricas.resumo()` em um painel).
+        intervalo (float): Intervalo mínimo, em segundos, entre duas chamadas de `ao_atualizar`.
+
+    Returns:
+        MetricasJanela: As métricas atualizadas com todos os eventos.
+    """
+    metricas = MetricasJanela() if metricas is None else metricas
+    with span('consumir_eventos') as s:
+        if origem.startswith(PREFIXO_TCP):
+            concluido = asyncio.get_running_loop().create_future()
+
+            async def atender(leitor, escritor):
+                try:
+                    await _consumir_leitor(leitor, metricas, ao_atualizar, intervalo)
+                finally:
+                    escritor.close()
+                    if not concluido.done():
+                        concluido.set_result(None)
+
+            servidor = await asyncio.start_server(atender, *_endereco_tcp(origem))
+            async with servidor:
+                await concluido
+        elif origem == DESTINO_PIPE:
+            await _consumir_leitor(_LeitorArquivo(sys.stdin.buffer), metricas, ao_atualizar, intervalo)
+        else:
+            with open(origem, 'rb') as arquivo:
+                await _consumir_leitor(_LeitorArquivo(arquivo), metricas, ao_atualizar, intervalo)
+        s.linhas = metricas.eventos
+    return metricas
@@ -0,0 +1,280 @@
+"""
+Benchmark da geração e da análise dos chamados em vários tamanhos de dataset.
+
+Cada tamanho é medido em um processo novo, para que o pico de memória de um não contamine o outro.
+Para cada etapa (gerar, gravar, carregar + converter datas, derivar colunas, agregar e renderizar
+gráficos) são registrados o tempo, as linhas por segundo e o pico de RSS. A etapa `analise_texto` mede a
+execução completa do `02_gerar_estatisticas.py` sem gráficos em um interpretador novo, incluindo a partida
+(importações), como nas execuções agendadas. Os resultados são gravados em
+JSON e comparados com um baseline; a execução falha (código de saída 1) quando alguma etapa fica mais
+lenta, ou usa mais memória, do que o baseline além do limite.
+
+Uso:
+    python benchmarks/benchmark.py                           # 10k, 100k, 1M e 10M chamados
+    python benchmarks/benchmark.py --tamanhos 10000 100000   # apenas alguns tamanhos
+    python benchmarks/benchmark.py --gravar-baseline         # grava os resultados como novo baseline
+    python benchmarks/benchmark.py --processos 1 4 16         # também a agregação em partições paralelas
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import importlib
+import resource
+import subprocess
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000, 10_000_000]
+BASELINE_PADRAO = os.path.join(RAIZ, 'benchmarks', 'baseline.json')
+SAIDA_PADRAO = os.path.join(RAIZ, 'benchmarks', 'resultados.json')
+
+# Regressão: etapa mais lenta (ou com pico de memória maior) que o baseline em mais de 25%
+LIMITE_REGRESSAO = 0.25
+# Etapas que levam menos que isso no baseline são dominadas por ruído e não são comparadas pelo tempo
+SEGUNDOS_MINIMOS_COMPARACAO = 0.05
+
+# Cenário usado em todas as medições, o mesmo da execução direta do gerador
+SEED = 42
+DATA_INICIO_SIMULACAO = datetime(2025, 1, 1)
+DATA_FIM_SIMULACAO = datetime(2025, 6, 30)
+LOCAL_OFENSOR = 'Guarulhos'
+SERVICO_DEFICIENTE = 'Manutenção'
+# Linhas por chunk na etapa de agregação em partições paralelas (`--processos`)
+CHUNK_SIZE_PARALELO = 1_000_000
+
+
+def _zerar_pico_rss():
+    """
+    Reinicia o pico de RSS do processo (Linux), para medir o pico de cada etapa separadamente.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+    except OSError:
+        pass
+
+
+def _pico_rss_mb():
+    """
+    Pico de RSS (MB) desde o último `_zerar_pico_rss`; sem /proc, o pico desde o início do processo.
+    """
+    try:
+        with open('/proc/self/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é medido em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _medir(resultados, etapa, num_chamados, funcao, *args):
+    """
+    Executa uma etapa registrando tempo, linhas por segundo e pico de RSS em `resultados[etapa]`.
+    """
+    _zerar_pico_rss()
+    inicio = time.perf_counter()
+    retorno = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    resultados[etapa] = {
+        'segundos': round(segundos, 4),
+        'linhas_por_segundo': round(num_chamados / segundos) if segundos > 0 else None,
+        'pico_rss_mb': round(_pico_rss_mb(), 1),
+    }
+    return retorno
+
+
+def _analisar_em_processo_novo(caminho):
+    """
+    Executa a análise do `02_gerar_estatisticas.py` sem gráficos em um interpretador novo, descartando a saída.
+
+    Returns:
+        float: Pico de RSS (MB) do interpretador novo, informado por ele mesmo (`RUSAGE_SELF`) ao terminar.
+    """
+    codigo = ("import os, sys, importlib, contextlib, resource; sys.path.insert(0, {!r})\n"
+              "with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):\n"
+              "    importlib.import_module('02_gerar_estatisticas').analyze_cielo_data({!r}, com_graficos=False)\n"
+              "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    saida = subprocess.run([sys.executable, '-c', codigo.format(RAIZ, caminho)], check=True,
+                           stdout=subprocess.PIPE, text=True).stdout
+    # ru_maxrss é medido em KB no Linux e em bytes no macOS
+    return int(saida.split()[-1]) / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _medir_tamanho(num_chamados, formato, processos=()):
+    """
+    Mede todas as etapas para um tamanho de dataset. Executado em um processo próprio.
+
+    Para cada número de processos em `processos`, mede também a etapa `paralelo_<n>`: leitura, derivação e
+    agregação do arquivo em partições com `resumir_em_chunks(num_processos=n)`. O pico de RSS dessa etapa é
+    o do processo principal; o de cada processo de trabalho fica limitado ao chunk.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import numpy as np
+    import pandas as pd
+
+    import analise_cielo
+    gerador = importlib.import_module('01_gerar_arquivos_de_exemplos')
+
+    resultados = {}
+    diretorio = tempfile.mkdtemp(prefix='benchmark_cielo_')
+    try:
+        entropia = np.random.SeedSequence(SEED).entropy
+        dias_simulacao = (DATA_FIM_SIMULACAO - DATA_INICIO_SIMULACAO).days
+
+        def gerar():
+            blocos = gerador._iterar_blocos('vetorizado', num_chamados, entropia, DATA_INICIO_SIMULACAO,
+                                            dias_simulacao, LOCAL_OFENSOR, SERVICO_DEFICIENTE)
+            return pd.concat(blocos, ignore_index=True)
+
+        caminho = os.path.join(diretorio, 'dataset_cielo' + gerador.FORMATOS_SAIDA[formato])
+        df = _medir(resultados, 'gerar', num_chamados, gerar)
+        _medir(resultados, 'gravar', num_chamados, gerador._gravar_em_chunks, [df], caminho, formato)
+        del df
+
+        pico_analise = _medir(resultados, 'analise_texto', num_chamados, _analisar_em_processo_novo, caminho)
+        # O pico de RSS da etapa é o do interpretador novo, não o deste processo
+        resultados['analise_texto']['pico_rss_mb'] = round(pico_analise, 1)
+
+        df = _medir(resultados, 'carregar', num_chamados, analise_cielo.carregar_chamados, caminho)
+        df = _medir(resultados, 'derivar', num_chamados, analise_cielo.derivar_colunas, df)
+        metricas = _medir(resultados, 'agregar', num_chamados,
+                          lambda: analise_cielo.calcular_metricas(analise_cielo.resumir_derivado(df)))
+        del df
+
+        for num_processos in processos:
+            _medir(resultados, f'paralelo_{num_processos}', num_chamados,
+                   lambda: analise_cielo.calcular_metricas(analise_cielo.resumir_em_chunks(
+                       caminho, CHUNK_SIZE_PARALELO, num_processos=num_processos)[0]))
+
+        graficos = analise_cielo.preparar_graficos(metricas)
+        _medir(resultados, 'renderizar', num_chamados, analise_cielo.renderizar_graficos,
+               graficos, os.path.join(diretorio, 'graficos'))
+        return {'bytes_arquivo': os.path.getsize(caminho), 'etapas': resultados}
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def _ambiente():
+    import numpy as np
+    import pandas as pd
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def executar_benchmark(tamanhos, formato='csv', processos=()):
+    """
+    Mede as etapas para cada tamanho, cada um em um processo novo (ver `_medir_tamanho` para `processos`).
+
+    Returns:
+        dict: Ambiente, formato e resultados por tamanho (chave = número de chamados em texto).
+    """
+    contexto = multiprocessing.get_context('spawn')
+    resultados = {}
+    for num_chamados in tamanhos:
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+            resultados[str(num_chamados)] = executor.submit(_medir_tamanho, num_chamados, formato,
+                                                                 processos).result()
+        _imprimir_tamanho(num_chamados, resultados[str(num_chamados)])
+    return {'ambiente': _ambiente(), 'formato': formato, 'resultados': resultados}
+
+
+def _imprimir_tamanho(num_chamados, resultado):
+    print(f"\n{num_chamados:,} chamados ({resultado['bytes_arquivo'] / 1024 ** 2:.1f} MB em disco)")
+    print(f"{'etapa':<14}{'segundos':>10}{'linhas/s':>15}{'pico RSS (MB)':>16}")
+    for etapa, medida in resultado['etapas'].items():
+        print(f"{etapa:<14}{medida['segundos']:>10.3f}{medida['linhas_por_segundo'] or 0:>15,}"
+              f"{medida['pico_rss_mb']:>16.1f}")
+
+
+def comparar_com_baseline(atual, baseline, limite=LIMITE_REGRESSAO):
+    """
+    Compara os resultados com o baseline, para os tamanhos e etapas presentes em ambos.
+
+    Returns:
+        list: Descrição de cada regressão (tempo ou pico de RSS acima de `1 + limite` vezes o baseline).
+    """
+    regressoes = []
+    for tamanho, resultado in atual['resultados'].items():
+        if tamanho not in baseline['resultados']:
+            continue
+        etapas_baseline = baseline['resultados'][tamanho]['etapas']
+        for etapa, medida in resultado['etapas'].items():
+            referencia = etapas_baseline.get(etapa)
+            if referencia is None:
+                continue
+            if (referencia['segundos'] >= SEGUNDOS_MINIMOS_COMPARACAO
+                    and medida['segundos'] > referencia['segundos'] * (1 + limite)):
+                regressoes.append(f"{tamanho} chamados, {etapa}: {medida['segundos']:.3f} s "
+                                  f"(baseline {referencia['segundos']:.3f} s)")
+            if medida['pico_rss_mb'] > referencia['pico_rss_mb'] * (1 + limite):
+                regressoes.append(f"{tamanho} chamados, {etapa}: pico de {medida['pico_rss_mb']:.0f} MB "
+                                  f"(baseline {referencia['pico_rss_mb']:.0f} MB)")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark da geração e da análise dos chamados.')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help='Números de chamados a medir (padrão: 10k, 100k, 1M e 10M).')
+    parser.add_argument('--formato', default='csv', choices=['csv', 'parquet', 'feather'],
+                        help='Formato do arquivo gravado e lido (padrão: csv).')
+    parser.add_argument('--saida', default=SAIDA_PADRAO, help='Arquivo JSON com os resultados.')
+    parser.add_argument('--baseline', default=BASELINE_PADRAO, help='Arquivo JSON do baseline.')
+    parser.add_argument('--limite', type=float, default=LIMITE_REGRESSAO,
+                        help='Piora relativa tolerada antes de acusar regressão (padrão: 0.25).')
+    parser.add_argument('--gravar-baseline', action='store_true',
+                        help='Grava os resultados como novo baseline em vez de comparar.')
+    parser.add_argument('--processos', type=int, nargs='+', default=[],
+                        help='Mede também a agregação em partições com esses números de processos.')
+    args = parser.parse_args()
+
+    atual = executar_benchmark(args.tamanhos, args.formato, args.processos)
+    with open(args.saida, 'w') as arquivo:
+        json.dump(atual, arquivo, indent=2)
+    print(f"\nResultados gravados em '{args.saida}'.")
+
+    if args.gravar_baseline:
+        with open(args.baseline, 'w') as arquivo:
+            json.dump(atual, arquivo, indent=2)
+        print(f"Baseline gravado em '{args.baseline}'.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline '{args.baseline}' não encontrado; nada a comparar.")
+        return 0
+    with open(args.baseline) as arquivo:
+        baseline = json.load(arquivo)
+    if baseline.get('formato') != atual['formato']:
+        print(f"Baseline medido com formato '{baseline.get('formato')}'; nada a comparar.")
+        return 0
+
+    regressoes = comparar_com_baseline(atual, baseline, args.limite)
+    if regressoes:
+        print(f"\n{len(regressoes)} regressão(ões) acima de {args.limite:.0%} em relação ao baseline:")
+        for regressao in regressoes:
+            print(f"  - {regressao}")
+        return 1
+    print(f"\nNenhuma regressão acima de {args.limite:.0%} em relação ao baseline.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+Chave do cache em disco: tudo o que muda o dataset tipado ou as métricas muda a chave.
+"""
+from analise_cielo import chave_cache
+
+CABECALHO = ('LOCAL,SERVICO,STATUS,MOTIVO_CANCELAMENTO,DATA_ABERTURA,DATA_ENCERRAMENTO,DATA_LIMITE_ATENDIMENTO,'
+             'PRAZO_HORAS,ENTREGA,PRAZO_MAXIMO_CONCORRENCIA_DIAS,EXPECTATIVA_CLIENTE_DIAS\n')
+
+
+def test_chave_depende_dos_formatos_das_datas(tmp_path):
+    caminho = tmp_path / 'chamados.csv'
+    caminho.write_text(CABECALHO + 'Moema,Instalação,Atendido,,02/01/2025,03/01/2025 10:00:00,'
+                       '04/01/2025 10:00:00,48,Sim,2.0,1.0\n', encoding='utf-8')
+    caminho = str(caminho)
+    sem_formatos = chave_cache(caminho)
+    dia_mes = chave_cache(caminho, formatos_datas={'DATA_ABERTURA': '%d/%m/%Y'})
+    mes_dia = chave_cache(caminho, formatos_datas={'DATA_ABERTURA': '%m/%d/%Y'})
+
+    assert len({sem_formatos, dia_mes, mes_dia}) == 3
+    assert chave_cache(caminho, formatos_datas={}) == sem_formatos
+    assert chave_cache(caminho, formatos_datas={'DATA_ABERTURA': None}) == sem_formatos
+    dois_formatos = {'DATA_ABERTURA': '%d/%m/%Y', 'DATA_ENCERRAMENTO': '%d/%m/%Y %H:%M:%S'}
+    assert (chave_cache(caminho, formatos_datas=dois_formatos)
+            == chave_cache(caminho, formatos_datas=dict(reversed(list(dois_formatos.items())))))
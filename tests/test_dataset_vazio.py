@@ -0,0 +1,74 @@
+"""
+Regressões da análise sobre datasets sem chamados ou com colunas inteiramente nulas.
+"""
+import os
+import importlib.util
+
+import pandas as pd
+import pytest
+
+from analise_cielo import resumir_em_chunks, calcular_metricas
+from analise_cielo.agregacao import resumir_colunas, combinar_resumo_colunas
+
+# Datasets vazios não devem gerar avisos (divisões por zero, reduções de sequências vazias)
+pytestmark = pytest.mark.filterwarnings('error')
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CABECALHO = ('LOCAL,SERVICO,STATUS,MOTIVO_CANCELAMENTO,DATA_ABERTURA,DATA_ENCERRAMENTO,DATA_LIMITE_ATENDIMENTO,'
+             'PRAZO_HORAS,ENTREGA,PRAZO_MAXIMO_CONCORRENCIA_DIAS,EXPECTATIVA_CLIENTE_DIAS\n')
+
+
+def _script_estatisticas():
+    spec = importlib.util.spec_from_file_location('gerar_estatisticas',
+                                                  os.path.join(RAIZ, '02_gerar_estatisticas.py'))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture
+def csv_vazio(tmp_path):
+    caminho = tmp_path / 'vazio.csv'
+    caminho.write_text(CABECALHO, encoding='utf-8')
+    return str(caminho)
+
+
+@pytest.mark.parametrize('num_processos', [1, 2])
+def test_resumir_em_chunks_csv_so_com_cabecalho(csv_vazio, num_processos):
+    resumo, resumo_colunas, primeiras_linhas = resumir_em_chunks(csv_vazio, 1000, num_processos=num_processos)
+    assert resumo['linhas'] == 0
+    assert primeiras_linhas.empty
+    assert set(resumo_colunas) >= {'LOCAL', 'DATA_ABERTURA'}
+    metricas = calcular_metricas(resumo)
+    assert metricas['linhas'] == 0
+    assert metricas['cumprimento_prazo'] is None
+
+
+def test_analise_em_chunks_csv_so_com_cabecalho(csv_vazio, capsys):
+    _script_estatisticas().analyze_cielo_data(csv_vazio, chunk_size=1000, com_graficos=False)
+    assert 'Total de linhas no dataset: 0' in capsys.readouterr().out
+
+
+def test_analise_incremental_sem_chamados(csv_vazio, tmp_path, capsys):
+    estado = str(tmp_path / 'estado.pkl')
+    analise = _script_estatisticas()
+    for _ in range(2):
+        analise.analyze_cielo_data(csv_vazio, estado_incremental=estado, com_graficos=False)
+        assert 'Nenhum chamado no dataset' in capsys.readouterr().out
+    assert os.path.exists(estado)
+
+
+def test_combinar_resumo_colunas_de_data_toda_nula():
+    chunk = pd.DataFrame({'DATA_ENCERRAMENTO': pd.Series([pd.NaT, pd.NaT], dtype='datetime64[ns]')})
+    combinado = combinar_resumo_colunas(resumir_colunas(chunk), resumir_colunas(chunk))
+    assert combinado['DATA_ENCERRAMENTO']['nao_nulos'] == 0
+    assert pd.isna(combinado['DATA_ENCERRAMENTO']['min']) and pd.isna(combinado['DATA_ENCERRAMENTO']['max'])
+
+
+def test_analise_em_chunks_fora_do_periodo(tmp_path, capsys):
+    caminho = tmp_path / 'chamados.csv'
+    caminho.write_text(CABECALHO + 'Moema,Instalação,Atendido,,2025-01-02T10:00:00,2025-01-03T10:00:00,'
+                       '2025-01-04T10:00:00,48,Sim,2.0,1.0\n' * 3, encoding='utf-8')
+    _script_estatisticas().analyze_cielo_data(str(caminho), chunk_size=1, periodo=('2030-01-01', '2030-02-01'),
+                                              com_graficos=False)
+    assert 'Total de linhas no dataset: 0' in capsys.readouterr().out
@@ -0,0 +1,106 @@
+"""
+Gerador de chamados: reprodutibilidade com semente, independência do chunk_size e do número de processos, e
+equivalência estatística entre os modos de geração.
+"""
+import os
+import sys
+import glob
+import importlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+gerador = importlib.import_module('01_gerar_arquivos_de_exemplos')
+
+SEED = 42
+LOCAL_OFENSOR = 'Guarulhos'
+SERVICO_DEFICIENTE = 'Manutenção'
+# Mais de dois blocos de geração, com o último incompleto
+NUM_CHAMADOS_BLOCOS = 2 * gerador.TAMANHO_BLOCO_GERACAO + 1_000
+
+
+def _gerar_arquivo(diretorio, num_chamados, formato='csv', **opcoes):
+    gerador.generate_cielo_dataset(num_chamados, '01/01/2025', '30/06/2025', LOCAL_OFENSOR, SERVICO_DEFICIENTE,
+                                   str(diretorio), 'dataset_cielo.csv', seed=SEED, formato=formato, **opcoes)
+    return os.path.join(str(diretorio), 'dataset_cielo' + gerador.FORMATOS_SAIDA[formato])
+
+
+def _ler_bytes(caminho):
+    with open(caminho, 'rb') as arquivo:
+        return arquivo.read()
+
+
+def _estatisticas(df):
+    """
+    Taxa de cancelamento, tempo médio de atendimento (dias) e percentual no prazo dos atendidos.
+    """
+    atendido = df['STATUS'] == 'Atendido'
+    tempo_dias = (df['DATA_ENCERRAMENTO'] - df['DATA_ABERTURA']).dt.total_seconds()[atendido] / 86_400
+    no_prazo = (df['DATA_ENCERRAMENTO'] <= df['DATA_LIMITE_ATENDIMENTO'])[atendido]
+    return (~atendido).mean(), tempo_dias.mean(), no_prazo.mean()
+
+
+@pytest.fixture(scope='module')
+def arquivo_de_uma_vez(tmp_path_factory):
+    return _ler_bytes(_gerar_arquivo(tmp_path_factory.mktemp('de_uma_vez'), NUM_CHAMADOS_BLOCOS))
+
+
+@pytest.mark.parametrize('modo', gerador.MODOS_GERACAO)
+def test_saida_com_semente_reprodutivel(tmp_path, modo):
+    primeira = _gerar_arquivo(tmp_path / 'primeira', 5_000, modo=modo)
+    segunda = _gerar_arquivo(tmp_path / 'segunda', 5_000, modo=modo)
+    assert _ler_bytes(primeira) == _ler_bytes(segunda)
+
+
+@pytest.mark.parametrize('chunk_size', [50_000, gerador.TAMANHO_BLOCO_GERACAO, 1_000_000])
+def test_saida_em_chunks_igual_a_de_uma_vez(tmp_path, arquivo_de_uma_vez, chunk_size):
+    assert _ler_bytes(_gerar_arquivo(tmp_path, NUM_CHAMADOS_BLOCOS, chunk_size=chunk_size)) == arquivo_de_uma_vez
+
+
+@pytest.mark.parametrize('num_processos, chunk_size', [(2, None), (3, None), (3, 50_000)])
+def test_partes_em_paralelo_concatenadas_iguais_ao_arquivo_unico(tmp_path, arquivo_de_uma_vez, num_processos,
+                                                                 chunk_size):
+    _gerar_arquivo(tmp_path, NUM_CHAMADOS_BLOCOS, num_processos=num_processos, chunk_size=chunk_size)
+    partes = sorted(glob.glob(os.path.join(str(tmp_path), 'dataset_cielo', 'part-*.csv')))
+    assert len(partes) == num_processos
+    # Cada parte tem o próprio cabeçalho; na concatenação, só o da primeira fica
+    conteudo = [_ler_bytes(parte) for parte in partes]
+    concatenado = conteudo[0] + b''.join(parte.split(b'\n', 1)[1] for parte in conteudo[1:])
+    assert concatenado == arquivo_de_uma_vez
+
+
+def test_parquet_em_chunks_igual_ao_de_uma_vez(tmp_path):
+    # Os row groups acompanham os chunks, então os bytes diferem; o conteúdo lido não
+    de_uma_vez = pd.read_parquet(_gerar_arquivo(tmp_path / 'de_uma_vez', NUM_CHAMADOS_BLOCOS, 'parquet'))
+    em_chunks = pd.read_parquet(_gerar_arquivo(tmp_path / 'em_chunks', NUM_CHAMADOS_BLOCOS, 'parquet',
+                                               chunk_size=50_000))
+    pd.testing.assert_frame_equal(em_chunks, de_uma_vez)
+
+
+def test_modo_vetorizado_equivale_ao_loop():
+    entropia = np.random.SeedSequence(SEED).entropy
+    gerados = {
+        modo: pd.concat(gerador._iterar_blocos(modo, 50_000, entropia, datetime(2025, 1, 1), 180,
+                                               LOCAL_OFENSOR, SERVICO_DEFICIENTE), ignore_index=True)
+        for modo in gerador.MODOS_GERACAO
+    }
+    vetorizado, loop = gerados['vetorizado'], gerados['loop']
+    assert list(vetorizado.columns) == list(loop.columns)
+    assert (vetorizado.dtypes == loop.dtypes).all()
+
+    # Tolerâncias de cerca de 4 erros padrão da diferença entre as duas amostras
+    segmentos = {
+        'total': (slice(None), (0.01, 0.05, 0.015)),
+        'local ofensor': (lambda df: df['LOCAL'] == LOCAL_OFENSOR, (0.04, 0.15, 0.05)),
+        'serviço deficiente': (lambda df: df['SERVICO'] == SERVICO_DEFICIENTE, (0.015, 0.07, 0.02)),
+    }
+    for nome, (filtro, tolerancias) in segmentos.items():
+        esperado = _estatisticas(loop.loc[filtro])
+        obtido = _estatisticas(vetorizado.loc[filtro])
+        for metrica, valor_loop, valor, tolerancia in zip(('cancelamento', 'tempo', 'prazo'), esperado, obtido,
+                                                          tolerancias):
+            assert valor == pytest.approx(valor_loop, abs=tolerancia), (nome, metrica)
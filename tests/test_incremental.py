@@ -0,0 +1,40 @@
+"""
+Regressões do modo incremental: chamados novos no mesmo dia da marca d'água.
+"""
+from analise_cielo import atualizar_estado_incremental
+
+CABECALHO = ('LOCAL,SERVICO,STATUS,MOTIVO_CANCELAMENTO,DATA_ABERTURA,DATA_ENCERRAMENTO,DATA_LIMITE_ATENDIMENTO,'
+             'PRAZO_HORAS,ENTREGA,PRAZO_MAXIMO_CONCORRENCIA_DIAS,EXPECTATIVA_CLIENTE_DIAS\n')
+
+
+def _linhas(dia, quantidade):
+    return (f'Moema,Instalação,Atendido,,{dia},{dia} 18:00:00,{dia} 20:00:00,48,Sim,2.0,1.0\n') * quantidade
+
+
+def test_csv_que_cresce_no_mesmo_dia_da_marca(tmp_path):
+    caminho, estado = tmp_path / 'chamados.csv', str(tmp_path / 'estado.pkl')
+    caminho.write_text(CABECALHO + _linhas('2025-01-01', 2) + _linhas('2025-01-02', 3), encoding='utf-8')
+    resultado, novos = atualizar_estado_incremental(str(caminho), estado)
+    assert novos == 5
+
+    for quantidade, total in [(4, 9), (2, 11)]:
+        with open(caminho, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(_linhas('2025-01-02', quantidade))
+        resultado, novos = atualizar_estado_incremental(str(caminho), estado)
+        assert novos == quantidade
+        assert resultado['resumo']['linhas'] == total
+
+    assert atualizar_estado_incremental(str(caminho), estado)[1] == 0
+
+
+def test_arquivo_novo_com_dias_ate_a_marca(tmp_path):
+    diretorio, estado = tmp_path / 'partes', str(tmp_path / 'estado.pkl')
+    diretorio.mkdir()
+    (diretorio / 'part-00000.csv').write_text(CABECALHO + _linhas('2025-01-02', 3), encoding='utf-8')
+    assert atualizar_estado_incremental(str(diretorio), estado)[1] == 3
+
+    (diretorio / 'part-00001.csv').write_text(CABECALHO + _linhas('2025-01-01', 1) + _linhas('2025-01-02', 2),
+                                              encoding='utf-8')
+    resultado, novos = atualizar_estado_incremental(str(diretorio), estado)
+    assert novos == 3
+    assert resultado['resumo']['linhas'] == 6
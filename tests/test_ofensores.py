@@ -0,0 +1,59 @@
+"""
+Detecção de ofensores: recupera o local e o serviço plantados pelo gerador, com p-valores conferidos.
+"""
+import os
+import math
+import importlib.util
+
+import numpy as np
+import pytest
+
+from analise_cielo import carregar_chamados, derivar_colunas, construir_cubo, detectar_ofensores
+from analise_cielo.ofensores import _beta_incompleta, _p_valor_t
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCAL_OFENSOR = 'Guarulhos'
+SERVICO_DEFICIENTE = 'Manutenção'
+
+
+def _gerador():
+    spec = importlib.util.spec_from_file_location('gerar_arquivos_de_exemplos',
+                                                  os.path.join(RAIZ, '01_gerar_arquivos_de_exemplos.py'))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+@pytest.fixture(scope='module')
+def ofensores(tmp_path_factory):
+    diretorio = str(tmp_path_factory.mktemp('ofensores'))
+    _gerador().generate_cielo_dataset(50_000, '01/01/2025', '30/06/2025', LOCAL_OFENSOR, SERVICO_DEFICIENTE,
+                                      diretorio, 'dataset_cielo.csv', seed=42)
+    df = derivar_colunas(carregar_chamados(os.path.join(diretorio, 'dataset_cielo.csv')))
+    return detectar_ofensores(construir_cubo(df))
+
+
+@pytest.mark.parametrize('metrica', ['Taxa_Cancelamento', 'Pct_Prazo_Cumprido', 'Tempo_Medio_Atendimento_Dias'])
+def test_recupera_local_e_servico_plantados(ofensores, metrica):
+    assert ofensores['Ofensor'].all() and (ofensores['P_Ajustado'] < 0.05).all()
+    da_metrica = ofensores[ofensores['Metrica'] == metrica]
+    primeiro = da_metrica.groupby('Dimensao', sort=False)['Segmento'].first()
+    assert primeiro['LOCAL'] == LOCAL_OFENSOR
+    assert primeiro['SERVICO'] == SERVICO_DEFICIENTE
+    assert primeiro['LOCAL × SERVICO'] == f'{LOCAL_OFENSOR} × {SERVICO_DEFICIENTE}'
+    assert set(da_metrica.loc[da_metrica['Dimensao'] == 'LOCAL', 'Segmento']) == {LOCAL_OFENSOR}
+    assert set(da_metrica.loc[da_metrica['Dimensao'] == 'SERVICO', 'Segmento']) == {SERVICO_DEFICIENTE}
+
+
+def test_beta_incompleta_contra_referencia():
+    # I_0,4(2, 3) = P(Binomial(4; 0,4) >= 2) = 0,5248
+    assert _beta_incompleta(np.array([2.0]), np.array([3.0]), np.array([0.4]))[0] == pytest.approx(0.5248, rel=1e-10)
+    assert _beta_incompleta(np.array([7.5]), np.array([7.5]), np.array([0.5]))[0] == pytest.approx(0.5, rel=1e-10)
+
+
+def test_p_valor_t_contra_referencia():
+    # Valores críticos bilaterais de 5% da tabela t, e as formas fechadas com 1 e 2 graus de liberdade
+    t = np.array([2.228138852, 2.570581836, 1.0, 3.0])
+    graus_liberdade = np.array([10.0, 5.0, 1.0, 2.0])
+    esperado = [0.05, 0.05, 0.5, 1 - 3 / math.sqrt(11)]
+    assert _p_valor_t(t, graus_liberdade) == pytest.approx(esperado, rel=1e-7)